@@ -2,4 +2,5 @@ from site_file_enricher.model import *
 from site_file_enricher.io import *
 from site_file_enricher.file_parser import *
 from site_file_enricher.search.fuzzy import *
+from site_file_enricher.pipeline import *
 from site_file_enricher.script import *
\ No newline at end of file
@@ -1,2 +1,4 @@
+from site_file_enricher.file_parser.text import *
 from site_file_enricher.file_parser.xml_parser import *
 from site_file_enricher.file_parser.html_parser import *
+from site_file_enricher.file_parser.parse_executor import *
@@ -1,9 +1,33 @@
+import codecs
+import io
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
+from typing import Iterator
 
-from site_file_enricher.model.dto import FileColData, FileElement, FileElementType
+from bs4.dammit import EncodingDetector
+from lxml import etree, html
+
+from site_file_enricher.file_parser.text import collapse_spaces, collapse_whitespace
+from site_file_enricher.model.dto import FileElement, FileElementType, ProductRecord, file_elements_of
 import bs4
-import re
+
+PRINT_FORM_TABLE_CLASS = 'printFormTbl table-centred-data'
+PRINT_FORM_TABLE_XPATH = etree.XPath(f"//table[@class='{PRINT_FORM_TABLE_CLASS}']")
+ROWS_XPATH = etree.XPath('.//tr')
+CELLS_XPATH = etree.XPath('.//td')
+DEFAULT_HTML_ENCODING = 'utf-8'
+DEFAULT_STREAMING_CHUNK_SIZE = 64 * 1024
+# BeautifulSoup keeps strings of these tags out of .text and whitespace inside these as is
+STRING_CONTAINER_TAGS = {'script', 'style', 'template', 'rt', 'rp'}
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+
+
+class HTMLParserEngine(Enum):
+    BEAUTIFUL_SOUP = 1
+    LXML = 2
+    STREAMING = 3
 
 
 class HTMLContractFormat(Enum):
@@ -26,6 +50,9 @@ class RootTHMLElement:
     children: list[HTMLElement]
     row_step: int = 1
 
+    def __post_init__(self):
+        self.col_names = tuple(child.name for child in self.children)
+
 
 def __get_value__(parsed_table: list[list], row_cnt: int, html_element: HTMLElement):
     try:
@@ -36,16 +63,171 @@ def __get_value__(parsed_table: list[list], row_cnt: int, html_element: HTMLElem
         if len(row) <= html_element.column_index:
             return None
         else:
-            return re.sub(r'([ \n]+)', ' ', row[html_element.column_index])
+            return collapse_spaces(row[html_element.column_index])
     except Exception as ex:
         print(ex)
         return None
 
 
+def __parse_table_with_beautiful_soup__(html_content) -> list[list]:
+    bs_parser = bs4.BeautifulSoup(html_content, 'html.parser')
+    parsed_table = []
+    table_31 = bs_parser.find_all("table", {'class': PRINT_FORM_TABLE_CLASS})[0]
+
+    for i, row in enumerate(table_31.find_all('tr')):
+        parsed_table.append([el.text.strip() for el in row.find_all('td')])
+    return parsed_table
+
+
+@lru_cache(maxsize=16)
+def __lxml_parser_for__(encoding: str) -> html.HTMLParser:
+    return html.HTMLParser(encoding=encoding)
+
+
+def __build_html_dom__(html_content):
+    if hasattr(html_content, 'read'):
+        html_content = html_content.read()
+    if isinstance(html_content, str):
+        # the text is already decoded, whatever the page declares
+        return html.fromstring(html_content.encode('utf-8'), parser=__lxml_parser_for__('utf-8'))
+    encoding = EncodingDetector.find_declared_encoding(html_content, is_html=True) or DEFAULT_HTML_ENCODING
+    try:
+        encoding = codecs.lookup(encoding).name
+    except LookupError:
+        encoding = DEFAULT_HTML_ENCODING
+    return html.fromstring(html_content, parser=__lxml_parser_for__(encoding))
+
+
+def __collect_text__(element, preserve_whitespace: bool, parts: list[str]):
+    preserve_whitespace = preserve_whitespace or element.tag in PRESERVE_WHITESPACE_TAGS
+    if element.text:
+        parts.append(element.text if preserve_whitespace else collapse_whitespace(element.text))
+    for child in element:
+        # comments and processing instructions have a function as a tag
+        if isinstance(child.tag, str) and child.tag not in STRING_CONTAINER_TAGS:
+            __collect_text__(child, preserve_whitespace, parts)
+        if child.tail:
+            parts.append(child.tail if preserve_whitespace else collapse_whitespace(child.tail))
+
+
+def __cell_text__(cell) -> str:
+    """
+    Text of a cell the way BeautifulSoup's .text gives it.
+    """
+    parts = []
+    __collect_text__(cell, False, parts)
+    return ''.join(parts)
+
+
+def __row_cells__(row) -> list[str]:
+    return [__cell_text__(cell).strip() for cell in CELLS_XPATH(row)]
+
+
+def __parse_table_with_lxml__(html_content) -> list[list]:
+    table_31 = PRINT_FORM_TABLE_XPATH(__build_html_dom__(html_content))[0]
+    return [__row_cells__(row) for row in ROWS_XPATH(table_31)]
+
+
+def __iter_chunks__(html_content, chunk_size: int) -> Iterator[bytes]:
+    if isinstance(html_content, str):
+        html_content = html_content.encode('utf-8')
+    if isinstance(html_content, (bytes, bytearray)):
+        html_content = io.BytesIO(html_content)
+    while True:
+        chunk = html_content.read(chunk_size)
+        if not chunk:
+            return
+        # a text file gives str chunks
+        yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+def __chain_first__(first_chunk: bytes, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    yield first_chunk
+    yield from chunks
+
+
+def __iter_table_rows__(html_content, chunk_size: int) -> Iterator[list[str]]:
+    """
+    Feeds the page to libxml2 chunk by chunk and yields the cells of every row of
+    the print form table in the order of ROWS_XPATH. Rows are dropped from the tree
+    once their cells are read, and parsing stops at the end of the table.
+    """
+    chunks = __iter_chunks__(html_content, chunk_size)
+    first_chunk = next(chunks, b'')
+    if isinstance(html_content, str) or isinstance(html_content, io.TextIOBase):
+        encoding = 'utf-8'
+    else:
+        encoding = EncodingDetector.find_declared_encoding(first_chunk, is_html=True) or DEFAULT_HTML_ENCODING
+        try:
+            encoding = codecs.lookup(encoding).name
+        except LookupError:
+            encoding = DEFAULT_HTML_ENCODING
+
+    parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+    table = None
+    open_rows = 0
+    for chunk in __chain_first__(first_chunk, chunks):
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if table is None:
+                if event == 'start' and element.tag == 'table' and element.get('class') == PRINT_FORM_TABLE_CLASS:
+                    table = element
+                elif event == 'end':
+                    element.clear(keep_tail=True)
+                continue
+            if element is table:
+                return
+            if element.tag != 'tr':
+                continue
+            if event == 'start':
+                open_rows += 1
+                continue
+            open_rows -= 1
+            if open_rows != 0:
+                continue
+            # nested rows come after the row they are in, as in ROWS_XPATH
+            yield __row_cells__(element)
+            for nested_row in element.iterdescendants('tr'):
+                yield __row_cells__(nested_row)
+            element.clear(keep_tail=True)
+            parent = element.getparent()
+            while element.getprevious() is not None:
+                del parent[0]
+    if table is None:
+        raise IndexError(f"there is no table with class '{PRINT_FORM_TABLE_CLASS}'")
+
+
+class RowWindow:
+    """
+    The last rows of a table, indexed as in the whole table.
+    """
+
+    def __init__(self):
+        self.rows: deque[list[str]] = deque()
+        self.first_row = 0
+
+    def __len__(self) -> int:
+        return self.first_row + len(self.rows)
+
+    def __getitem__(self, index: int) -> list[str]:
+        return self.rows[index - self.first_row]
+
+    def append(self, row: list[str]):
+        self.rows.append(row)
+
+    def drop_before(self, index: int):
+        while self.rows and self.first_row < index:
+            self.rows.popleft()
+            self.first_row += 1
+
+
 class HTMLParser:
-    def __init__(self, type_a_root_element: RootTHMLElement, type_b_root_element: RootTHMLElement):
+    def __init__(self, type_a_root_element: RootTHMLElement, type_b_root_element: RootTHMLElement,
+                 engine: HTMLParserEngine = HTMLParserEngine.BEAUTIFUL_SOUP):
         self.type_a_root_element = type_a_root_element
         self.type_b_root_element = type_b_root_element
+        self.engine = engine
+        self.chunk_size = DEFAULT_STREAMING_CHUNK_SIZE
         self.col_names = []
         if type_a_root_element is not None:
             self.col_names += [xml_el.name for xml_el in type_a_root_element.children]
@@ -53,12 +235,18 @@ class HTMLParser:
             self.col_names += [xml_el.name for xml_el in type_b_root_element.children]
 
     def parse(self, html_content, link: str) -> list[FileElement]:
-        bs_parser = bs4.BeautifulSoup(html_content, 'html.parser')
-        parsed_table = []
-        table_31 = bs_parser.find_all("table", {'class': 'printFormTbl table-centred-data'})[0]
+        return file_elements_of(self.parse_records(html_content, link))
 
-        for i, row in enumerate(table_31.find_all('tr')):
-            parsed_table.append([el.text.strip() for el in row.find_all('td')])
+    def parse_records(self, html_content, link: str) -> list[ProductRecord]:
+        match self.engine:
+            case HTMLParserEngine.STREAMING:
+                return list(self.iter_parse_records(html_content, link))
+            case HTMLParserEngine.BEAUTIFUL_SOUP:
+                parsed_table = __parse_table_with_beautiful_soup__(html_content)
+            case HTMLParserEngine.LXML:
+                parsed_table = __parse_table_with_lxml__(html_content)
+            case _:
+                raise Exception(f"HTML parser engine {self.engine} isn't implemented")
 
         root_element = self.__get_root_element__(parsed_table)
         if root_element is None:
@@ -67,32 +255,75 @@ class HTMLParser:
         row_cnt = 2
         if parsed_table[0][0].isnumeric():
             row_cnt = 1
-        file_elements = []
+        records = []
 
         while row_cnt < len(parsed_table):
-            try:
-                product_name = __get_value__(parsed_table, row_cnt, root_element.product_html_element)
-                raw_price = __get_value__(parsed_table, row_cnt, root_element.price_html_element)
-                if product_name is None or raw_price is None:
-                    row_cnt += root_element.row_step
-                    continue
-                for child_element in root_element.children:
-                    child_value = __get_value__(parsed_table, row_cnt, child_element)
-                    if child_element is None:
-                        continue
-                    file_elements.append(FileElement(
-                    link=link,
-                    price= int(float(raw_price.replace(' ', ''))*100),
-                    product_name=product_name,
-                    file_element_type=FileElementType.HTML,
-                    col_data=FileColData(row_cnt, child_element.name, child_value)
-                    ))
+            records += self.__product_records__(root_element, parsed_table, row_cnt, link)
+            row_cnt += root_element.row_step
+
+        return records
+
+    def iter_parse(self, html_content, link: str) -> Iterator[FileElement]:
+        for record in self.iter_parse_records(html_content, link):
+            yield from record.file_elements()
+
+    def iter_parse_records(self, html_content, link: str) -> Iterator[ProductRecord]:
+        """
+        Yields the same records as parse_records while the page is parsed, keeping
+        only the rows of one product in memory.
+        """
+        rows = __iter_table_rows__(html_content, self.chunk_size)
+        window = RowWindow()
+        first_row = next(rows, None)
+        if first_row is None:
+            return
+        window.append(first_row)
+        root_element = self.__get_root_element__(window)
+        if root_element is None:
+            return
+
+        row_cnt = 2
+        if window[0][0].isnumeric():
+            row_cnt = 1
+        last_row_offset = max(html_element.row_index for html_element in
+                              [root_element.product_html_element, root_element.price_html_element]
+                              + root_element.children)
+
+        for row in rows:
+            window.append(row)
+            while row_cnt + last_row_offset < len(window):
+                yield from self.__product_records__(root_element, window, row_cnt, link)
                 row_cnt += root_element.row_step
-            except Exception as ex:
-                print(ex)
+                window.drop_before(row_cnt)
+        while row_cnt < len(window):
+            yield from self.__product_records__(root_element, window, row_cnt, link)
+            row_cnt += root_element.row_step
 
-        return file_elements
+    def __product_records__(self, root_element: RootTHMLElement, rows, row_cnt: int,
+                            link: str) -> list[ProductRecord]:
+        # a product that can't be read, e.g. with a price that isn't a number, is skipped
+        try:
+            return self.__row_records__(root_element, rows, row_cnt, link)
+        except Exception as ex:
+            print(ex)
+            return []
 
+    @staticmethod
+    def __row_records__(root_element: RootTHMLElement, parsed_table, row_cnt: int, link: str) -> list[ProductRecord]:
+        product_name = __get_value__(parsed_table, row_cnt, root_element.product_html_element)
+        raw_price = __get_value__(parsed_table, row_cnt, root_element.price_html_element)
+        if product_name is None or raw_price is None or len(root_element.children) == 0:
+            return []
+        return [ProductRecord(
+            link=link,
+            product_name=product_name,
+            price=int(float(raw_price.replace(' ', '')) * 100),
+            col_names=root_element.col_names,
+            values=tuple(__get_value__(parsed_table, row_cnt, child_element)
+                         for child_element in root_element.children),
+            index_num=row_cnt,
+            file_element_type=FileElementType.HTML
+        )]
 
     def __get_root_element__(self, parsed_table: list) -> RootTHMLElement | None:
         if len(parsed_table) == 0:
@@ -0,0 +1,99 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+
+from site_file_enricher.model.dto import FileElement, FileElementType, ProductRecord, file_elements_of
+
+
+class ParseExecutorType(Enum):
+    """
+    THREAD only keeps the event loop free: BeautifulSoup and lxml build their trees holding
+    the GIL, so parsing still runs on one core. PROCESS parses on every core and pays for
+    pickling the records back; choose it when many or large attachments make parsing,
+    not downloading, the bottleneck.
+    """
+    THREAD = 1
+    PROCESS = 2
+
+
+def _pack_records(records: list[ProductRecord]) -> list[tuple]:
+    # plain tuples pickle much smaller than objects, and the column names shared
+    # by the records of one parser are the same tuple, so pickle stores them once
+    return [
+        (record.product_name, record.price, record.col_names, record.values, record.index_num,
+         record.file_element_type.value, record.ktru, record.okpd)
+        for record in records
+    ]
+
+
+def _unpack_records(packed_records: list[tuple], link: str) -> list[ProductRecord]:
+    return [
+        ProductRecord(
+            link=link,
+            product_name=product_name,
+            price=price,
+            col_names=col_names,
+            values=values,
+            index_num=index_num,
+            file_element_type=FileElementType(file_element_type),
+            ktru=ktru,
+            okpd=okpd
+        )
+        for product_name, price, col_names, values, index_num, file_element_type, ktru, okpd in packed_records
+    ]
+
+
+def _parse_and_pack(file_parser, file_content, link: str) -> list[tuple]:
+    return _pack_records(file_parser.parse_records(file_content, link))
+
+
+def _parse_file_and_pack(file_parser, path: str, link: str) -> list[tuple]:
+    with open(path, 'rb') as file:
+        return _parse_and_pack(file_parser, file, link)
+
+
+class ParseExecutor:
+    """
+    Runs XMLParser/HTMLParser.parse_records off the event loop thread, in a thread pool or
+    in a process pool. A process worker opens attachments spooled to disk by their path and
+    is sent the bytes of the others; its results come back as packed tuples.
+    """
+
+    def __init__(self, executor_type: ParseExecutorType = ParseExecutorType.PROCESS, max_workers: int = None):
+        self.executor_type = executor_type
+        match executor_type:
+            case ParseExecutorType.THREAD:
+                self.executor: Executor = ThreadPoolExecutor(max_workers=max_workers)
+            case ParseExecutorType.PROCESS:
+                self.executor: Executor = ProcessPoolExecutor(max_workers=max_workers)
+            case _:
+                raise Exception(f"Parse executor type {executor_type} isn't implemented")
+
+    async def parse(self, file_parser, file_content, link: str) -> list[FileElement]:
+        return file_elements_of(await self.parse_records(file_parser, file_content, link))
+
+    async def parse_records(self, file_parser, file_content, link: str) -> list[ProductRecord]:
+        loop = asyncio.get_running_loop()
+        if self.executor_type == ParseExecutorType.THREAD:
+            return await loop.run_in_executor(self.executor, file_parser.parse_records, file_content, link)
+        path = getattr(file_content, 'path', None)
+        if path is not None:
+            file_content.flush()
+            packed_records = await loop.run_in_executor(
+                self.executor, _parse_file_and_pack, file_parser, path, link)
+            return _unpack_records(packed_records, link)
+        if hasattr(file_content, 'read'):
+            # open files can't be sent to another process, the ones kept in memory are small
+            file_content = file_content.read()
+        packed_records = await loop.run_in_executor(
+            self.executor, _parse_and_pack, file_parser, file_content, link)
+        return _unpack_records(packed_records, link)
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> 'ParseExecutor':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
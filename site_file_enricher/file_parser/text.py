@@ -0,0 +1,22 @@
+import re
+from functools import lru_cache
+
+# BeautifulSoup collapses strings made only of these characters into ' ' or '\n'
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+SPACES_PATTERN = re.compile(r'([ \n]+)')
+# cell texts repeat across rows and links, so they're collapsed once per run
+TEXT_CACHE_SIZE = 16384
+
+
+def collapse_whitespace(text: str) -> str:
+    """
+    A string of the document as BeautifulSoup gives it in `.text`.
+    """
+    if text.strip(ASCII_SPACES) == '':
+        return '\n' if '\n' in text else ' '
+    return text
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def collapse_spaces(text: str) -> str:
+    return SPACES_PATTERN.sub(' ', text)
@@ -1,9 +1,18 @@
+import io
 from dataclasses import dataclass
+from enum import Enum
 from typing import Union
 
 from bs4 import BeautifulSoup, Tag
+from lxml import etree
 
-from site_file_enricher.model.dto import FileColData, FileElement, FileElementType
+from site_file_enricher.file_parser.text import collapse_whitespace
+from site_file_enricher.model.dto import FileElement, FileElementType, ProductRecord, file_elements_of
+
+
+class XMLParserEngine(Enum):
+    BEAUTIFUL_SOUP = 1
+    ITERPARSE = 2
 
 
 @dataclass
@@ -24,75 +33,274 @@ class RootXMLElement:
     children: list[XMLElement]
 
 
-def __get_value__(tag: Tag, xml_element: XMLElement) -> Union[str, None]:
-    if tag is None:
+INDEX_NUM_XML_ELEMENT = XMLElement('indexNum', 'indexNum')
+
+
+def __local_name__(tag) -> Union[str, None]:
+    # comments and processing instructions have a function as a tag
+    if not isinstance(tag, str):
         return None
-    if xml_element.additional is not None:
-        tag = tag.find(xml_element.additional)
-        if tag is None:
-            return None
-    value = tag.find(xml_element.field_name)
-    return value.text if value is not None else None
+    return tag.rpartition('}')[2]
+
+
+def __element_text__(element) -> str:
+    return ''.join(collapse_whitespace(text) for text in element.itertext() if text != '')
+
+
+def __tag_text__(tag: Tag) -> str:
+    return tag.text
+
+
+def __walk_element__(element):
+    for event, descendant in etree.iterwalk(element, events=('start', 'end')):
+        if descendant is not element:
+            yield event, descendant, __local_name__(descendant.tag)
+
+
+def __walk_tag__(tag: Tag):
+    stack = [(tag, iter(tag.children))]
+    while stack:
+        parent, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if stack:
+                yield 'end', parent, parent.name
+            continue
+        if isinstance(child, Tag):
+            yield 'start', child, child.name
+            stack.append((child, iter(child.children)))
+
+
+class XMLExtractionPlan:
+    """
+    XMLElements compiled once, so that the values of all of them are found in one
+    walk over a subtree. A value is the text of the first descendant named
+    `field_name`, inside the first descendant named `additional` if it's set.
+    """
+
+    def __init__(self, xml_elements: list[XMLElement]):
+        keys = [(xml_element.field_name, xml_element.additional) for xml_element in xml_elements]
+        unique_keys = list(dict.fromkeys(keys))
+        self.slot_count = len(unique_keys)
+        self.slots = [unique_keys.index(key) for key in keys]
+        self.fields: dict[str, int] = {}
+        self.containers: dict[str, dict[str, int]] = {}
+        for slot, (field_name, additional) in enumerate(unique_keys):
+            if additional is None:
+                self.fields[field_name] = slot
+            else:
+                self.containers.setdefault(additional, {})[field_name] = slot
+
+    def matcher(self, text_of) -> 'XMLPlanMatcher':
+        return XMLPlanMatcher(self, text_of)
+
+    def extract(self, events, text_of) -> list[Union[str, None]]:
+        matcher = self.matcher(text_of)
+        for event, element, name in events:
+            if event == 'start':
+                matcher.start(element, name)
+            else:
+                matcher.end(element, name)
+            if matcher.is_done():
+                break
+        return matcher.values()
+
+
+class XMLPlanMatcher:
+    """
+    Runs an XMLExtractionPlan over start and end events. A value is taken at the
+    end of its element, so the subtree may be dropped afterwards.
+    """
+
+    def __init__(self, plan: XMLExtractionPlan, text_of):
+        self.plan = plan
+        self.text_of = text_of
+        self.found = [False] * plan.slot_count
+        self.slot_values: list[Union[str, None]] = [None] * plan.slot_count
+        self.unresolved = plan.slot_count
+        self.pending: list[tuple] = []
+        self.open_containers: list[tuple] = []
+        self.seen_containers: set[str] = set()
+
+    def __take__(self, slot: int, element):
+        if self.found[slot]:
+            return
+        self.found[slot] = True
+        for pending_element, slots in self.pending:
+            if pending_element is element:
+                slots.append(slot)
+                return
+        self.pending.append((element, [slot]))
+
+    def start(self, element, name: str):
+        for _, container_fields in self.open_containers:
+            slot = container_fields.get(name)
+            if slot is not None:
+                self.__take__(slot, element)
+        slot = self.plan.fields.get(name)
+        if slot is not None:
+            self.__take__(slot, element)
+        container_fields = self.plan.containers.get(name)
+        if container_fields is not None and name not in self.seen_containers:
+            self.seen_containers.add(name)
+            self.open_containers.append((element, container_fields))
+
+    def end(self, element, name: str):
+        for index, (pending_element, slots) in enumerate(self.pending):
+            if pending_element is element:
+                text = self.text_of(element)
+                for slot in slots:
+                    self.slot_values[slot] = text
+                self.unresolved -= len(slots)
+                del self.pending[index]
+                break
+        for index, (container, container_fields) in enumerate(self.open_containers):
+            if container is element:
+                # fields not found inside the first container stay empty
+                for slot in container_fields.values():
+                    if not self.found[slot]:
+                        self.found[slot] = True
+                        self.unresolved -= 1
+                del self.open_containers[index]
+                break
+
+    def is_done(self) -> bool:
+        return self.unresolved == 0
+
+    def values(self) -> list[Union[str, None]]:
+        return [self.slot_values[slot] for slot in self.plan.slots]
+
+
+def __xml_source__(file) -> tuple:
+    if isinstance(file, io.TextIOBase):
+        file = file.read()
+    if isinstance(file, str):
+        # the text is already decoded, whatever the xml declaration says
+        return io.BytesIO(file.encode('utf-8')), 'utf-8'
+    if isinstance(file, (bytes, bytearray)):
+        return io.BytesIO(file), None
+    return file, None
 
 
 class XMLParser:
-    def __init__(self, root_xml_element: RootXMLElement, additional_data: list[XMLElement] = []):
+    def __init__(self, root_xml_element: RootXMLElement, additional_data: list[XMLElement] = [],
+                 engine: XMLParserEngine = XMLParserEngine.BEAUTIFUL_SOUP):
         self.additional_data = additional_data
         self.root_xml_element = root_xml_element
+        self.engine = engine
         self.col_names = [xml_el.name for xml_el in root_xml_element.children]
         for add_xml_el in additional_data:
             self.col_names.append(add_xml_el.name)
+        self.product_col_names = tuple(xml_el.name for xml_el in root_xml_element.children)
+        self.additional_col_names = tuple(xml_el.name for xml_el in additional_data)
+        self.product_plan = XMLExtractionPlan([
+            root_xml_element.product_xml_element,
+            root_xml_element.price_xml_element,
+            root_xml_element.okpd_xml_element,
+            root_xml_element.ktru_xml_element,
+            INDEX_NUM_XML_ELEMENT
+        ] + root_xml_element.children)
+        self.additional_plan = XMLExtractionPlan(additional_data)
 
     def parse(self, file, link: str) -> list[FileElement]:
-        file_elements = []
+        return file_elements_of(self.parse_records(file, link))
+
+    def parse_records(self, file, link: str) -> list[ProductRecord]:
+        match self.engine:
+            case XMLParserEngine.BEAUTIFUL_SOUP:
+                return self.__parse_with_beautiful_soup__(file, link)
+            case XMLParserEngine.ITERPARSE:
+                return self.__parse_with_iterparse__(file, link)
+            case _:
+                raise Exception(f"XML parser engine {self.engine} isn't implemented")
+
+    def __parse_with_beautiful_soup__(self, file, link: str) -> list[ProductRecord]:
+        records = []
         bs_data = BeautifulSoup(file, "xml")
 
         for child in bs_data.find_all(self.root_xml_element.field_name):
-            product_name = __get_value__(child, self.root_xml_element.product_xml_element)
-            price_product = __get_value__(child, self.root_xml_element.price_xml_element)
-            okpd = __get_value__(child, self.root_xml_element.okpd_xml_element)
-            ktru = __get_value__(child, self.root_xml_element.ktru_xml_element)
-            index_num = child.find('indexNum')
-            if index_num is not None:
-                index_num = int(index_num.text)
-            else:
-                index_num = -1
-            if product_name is None:
+            values = self.product_plan.extract(__walk_tag__(child), __tag_text__)
+            self.__append_product_record__(records, values, link)
+
+        additional_values = self.additional_plan.extract(__walk_tag__(bs_data), __tag_text__)
+        self.__append_additional_record__(records, additional_values, link)
+        return records
+
+    def __parse_with_iterparse__(self, file, link: str) -> list[ProductRecord]:
+        """
+        Streams the document and handles every product subtree once it is complete,
+        then drops it. Nested products are handled with the outermost one, in
+        document order, so the output is the same as of BeautifulSoup.
+        """
+        records = []
+        source, encoding = __xml_source__(file)
+        additional_matcher = self.additional_plan.matcher(__element_text__)
+        products = []
+        open_products = 0
+
+        for event, element in etree.iterparse(source, events=('start', 'end'), encoding=encoding,
+                                              recover=True, huge_tree=True):
+            local_name = __local_name__(element.tag)
+            if event == 'start':
+                additional_matcher.start(element, local_name)
+                if local_name == self.root_xml_element.field_name:
+                    products.append(element)
+                    open_products += 1
                 continue
-            for xml_element_child in self.root_xml_element.children:
-                xml_element_child_value = __get_value__(child, xml_element_child)
-                if xml_element_child_value is None:
-                    continue
-                file_elements.append(
-                    FileElement(
-                        link=link,
-                        product_name=product_name,
-                        price=int(float(price_product) * 100),
-                        okpd=okpd,
-                        ktru=ktru,
-                        file_element_type=FileElementType.XML,
-                        col_data=FileColData(
-                            index_num=index_num,
-                            name=xml_element_child.name,
-                            value=xml_element_child_value)
-                    )
-                )
-
-        for additional_xml_element_child in self.additional_data:
-            xml_element_child_value = __get_value__(bs_data, additional_xml_element_child)
-            if xml_element_child_value is None:
+
+            additional_matcher.end(element, local_name)
+            if local_name != self.root_xml_element.field_name:
+                continue
+            open_products -= 1
+            if open_products != 0:
                 continue
-            file_elements.append(
-                FileElement(
-                    link=link,
-                    product_name='',
-                    price=-1,
-                    file_element_type=FileElementType.XML,
-                    col_data=FileColData(
-                        index_num=-1,
-                        name=additional_xml_element_child.name,
-                        value=xml_element_child_value)
-                )
-            )
-
-        return file_elements
+            for product in products:
+                values = self.product_plan.extract(__walk_element__(product), __element_text__)
+                self.__append_product_record__(records, values, link)
+            products = []
+            element.clear(keep_tail=True)
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+
+        self.__append_additional_record__(records, additional_matcher.values(), link)
+        return records
+
+    def __append_product_record__(self, records: list[ProductRecord], values: list[Union[str, None]], link: str):
+        product_name, price_product, okpd, ktru, index_num = values[:5]
+        if index_num is not None:
+            index_num = int(index_num)
+        else:
+            index_num = -1
+        if product_name is None:
+            return
+        child_values = tuple(values[5:])
+        if all(child_value is None for child_value in child_values):
+            return
+        records.append(ProductRecord(
+            link=link,
+            product_name=product_name,
+            price=int(float(price_product) * 100),
+            col_names=self.product_col_names,
+            values=child_values,
+            index_num=index_num,
+            file_element_type=FileElementType.XML,
+            ktru=ktru,
+            okpd=okpd
+        ))
+
+    def __append_additional_record__(self, records: list[ProductRecord], additional_values: list[Union[str, None]],
+                                     link: str):
+        additional_values = tuple(additional_values)
+        if all(additional_value is None for additional_value in additional_values):
+            return
+        records.append(ProductRecord(
+            link=link,
+            product_name='',
+            price=-1,
+            col_names=self.additional_col_names,
+            values=additional_values,
+            file_element_type=FileElementType.XML
+        ))
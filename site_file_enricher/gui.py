@@ -11,10 +11,12 @@ from toga.constants import COLUMN
 
 from site_file_enricher.io.file_handler import FileFormat, get_handler
 from site_file_enricher.io.site_handler import SiteHandler
-from site_file_enricher.file_parser.xml_parser import XMLParser, RootXMLElement, XMLElement
-from site_file_enricher.file_parser.html_parser import HTMLParser, HTMLElement, HTMLContractFormat, RootTHMLElement
-from site_file_enricher.search.fuzzy import search
-from site_file_enricher.model.dto import FileElementType, OutputElement
+from site_file_enricher.io.crawl_engine import CrawlEngine, DEFAULT_CONCURRENCY
+from site_file_enricher.file_parser.xml_parser import XMLParser, RootXMLElement, XMLElement, XMLParserEngine
+from site_file_enricher.file_parser.html_parser import HTMLParser, HTMLElement, HTMLContractFormat, RootTHMLElement, \
+    HTMLParserEngine
+from site_file_enricher.file_parser.parse_executor import ParseExecutor, ParseExecutorType
+from site_file_enricher.pipeline import EnrichmentPipeline
 
 import logging
 
@@ -77,7 +79,9 @@ class GuiApplication(toga.App):
             ],
             row_step=3
         )
-        htmp_parser = HTMLParser(type_a_root_element, type_b_root_element)
+        htmp_parser = HTMLParser(type_a_root_element, type_b_root_element, HTMLParserEngine.LXML)
+        # contracts are parsed off the event loop of toga, which also runs the downloads and the UI
+        self.parse_executor = ParseExecutor(ParseExecutorType.THREAD)
         self.site_handler = SiteHandler(
             xml_parser=XMLParser(
                 root_xml_element=product_info_root_xml_element,
@@ -89,11 +93,14 @@ class GuiApplication(toga.App):
                     XMLElement('contractorRegistryNum', 'contractorRegistryNum', 'participantInfo'),
                     XMLElement('contractSubject', 'contractSubject', 'contractSubjectInfo'),
                     XMLElement('contractSubjectInfo_sid', 'sid', 'contractSubjectInfo')
-                ]
+                ],
+                engine=XMLParserEngine.ITERPARSE
             ),
-            html_parser=htmp_parser)
+            html_parser=htmp_parser,
+            parse_executor=self.parse_executor)
 
     async def exit_handler(self, app):
+        self.parse_executor.shutdown()
         App.exit(self)
 
     def startup(self):
@@ -274,85 +281,28 @@ class GuiApplication(toga.App):
 
                 link_to_input_elements = self.file_handler.read()
 
-                new_elements = []
-
                 all_count = self.file_handler.read_elements_count()
                 handled_count = 0
 
-                for link in link_to_input_elements:
-                    input_elements = link_to_input_elements[link]
-                    saved = False
-                    try:
-                        logger.info(f'Download and parse xml for {link}')
-                        start = datetime.datetime.now()
-
-                        file_elements = await self.site_handler.download_xml_and_parse(link, self.cert_path)
-                        xml_product_info_els = [file_el for file_el in file_elements
-                                                if
-                                                file_el.product_name != '' and file_el.file_element_type == FileElementType.XML]
-                        html_product_info_els = [file_el for file_el in file_elements if
-                                                file_el.product_name != '' and file_el.file_element_type == FileElementType.HTML]
-                        universal_col_datas = [file_el.col_data for file_el in file_elements if file_el.product_name == '']
-
-                        end = datetime.datetime.now()
-                        logger.info(f'Downloaded and parse xml for {link} -- {end - start}')
-
-                        logger.info(f'Fuzzy search started for link: {link} for xml elements')
-                        start = datetime.datetime.now()
-
-                        searched_output_elements = search(input_elements, xml_product_info_els)
-                        for searched_output_element in searched_output_elements:
-                            searched_output_element.new_col_datas += universal_col_datas
-                        new_elements += searched_output_elements
-
-                        end = datetime.datetime.now()
-                        logger.info(f'Fuzzy search ended for link: {link} for xml elements -- {end - start}')
-
-                        logger.info(f'Fuzzy search stared for link: {link} for html elements')
-                        start = datetime.datetime.now()
-
-                        searched_output_elements = search(input_elements, html_product_info_els)
-                        for searched_output_element in searched_output_elements:
-                            searched_output_element.new_col_datas += universal_col_datas
-                        new_elements += searched_output_elements
-
-                        end = datetime.datetime.now()
-                        logger.info(f'Fuzzy search ended for link: {link} for html elements -- {end - start}')
-
-                        if len(xml_product_info_els) == len(html_product_info_els) == 0 and len(universal_col_datas) != 0:
-                            for input_el in input_elements:
-                                new_elements.append(OutputElement(
-                                    index_in_input_file=input_el.index_in_input_file,
-                                    link=input_el.link,
-                                    new_col_datas=universal_col_datas
-                                ))
-
-                        logger.info(f'Save {len(new_elements)} for {link}')
-                        start = datetime.datetime.now()
-
-                        self.file_handler.write(new_elements, link=link)
-                        saved = True
-
-                        end = datetime.datetime.now()
-                        logger.info(f'Saved {len(new_elements)} for {link} -- {end - start}')
-
-                        new_elements.clear()
-                    except Exception as ex:
-                        logger.error(f'Something happened with {link}: {str(ex)}')
-                        if not saved:
-                            logger.info(f'Save {len(input_elements)} for {link}')
-                            start = datetime.datetime.now()
+                def on_written(link, input_elements):
+                    nonlocal handled_count
+                    handled_count += len(input_elements)
+                    self.progress_bar.value = round(100 * (handled_count / all_count))
+                    print(self.progress_bar.value)
 
-                            self.file_handler.write([], link=link)
+                    self.info_box.value = f"Обработано {len(input_elements)} элементов для ссылки = {link}\n\n" + self.info_box.value
 
-                            end = datetime.datetime.now()
-                            logger.info(f'Saved {len(input_elements)} for {link} -- {end - start}')
+                start = datetime.datetime.now()
 
-                    handled_count += len(link_to_input_elements[link])
-                    self.progress_bar.value = round(100 * (handled_count / all_count))
-                    print(self.progress_bar.value)
+                crawl_engine = CrawlEngine(self.site_handler, self.cert_path, concurrency=DEFAULT_CONCURRENCY)
+                pipeline = EnrichmentPipeline(crawl_engine, self.file_handler, on_written=on_written)
+                pipeline_stats = await pipeline.run(link_to_input_elements)
 
-                    self.info_box.value = f"Обработано {len(link_to_input_elements[link])} элементов для ссылки = {link}\n\n" + self.info_box.value
+                end = datetime.datetime.now()
+                logger.info(f'Handled {len(link_to_input_elements)} links -- {end - start}')
+                for stage, stage_stats in pipeline_stats.stages.items():
+                    logger.info(f'Stage {stage}: {stage_stats.processed} links, busy {stage_stats.busy_time:.1f}s, '
+                                f'max queue depth {stage_stats.max_queue_depth}')
 
                 self.label.text = f"Закончена обработка файла {self.file_name}"
                 self.file_name = None
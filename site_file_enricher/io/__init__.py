@@ -1,2 +1,14 @@
 from site_file_enricher.io.file_handler import *
 from site_file_enricher.io.site_handler import *
+from site_file_enricher.io.crawl_engine import *
+from site_file_enricher.io.rate_limiter import *
+from site_file_enricher.io.session_manager import *
+from site_file_enricher.io.urls import *
+from site_file_enricher.io.response_cache import *
+from site_file_enricher.io.path_predictor import *
+from site_file_enricher.io.retry_policy import *
+from site_file_enricher.io.circuit_breaker import *
+from site_file_enricher.io.timeouts import *
+from site_file_enricher.io.attachment_spool import *
+from site_file_enricher.io.single_flight import *
+from site_file_enricher.io.page_extractor import *
@@ -0,0 +1,105 @@
+import io
+import os
+import tempfile
+from dataclasses import dataclass
+
+from aiohttp import ClientResponse
+
+DEFAULT_MAX_ATTACHMENT_SIZE_BYTES = 64 * 1024 * 1024
+DEFAULT_SPOOL_MEMORY_BYTES = 1024 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class AttachmentTooLargeError(Exception):
+    pass
+
+
+@dataclass
+class AttachmentSettings:
+    """
+    Attachments are streamed in `chunk_size` pieces into a temporary file kept in
+    memory up to `spool_memory_bytes`, and rejected over `max_size_bytes`.
+    """
+    max_size_bytes: int = DEFAULT_MAX_ATTACHMENT_SIZE_BYTES
+    spool_memory_bytes: int = DEFAULT_SPOOL_MEMORY_BYTES
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+
+class AttachmentSpool:
+    """
+    Attachment bytes kept in memory up to `memory_bytes` and in a named temporary file
+    over it. Unlike SpooledTemporaryFile the file on disk has a `path`, so a parse worker
+    process can open it instead of being sent the whole content.
+    """
+
+    def __init__(self, memory_bytes: int):
+        self.memory_bytes = memory_bytes
+        self.file = io.BytesIO()
+        self.path: str | None = None
+
+    def __roll_over__(self):
+        descriptor, self.path = tempfile.mkstemp(prefix='attachment-')
+        file = os.fdopen(descriptor, 'w+b')
+        file.write(self.file.getbuffer())
+        file.seek(self.file.tell())
+        self.file = file
+
+    def write(self, data: bytes) -> int:
+        written = self.file.write(data)
+        if self.path is None and self.file.tell() > self.memory_bytes:
+            self.__roll_over__()
+        return written
+
+    def read(self, size: int = -1) -> bytes:
+        return self.file.read(size)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self.file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.file.tell()
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+    def __enter__(self) -> 'AttachmentSpool':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def spool_bytes(body: bytes, settings: AttachmentSettings) -> AttachmentSpool:
+    spool = AttachmentSpool(settings.spool_memory_bytes)
+    spool.write(body)
+    spool.seek(0)
+    return spool
+
+
+async def spool_response(response: ClientResponse, link: str, settings: AttachmentSettings) -> AttachmentSpool:
+    if response.content_length is not None and response.content_length > settings.max_size_bytes:
+        raise AttachmentTooLargeError(
+            f'{link} is {response.content_length} bytes, more than {settings.max_size_bytes} allowed')
+
+    spool = AttachmentSpool(settings.spool_memory_bytes)
+    try:
+        size = 0
+        async for chunk in response.content.iter_chunked(settings.chunk_size):
+            size += len(chunk)
+            if size > settings.max_size_bytes:
+                raise AttachmentTooLargeError(f'{link} is more than {settings.max_size_bytes} bytes allowed')
+            spool.write(chunk)
+        spool.seek(0)
+        return spool
+    except BaseException:
+        spool.close()
+        raise
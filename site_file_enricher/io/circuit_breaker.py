@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from enum import Enum
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+DEFAULT_MAX_RESET_TIMEOUT = 600.0
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    CLOSED = 1
+    OPEN = 2
+    HALF_OPEN = 3
+
+
+@dataclass
+class CircuitBreakerStats:
+    openings: int = 0
+    paused_requests: int = 0
+    total_pause: float = 0.0
+
+
+class CircuitBreaker:
+    """
+    Shared by every request of the crawler. After `failure_threshold` failures in a
+    row the circuit opens and all requests wait for `reset_timeout`; then a single
+    trial request is let through. Its success closes the circuit, its failure opens
+    it again for twice as long, up to `max_reset_timeout`.
+    Retry-After of the site pauses all requests the same way through `pause`.
+    """
+
+    def __init__(self,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 max_reset_timeout: float = DEFAULT_MAX_RESET_TIMEOUT):
+        if failure_threshold < 1:
+            raise ValueError(f"Failure threshold should be positive, got {failure_threshold}")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.current_reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.paused_until = 0.0
+        self.trial_deadline = 0.0
+        self.stats = CircuitBreakerStats()
+
+    def __next_delay__(self) -> float:
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        match self.state:
+            case CircuitState.CLOSED:
+                return 0.0
+            case CircuitState.OPEN:
+                if now < self.open_until:
+                    return self.open_until - now
+                logger.info('Circuit breaker is half open, letting a trial request through')
+                self.state = CircuitState.HALF_OPEN
+                self.trial_deadline = now + self.current_reset_timeout
+                return 0.0
+            case CircuitState.HALF_OPEN:
+                # the trial request may be cancelled without reporting back
+                if now >= self.trial_deadline:
+                    self.trial_deadline = now + self.current_reset_timeout
+                    return 0.0
+                return min(1.0, self.trial_deadline - now)
+
+    async def wait(self) -> float:
+        delay = self.__next_delay__()
+        if delay <= 0:
+            return 0.0
+        start = time.monotonic()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.__next_delay__()
+        waited = time.monotonic() - start
+        self.stats.paused_requests += 1
+        self.stats.total_pause += waited
+        return waited
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        if self.state != CircuitState.CLOSED:
+            logger.info('Circuit breaker is closed')
+        self.state = CircuitState.CLOSED
+        self.current_reset_timeout = self.reset_timeout
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        match self.state:
+            case CircuitState.HALF_OPEN:
+                self.current_reset_timeout = min(self.max_reset_timeout, self.current_reset_timeout * 2)
+                self.__open__()
+            case CircuitState.CLOSED if self.consecutive_failures >= self.failure_threshold:
+                self.__open__()
+
+    def __open__(self):
+        logger.warning(f'Circuit breaker is open for {self.current_reset_timeout:.1f}s '
+                       f'after {self.consecutive_failures} failures in a row')
+        self.state = CircuitState.OPEN
+        self.open_until = time.monotonic() + self.current_reset_timeout
+        self.stats.openings += 1
@@ -0,0 +1,25 @@
+import asyncio
+
+from site_file_enricher.io.site_handler import SiteHandler
+from site_file_enricher.model.dto import ProductRecord
+
+DEFAULT_CONCURRENCY = 8
+
+
+class CrawlEngine:
+    """
+    Runs up to `concurrency` contract links at once on the current event loop.
+    EnrichmentPipeline keeps the links in the input order.
+    """
+
+    def __init__(self, site_handler: SiteHandler, cert_abs_path: str, concurrency: int = DEFAULT_CONCURRENCY):
+        if concurrency < 1:
+            raise ValueError(f"Concurrency should be positive, got {concurrency}")
+        self.site_handler = site_handler
+        self.cert_abs_path = cert_abs_path
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(self, link: str) -> list[ProductRecord]:
+        async with self.semaphore:
+            return await self.site_handler.download_xml_and_parse(link, self.cert_abs_path)
@@ -5,8 +5,9 @@ from enum import Enum
 import pandas as pd
 import datetime
 from typing_extensions import TextIO
-from openpyxl import Workbook
 
+from site_file_enricher.io.urls import contract_key
+from site_file_enricher.model.column_schema import CompactOutputElement
 from site_file_enricher.model.dto import InputElement, OutputElement
 
 
@@ -15,6 +16,25 @@ class FileFormat(Enum):
     XLSX = 2
 
 
+def merge_contract_links(link_to_input_elements: dict[str, list[InputElement]]) \
+        -> tuple[dict[str, list[InputElement]], dict[str, list[str]]]:
+    """
+    Merges the groups of raw links that point to the same contract. A merged group is
+    crawled by its first raw link; the second dict gives every raw link of the group.
+    """
+    key_to_link = {}
+    merged = {}
+    link_variants = {}
+    for link, input_elements in link_to_input_elements.items():
+        merged_link = key_to_link.setdefault(contract_key(link), link)
+        merged.setdefault(merged_link, []).extend(input_elements)
+        link_variants.setdefault(merged_link, []).append(link)
+    for merged_link in merged:
+        if len(link_variants[merged_link]) > 1:
+            merged[merged_link].sort(key=lambda input_element: input_element.index_in_input_file)
+    return merged, link_variants
+
+
 class FileHandler(ABC):
 
     @abstractmethod
@@ -34,7 +54,7 @@ class FileHandler(ABC):
         pass
 
     @abstractmethod
-    def write(self, additional_elements: list[OutputElement], link):
+    def write(self, additional_elements: list[OutputElement | CompactOutputElement], link):
         """
 
         :param elements:
@@ -64,6 +84,7 @@ class XLXSFileHandler(FileHandler):
         self.count_saved_rows = 0
         self.file_number = 0
         self.file_row_count = file_row_count
+        self.link_variants = {}
 
     def read_elements_count(self) -> int:
         return len(self.df.index)
@@ -89,6 +110,7 @@ class XLXSFileHandler(FileHandler):
                 elements[url].append(element)
             else:
                 elements[url] = [element]
+        elements, self.link_variants = merge_contract_links(elements)
         return elements
 
     @staticmethod
@@ -98,15 +120,15 @@ class XLXSFileHandler(FileHandler):
                 return row[name]
         return ''
 
-    def write(self, additional_elements: list[OutputElement], link = None):
+    def write(self, additional_elements: list[OutputElement | CompactOutputElement], link = None):
         print(f'Link: {link}:, current rows count: {self.count_saved_rows}')
         for new_el in additional_elements:
-            for file_col in new_el.new_col_datas:
-                self.df.loc[new_el.index_in_input_file, file_col.name] = file_col.value
+            for col_name, col_value in new_el.columns():
+                self.df.loc[new_el.index_in_input_file, col_name] = col_value
 
         start = datetime.datetime.now()
 
-        saved_data = self.df[self.df['Ссылка на источник'] == link]
+        saved_data = self.df[self.df['Ссылка на источник'].isin(self.link_variants.get(link, [link]))]
         print(f'TEST: Link: {link}: {len(saved_data)}, current rows count: {self.count_saved_rows}')
 
         saved_len = len(saved_data)
@@ -168,20 +190,23 @@ class TSVFileHandler(FileHandler):
             else:
                 elements[url] = [element]
         self.input_file = input_file_line
+        # the whole file is written at once, so the raw links of a merged group aren't needed
+        elements, _ = merge_contract_links(elements)
         return elements
 
-    def write(self, additional_elements: list[OutputElement], link = None):
+    def write(self, additional_elements: list[OutputElement | CompactOutputElement], link = None):
+        element_columns = [element.columns() for element in additional_elements]
         col_data_names = list(
-            set([col_data.name for element in additional_elements for col_data in element.new_col_datas]))
+            set([col_name for columns in element_columns for col_name, _ in columns]))
         col_data_names.sort()
 
         header = self.input_file_data[0]
         self.output_file.writerow(header + col_data_names)
 
         new_info_by_line = {}
-        for element in additional_elements:
+        for element, columns in zip(additional_elements, element_columns):
             new_info = []
-            added_info = dict({(ncd.name, ncd.value) for ncd in element.new_col_datas})
+            added_info = dict(set(columns))
             for col_data_name in col_data_names:
                 if col_data_name in added_info:
                     new_info.append(added_info[col_data_name])
@@ -0,0 +1,154 @@
+import codecs
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Union
+from urllib.parse import parse_qs, urlsplit
+
+from cssselect import HTMLTranslator
+from lxml import etree, html
+
+from site_file_enricher.io.urls import canonical_url
+
+ATTACHMENTS_CSSSELECT_EXPRESSION = 'section.card-attachments .b-bottom .card-attachments-container .card-attachments__block .attachment .row .col-6 .row .col-12 .attachment__value a[href^="http"]'
+ATTACHMENTS_LINKS_CSSSELECT_EXPRESSION = '.cardWrapper .wrapper .cardHeaderBlock .tabsNav__item'
+SUBJECT_TITLES_CSSSELECT_EXPRESSION = '.cardWrapper .wrapper .container .row .col .blockInfo__section .section__title'
+SUBJECT_INFO_CSSSELECT_EXPRESSION = '.cardWrapper .wrapper .container .row .col .blockInfo__section .section__info'
+CUSTOMER_CSSSELECT_EXPRESSION = '.cardWrapper .wrapper .container .row .col .blockInfo__section .section__info a[href*="organizationCode="]'
+SCRIPTS_CSSSELECT_EXPRESSION = 'script'
+SUBJECT_TITLE = 'Предмет договора'
+DEFAULT_PAGE_FACTS_CACHE_SIZE = 4096
+DEFAULT_PAGE_ENCODING = 'utf-8'
+
+TAB_LINK_CLASS = 'tabsNav__item'
+SUBJECT_TITLE_CLASS = 'section__title'
+SUBJECT_INFO_CLASS = 'section__info'
+HTML_CONTRACT_LINK_PATTERN = re.compile(r'\'([^\']+)\'')
+CUSTOMER_CODE_PARAMETER = 'organizationCode'
+
+# every selector of a card page in one xpath, so that a page is walked only once
+PAGE_NODES_XPATH = etree.XPath(' | '.join(
+    HTMLTranslator().css_to_xpath(expression) for expression in [
+        ATTACHMENTS_CSSSELECT_EXPRESSION,
+        ATTACHMENTS_LINKS_CSSSELECT_EXPRESSION,
+        SUBJECT_TITLES_CSSSELECT_EXPRESSION,
+        SUBJECT_INFO_CSSSELECT_EXPRESSION,
+        CUSTOMER_CSSSELECT_EXPRESSION,
+        SCRIPTS_CSSSELECT_EXPRESSION
+    ]
+))
+
+
+@lru_cache(maxsize=16)
+def __html_parser_for__(encoding: str) -> html.HTMLParser:
+    return html.HTMLParser(encoding=encoding)
+
+
+def build_dom(body: bytes, encoding: Union[str, None] = None):
+    """
+    Hands the raw bytes and the declared charset straight to libxml2, without
+    decoding the page into a str first.
+    """
+    try:
+        encoding = codecs.lookup(encoding or DEFAULT_PAGE_ENCODING).name
+    except LookupError:
+        encoding = DEFAULT_PAGE_ENCODING
+    return html.fromstring(body, parser=__html_parser_for__(encoding))
+
+
+@dataclass(frozen=True)
+class PageFacts:
+    """
+    Everything SiteHandler needs from a card page. Links of the contract draft and
+    documents tabs are relative (path and query), so facts don't depend on the site url.
+    """
+    subject: Union[str, None] = None
+    contract_draft_path: str = ''
+    attachments_path: str = ''
+    html_contract_link: Union[str, None] = None
+    # (title, href) of every attachment in the order of the page
+    attachments: tuple[tuple[str, str], ...] = ()
+    # regNum of the customer from the link to its organization card
+    customer_reg_num: Union[str, None] = None
+
+
+def __tab_path__(tab_links: list[str], marker: str, path: str) -> str:
+    for link in tab_links:
+        if marker in link:
+            link_parts = link.split('?')
+            if len(link_parts) == 2:
+                return f'{path}?{link_parts[1]}'
+    return ''
+
+
+def __customer_reg_num__(href: str) -> Union[str, None]:
+    codes = parse_qs(urlsplit(href).query).get(CUSTOMER_CODE_PARAMETER)
+    return codes[0] if codes else None
+
+
+def extract_page_facts(dom) -> PageFacts:
+    tab_links = []
+    titles = []
+    infos = []
+    attachments = []
+    html_contract_link = None
+    customer_reg_num = None
+    for node in PAGE_NODES_XPATH(dom):
+        if node.tag == 'script':
+            if html_contract_link is None and node.text is not None and 'uid' in node.text:
+                match = HTML_CONTRACT_LINK_PATTERN.search(node.text)
+                if match is not None:
+                    html_contract_link = match.group(1)
+            continue
+        classes = (node.get('class') or '').split()
+        if TAB_LINK_CLASS in classes:
+            tab_links.append(node.get('href') or '')
+        elif SUBJECT_TITLE_CLASS in classes:
+            titles.append(node)
+        elif SUBJECT_INFO_CLASS in classes:
+            infos.append(node)
+        elif node.tag == 'a' and f'{CUSTOMER_CODE_PARAMETER}=' in (node.get('href') or ''):
+            if customer_reg_num is None:
+                customer_reg_num = __customer_reg_num__(node.get('href'))
+        elif node.tag == 'a':
+            attachments.append((node.get('title'), node.get('href')))
+
+    subject = next((info.text for title, info in zip(titles, infos) if title.text == SUBJECT_TITLE), None)
+    return PageFacts(
+        subject=subject,
+        contract_draft_path=__tab_path__(tab_links, 'contract-draft', '/epz/order/notice/rpec/contract-draft.html'),
+        attachments_path=__tab_path__(tab_links, 'contractInfoId', '/epz/contract/contractCard/document-info.html'),
+        html_contract_link=html_contract_link,
+        attachments=tuple(attachments),
+        customer_reg_num=customer_reg_num
+    )
+
+
+class PageFactsCache:
+    """
+    Bounded LRU of page facts by canonical url, so a page seen again isn't parsed again.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_PAGE_FACTS_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, PageFacts] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, link: str) -> Union[PageFacts, None]:
+        key = canonical_url(link)
+        page_facts = self.entries.get(key)
+        if page_facts is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return page_facts
+
+    def put(self, link: str, page_facts: PageFacts):
+        key = canonical_url(link)
+        self.entries[key] = page_facts
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
@@ -0,0 +1,86 @@
+import json
+import os
+from enum import Enum
+from typing import Union
+from urllib.parse import parse_qs, urlsplit
+
+# budget level digit and the customer code at the start of a registry number
+DEFAULT_PREFIX_LENGTH = 11
+DEFAULT_MIN_OBSERVATIONS = 2
+REGISTRY_NUMBER_PARAMETERS = ['reestrNumber', 'regNumber']
+
+
+class ContractPath(Enum):
+    SUBJECT = 1
+    CONTRACT_DRAFT = 2
+    ATTACHMENTS = 3
+
+
+def registry_number(contract_link: str) -> Union[str, None]:
+    query = parse_qs(urlsplit(contract_link).query)
+    for parameter in REGISTRY_NUMBER_PARAMETERS:
+        if parameter in query and query[parameter][0] != '':
+            return query[parameter][0]
+    return None
+
+
+class PathPredictor:
+    """
+    Remembers which path (subject only, contract draft or attachments) gave data
+    for every customer regNum and registry number prefix, so that new links of
+    the same customer can try that path first.
+    The table is kept in a small json file when `file_path` is set.
+    """
+
+    def __init__(self,
+                 file_path: str = None,
+                 prefix_length: int = DEFAULT_PREFIX_LENGTH,
+                 min_observations: int = DEFAULT_MIN_OBSERVATIONS):
+        self.file_path = file_path
+        self.prefix_length = prefix_length
+        self.min_observations = min_observations
+        self.predictions = 0
+        self.correct_predictions = 0
+        self.table: dict[str, dict[str, int]] = {}
+        if file_path is not None and os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as file:
+                self.table = json.load(file)
+
+    def __keys__(self, contract_link: str, customer_reg_num: str = None) -> list[str]:
+        keys = []
+        if customer_reg_num:
+            keys.append(f'customer:{customer_reg_num}')
+        number = registry_number(contract_link)
+        if number is not None and len(number) >= self.prefix_length:
+            keys.append(f'prefix:{number[:self.prefix_length]}')
+        return keys
+
+    def predict(self, contract_link: str, customer_reg_num: str = None) -> Union[ContractPath, None]:
+        for key in self.__keys__(contract_link, customer_reg_num):
+            path_counts = self.table.get(key)
+            if path_counts is None or sum(path_counts.values()) < self.min_observations:
+                continue
+            return ContractPath[max(path_counts, key=path_counts.get)]
+        return None
+
+    def record(self, contract_link: str, path: ContractPath, customer_reg_num: str = None,
+               predicted_path: ContractPath = None):
+        """
+        `predicted_path` is the prediction the probes were run in order of, if any,
+        so that only predictions which changed something count in the hit rate.
+        """
+        if predicted_path is not None:
+            self.predictions += 1
+            if predicted_path == path:
+                self.correct_predictions += 1
+        for key in self.__keys__(contract_link, customer_reg_num):
+            path_counts = self.table.setdefault(key, {})
+            path_counts[path.name] = path_counts.get(path.name, 0) + 1
+
+    def save(self):
+        if self.file_path is None:
+            return
+        tmp_file_path = f'{self.file_path}.tmp'
+        with open(tmp_file_path, 'w', encoding='utf-8') as file:
+            json.dump(self.table, file, ensure_ascii=False)
+        os.replace(tmp_file_path, self.file_path)
@@ -0,0 +1,104 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+# zakupki.gov.ru used to be crawled with a 1-2 seconds pause between requests
+DEFAULT_REQUESTS_PER_SECOND = 1.0
+DEFAULT_BURST = 1
+DEFAULT_JITTER = 1.0
+
+
+@dataclass
+class RateLimiterStats:
+    requests: int = 0
+    delayed_requests: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.requests if self.requests != 0 else 0.0
+
+
+class TokenBucket:
+    def __init__(self, requests_per_second: float, burst: int):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def reserve(self) -> float:
+        """
+        Takes one token and returns how long the caller should wait before using it.
+        The bucket may go into debt, so that concurrent callers are spread in time.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.requests_per_second)
+        self.updated_at = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.requests_per_second
+
+    def refund(self):
+        # a reserved token that wasn't used, e.g. its request was cancelled while waiting
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class RateLimiter:
+    """
+    Per host token bucket limiter. Waiting is done with asyncio.sleep, so requests
+    to different hosts and requests already let through overlap freely.
+    """
+
+    def __init__(self,
+                 requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                 burst: int = DEFAULT_BURST,
+                 jitter: float = DEFAULT_JITTER):
+        if requests_per_second <= 0:
+            raise ValueError(f"Requests per second should be positive, got {requests_per_second}")
+        if burst < 1:
+            raise ValueError(f"Burst should be positive, got {burst}")
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.jitter = jitter
+        self.buckets: dict[str, TokenBucket] = {}
+        self.stats: dict[str, RateLimiterStats] = {}
+
+    async def acquire(self, link: str) -> float:
+        host = urlsplit(link).hostname or ''
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+            self.stats[host] = RateLimiterStats()
+
+        bucket = self.buckets[host]
+        token_wait = bucket.reserve()
+        delay = token_wait
+        if self.jitter > 0:
+            delay += random.uniform(0, self.jitter)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                bucket.refund()
+                raise
+
+        stats = self.stats[host]
+        stats.requests += 1
+        stats.total_wait += delay
+        stats.max_wait = max(stats.max_wait, delay)
+        # jitter is added to every request, only waiting for a token means the bucket is drained
+        if token_wait > 0:
+            stats.delayed_requests += 1
+        return delay
+
+    def total_stats(self) -> RateLimiterStats:
+        total = RateLimiterStats()
+        for stats in self.stats.values():
+            total.requests += stats.requests
+            total.delayed_requests += stats.delayed_requests
+            total.total_wait += stats.total_wait
+            total.max_wait = max(total.max_wait, stats.max_wait)
+        return total
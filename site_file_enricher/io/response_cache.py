@@ -0,0 +1,159 @@
+import asyncio
+import os
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Union
+
+from site_file_enricher.io.urls import canonical_url
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_SIZE_BYTES = 512 * 1024 * 1024
+CACHE_FILE_NAME = 'responses.sqlite3'
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    encoding: Union[str, None] = None
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+
+class ResponseCache:
+    """
+    On-disk cache of successful response bodies keyed by canonical url.
+    Bodies are stored zlib-compressed; the least recently used entries are
+    evicted once the compressed size goes over `max_size_bytes`.
+    In offline mode expired entries are still served and nothing is downloaded.
+    The connection lives in one worker thread, so queries and (de)compression
+    run off the event loop with `async_get`, `async_put` and `async_put_file`.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+                 offline: bool = False,
+                 compression_level: int = 6):
+        os.makedirs(directory, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = max_size_bytes
+        self.offline = offline
+        self.compression_level = compression_level
+        self.stats = CacheStats()
+        self.last_access = 0.0
+        self.connection = None
+        self.size_bytes = 0
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='response-cache')
+        self.executor.submit(self.__connect__, os.path.join(directory, CACHE_FILE_NAME)).result()
+
+    def __connect__(self, file_path: str):
+        self.connection = sqlite3.connect(file_path, isolation_level=None)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, body BLOB NOT NULL, encoding TEXT, size INTEGER NOT NULL, '
+            'stored_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self.connection.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+        self.size_bytes = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def __access_time__(self) -> float:
+        # strictly increasing, so that LRU order is stable within one clock tick
+        self.last_access = max(time.time(), self.last_access + 1e-6)
+        return self.last_access
+
+    def get(self, link: str) -> Union[CachedResponse, None]:
+        return self.executor.submit(self.__lookup__, link).result()
+
+    def put(self, link: str, response: CachedResponse):
+        self.executor.submit(self.__store__, link, response).result()
+
+    async def async_get(self, link: str) -> Union[CachedResponse, None]:
+        return await asyncio.wrap_future(self.executor.submit(self.__lookup__, link))
+
+    async def async_put(self, link: str, response: CachedResponse):
+        await asyncio.wrap_future(self.executor.submit(self.__store__, link, response))
+
+    def put_file(self, link: str, path: str, encoding: Union[str, None] = None):
+        self.executor.submit(self.__store_file__, link, path, encoding).result()
+
+    async def async_put_file(self, link: str, path: str, encoding: Union[str, None] = None):
+        await asyncio.wrap_future(self.executor.submit(self.__store_file__, link, path, encoding))
+
+    def __lookup__(self, link: str) -> Union[CachedResponse, None]:
+        key = canonical_url(link)
+        row = self.connection.execute(
+            'SELECT body, encoding, stored_at FROM responses WHERE key = ?', (key,)).fetchone()
+        if row is None or (not self.offline and time.time() - row[2] > self.ttl_seconds):
+            self.stats.misses += 1
+            return None
+        self.connection.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (self.__access_time__(), key))
+        self.stats.hits += 1
+        return CachedResponse(body=zlib.decompress(row[0]), encoding=row[1])
+
+    def __store__(self, link: str, response: CachedResponse):
+        self.__store_body__(link, zlib.compress(response.body, self.compression_level), response.encoding)
+
+    def __store_file__(self, link: str, path: str, encoding: Union[str, None]):
+        # the file is compressed chunk by chunk, so only the compressed body is held in memory
+        compressor = zlib.compressobj(self.compression_level)
+        parts = []
+        size = 0
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(FILE_CHUNK_SIZE), b''):
+                part = compressor.compress(chunk)
+                size += len(part)
+                if size > self.max_size_bytes:
+                    return
+                parts.append(part)
+        parts.append(compressor.flush())
+        self.__store_body__(link, b''.join(parts), encoding)
+
+    def __store_body__(self, link: str, body: bytes, encoding: Union[str, None]):
+        if len(body) > self.max_size_bytes:
+            return
+        key = canonical_url(link)
+        now = self.__access_time__()
+        previous = self.connection.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+        if previous is not None:
+            self.size_bytes -= previous[0]
+        self.connection.execute(
+            'INSERT OR REPLACE INTO responses (key, body, encoding, size, stored_at, accessed_at) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (key, body, encoding, len(body), now, now))
+        self.size_bytes += len(body)
+        self.stats.stores += 1
+        self.__evict__()
+
+    def __evict__(self):
+        while self.size_bytes > self.max_size_bytes:
+            rows = self.connection.execute(
+                'SELECT key, size FROM responses ORDER BY accessed_at LIMIT 32').fetchall()
+            if len(rows) == 0:
+                break
+            for key, size in rows:
+                if self.size_bytes <= self.max_size_bytes:
+                    break
+                self.connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self.size_bytes -= size
+                self.stats.evictions += 1
+
+    def close(self):
+        self.executor.submit(self.connection.close).result()
+        self.executor.shutdown()
+
+    def __enter__(self) -> 'ResponseCache':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,71 @@
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Union
+
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+DEFAULT_MAX_RETRY_AFTER = 300.0
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryableResponseError(Exception):
+    def __init__(self, link: str, status: int, retry_after: Union[float, None] = None):
+        super().__init__(f'{link} answered with {status}')
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Union[str, None]) -> Union[float, None]:
+    """
+    Retry-After is either a number of seconds or an HTTP date.
+    """
+    if value is None or value.strip() == '':
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryStats:
+    retries: int = 0
+    failed_requests: int = 0
+    total_backoff: float = 0.0
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Jittered exponential backoff: attempt n waits base_delay * multiplier ** (n - 1),
+    capped by max_delay, with up to `jitter` of it taken off at random.
+    A Retry-After from the site is never undercut.
+    """
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    base_delay: float = DEFAULT_BASE_DELAY
+    max_delay: float = DEFAULT_MAX_DELAY
+    multiplier: float = 2.0
+    jitter: float = 0.5
+    max_retry_after: float = DEFAULT_MAX_RETRY_AFTER
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError(f"Max attempts should be positive, got {self.max_attempts}")
+        if not 0 <= self.jitter <= 1:
+            raise ValueError(f"Jitter should be between 0 and 1, got {self.jitter}")
+
+    def should_retry(self, attempt: int) -> bool:
+        return attempt < self.max_attempts
+
+    def backoff(self, attempt: int, retry_after: Union[float, None] = None) -> float:
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        delay *= 1 - random.uniform(0, self.jitter)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_retry_after))
+        return delay
@@ -0,0 +1,51 @@
+import ssl
+from dataclasses import dataclass
+from functools import lru_cache
+
+from aiohttp import ClientSession, TCPConnector
+
+
+@dataclass
+class ConnectionSettings:
+    limit: int = 100
+    limit_per_host: int = 8
+    ttl_dns_cache: int = 300
+    keepalive_timeout: float = 30.0
+
+
+@lru_cache(maxsize=8)
+def build_ssl_context(cert_abs_path: str) -> ssl.SSLContext:
+    context = ssl.SSLContext(protocol=ssl.PROTOCOL_TLS)
+    context.load_verify_locations(cert_abs_path)
+    return context
+
+
+class SessionManager:
+    """
+    Owns one pooled ClientSession and one SSLContext for the whole run, so links
+    share keep-alive connections instead of paying a TCP and TLS handshake each.
+    """
+
+    def __init__(self, cert_abs_path: str, settings: ConnectionSettings = None, headers: dict = None):
+        self.cert_abs_path = cert_abs_path
+        self.settings = settings if settings is not None else ConnectionSettings()
+        self.headers = headers
+        self.ssl_context = None
+        self.session = None
+
+    async def __aenter__(self) -> 'SessionManager':
+        self.ssl_context = build_ssl_context(self.cert_abs_path)
+        connector = TCPConnector(
+            ssl=self.ssl_context,
+            limit=self.settings.limit,
+            limit_per_host=self.settings.limit_per_host,
+            ttl_dns_cache=self.settings.ttl_dns_cache,
+            keepalive_timeout=self.settings.keepalive_timeout
+        )
+        self.session = ClientSession(headers=self.headers, connector=connector)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.session is not None:
+            await self.session.close()
+        self.session = None
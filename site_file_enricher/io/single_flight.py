@@ -0,0 +1,49 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int = 0
+    shared_calls: int = 0
+
+
+class Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one running call and its result.
+    The call is cancelled only when every caller waiting for it is cancelled.
+    """
+
+    def __init__(self):
+        self.flights: dict[Hashable, Flight] = {}
+        self.stats = SingleFlightStats()
+
+    def __finish__(self, key: Hashable, flight: Flight):
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats.calls += 1
+        flight = self.flights.get(key)
+        if flight is None:
+            flight = Flight(asyncio.ensure_future(call()))
+            self.flights[key] = flight
+            flight.task.add_done_callback(lambda _: self.__finish__(key, flight))
+        else:
+            self.stats.shared_calls += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                self.__finish__(key, flight)
@@ -1,27 +1,39 @@
-import ssl
-import time
+import asyncio
 import warnings
 import re
+from contextlib import asynccontextmanager, nullcontext
 
-import numpy
+import aiohttp
 import requests
-from aiohttp import ClientSession
-from lxml import html as parser
 
 from site_file_enricher.file_parser.xml_parser import XMLParser
 from site_file_enricher.file_parser.html_parser import HTMLParser
-from site_file_enricher.model.dto import FileColData, FileElement, FileElementType
+from site_file_enricher.file_parser.parse_executor import ParseExecutor
+from site_file_enricher.io.attachment_spool import AttachmentSettings, AttachmentSpool, spool_bytes, \
+    spool_response
+from site_file_enricher.io.circuit_breaker import CircuitBreaker
+from site_file_enricher.io.page_extractor import PageFacts, PageFactsCache, build_dom, extract_page_facts
+from site_file_enricher.io.path_predictor import ContractPath, PathPredictor
+from site_file_enricher.io.rate_limiter import RateLimiter
+from site_file_enricher.io.retry_policy import (RETRYABLE_STATUSES, RetryableResponseError, RetryPolicy, RetryStats,
+                                                parse_retry_after)
+from site_file_enricher.io.response_cache import CachedResponse, ResponseCache
+from site_file_enricher.io.session_manager import ConnectionSettings, SessionManager
+from site_file_enricher.io.single_flight import SingleFlight
+from site_file_enricher.io.timeouts import LinkBudget, RequestKind, TimeoutSettings, current_link_budget, \
+    link_budget_paused
+from site_file_enricher.io.urls import canonical_url
+from site_file_enricher.model.dto import FileElementType, ProductRecord
 
 warnings.filterwarnings('ignore')
 
 USER_AGENT_VALUE = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36"
 HEADERS = {'User-Agent': USER_AGENT_VALUE}
+ZAKUPKI_BASE_URL = 'https://zakupki.gov.ru'
 COOKIES = {'doNotAdviseToChangeLocationWhenIosReject': 'true',
            'sslCertificateChecker.timeout': '1740140953638'}
-ATTACHMENTS_CSSSELECT_EXPRESSION = 'section.card-attachments .b-bottom .card-attachments-container .card-attachments__block .attachment .row .col-6 .row .col-12 .attachment__value a[href^="http"]'
-ATTACHMENTS_LINKS_CSSSELECT_EXPRESSION = '.cardWrapper .wrapper .cardHeaderBlock .tabsNav__item'
-SUBJECT_TITLES_CSSSELECT_EXPRESSION = '.cardWrapper .wrapper .container .row .col .blockInfo__section .section__title'
-SUBJECT_INFO_CSSSELECT_EXPRESSION = '.cardWrapper .wrapper .container .row .col .blockInfo__section .section__info'
+CUSTOMER_REG_NUM_COL_NAME = 'regNum'
+SUBJECT_COL_NAMES = ('html_product_name',)
 
 import logging
 
@@ -31,7 +43,34 @@ logger = logging.getLogger(__name__)
 
 
 class SiteHandler:
-    def __init__(self, xml_parser: XMLParser, html_parser: HTMLParser):
+    def __init__(self, xml_parser: XMLParser, html_parser: HTMLParser, rate_limiter: RateLimiter = None,
+                 connection_settings: ConnectionSettings = None, response_cache: ResponseCache = None,
+                 speculative: bool = False, path_predictor: PathPredictor = None,
+                 parse_executor: ParseExecutor = None, base_url: str = ZAKUPKI_BASE_URL,
+                 retry_policy: RetryPolicy = None, circuit_breaker: CircuitBreaker = None,
+                 timeout_settings: TimeoutSettings = None, attachment_settings: AttachmentSettings = None,
+                 page_facts_cache: PageFactsCache = None):
+        self.base_url = base_url
+        self.page_facts_cache = page_facts_cache if page_facts_cache is not None else PageFactsCache()
+        self.attachment_settings = attachment_settings if attachment_settings is not None else AttachmentSettings()
+        self.timeout_settings = timeout_settings if timeout_settings is not None else TimeoutSettings()
+        self.links_over_budget = 0
+        # concurrent requests of the same page, attachment or contract share one download and parse
+        self.single_flight = SingleFlight()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        longest_pause = max(self.circuit_breaker.max_reset_timeout, self.retry_policy.max_retry_after)
+        if self.timeout_settings.link_budget <= longest_pause:
+            logger.warning(f'Time budget of a link {self.timeout_settings.link_budget}s is not longer than '
+                           f'the longest pause {longest_pause}s of the circuit breaker and Retry-After')
+        self.retry_stats = RetryStats()
+        self.speculative = speculative
+        self.parse_executor = parse_executor
+        self.path_predictor = path_predictor
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.response_cache = response_cache
+        self.connection_settings = connection_settings
+        self.session_manager = None
         self.parsers = {
             r'.*контракт.*\.xml': xml_parser,
             r'.*Печатная форма электронного контракта\.html.*': html_parser
@@ -44,187 +83,378 @@ class SiteHandler:
             self.col_names += html_parser.col_names
 
     @staticmethod
-    def __try_to_find_product_name__(dom, contact_link) -> FileElement | None:
-        titles = dom.cssselect(SUBJECT_TITLES_CSSSELECT_EXPRESSION)
-        infos = dom.cssselect(SUBJECT_INFO_CSSSELECT_EXPRESSION)
-        cnt = 0
-        while cnt < len(titles) and cnt < len(infos):
-            if titles[cnt].text == 'Предмет договора':
-                return FileElement(
-                    link=contact_link,
-                    product_name='',
-                    price=-1,
-                    file_element_type=FileElementType.HTML,
-                    col_data=FileColData(-1, 'html_product_name', infos[cnt].text)
-                )
-            cnt += 1
-        return None
-
-    @staticmethod
-    def __try_to_find_attachments_link__(dom) -> str:
-        link_elements = dom.cssselect(ATTACHMENTS_LINKS_CSSSELECT_EXPRESSION)
-        attachment_link = ''
-        for link_element in link_elements:
-            link = link_element.get("href")
-            if 'contractInfoId' in link and attachment_link == '':
-                link_parts = link.split('?')
-                if len(link_parts) == 2:
-                    attachment_link = f'https://zakupki.gov.ru/epz/contract/contractCard/document-info.html?{link_parts[1]}'
-        return attachment_link
+    def __product_name_record__(page_facts: PageFacts, contact_link) -> ProductRecord | None:
+        if page_facts.subject is None:
+            return None
+        return ProductRecord(
+            link=contact_link,
+            product_name='',
+            price=-1,
+            col_names=SUBJECT_COL_NAMES,
+            values=(page_facts.subject,),
+            file_element_type=FileElementType.HTML
+        )
+
+    def __site_link__(self, path: str) -> str:
+        return f'{self.base_url}{path}' if path != '' else ''
+
+    async def __lookup_cache__(self, link) -> tuple[CachedResponse | None, bool]:
+        """
+        Returns the cached response and whether the link should be downloaded at all.
+        """
+        if self.response_cache is None:
+            return None, True
+        cached_response = await self.response_cache.async_get(link)
+        if cached_response is None and self.response_cache.offline:
+            logger.debug(f'Skip downloading {link} in offline mode')
+            return None, False
+        return cached_response, cached_response is None
+
+    async def __async_fetch__(self, session, context, link, request_kind: RequestKind) -> CachedResponse | None:
+        cached_response, should_download = await self.__lookup_cache__(link)
+        if not should_download:
+            return cached_response
+
+        fetched_response = await self.__async_with_retries__(
+            link, request_kind, lambda timeout: SiteHandler.__async_fetch_once__(session, context, link, timeout))
+        if fetched_response is not None and self.response_cache is not None:
+            await self.response_cache.async_put(link, fetched_response)
+        return fetched_response
+
+    async def __async_fetch_attachment__(self, session, context, link) -> AttachmentSpool | None:
+        cached_response, should_download = await self.__lookup_cache__(link)
+        if not should_download:
+            return spool_bytes(cached_response.body, self.attachment_settings) if cached_response else None
+
+        attachment = await self.__async_with_retries__(
+            link, RequestKind.ATTACHMENT,
+            lambda timeout: SiteHandler.__async_stream_once__(session, context, link, timeout,
+                                                              self.attachment_settings))
+        if attachment is not None and self.response_cache is not None:
+            await self.__cache_attachment__(link, attachment)
+        return attachment
+
+    async def __cache_attachment__(self, link, attachment: AttachmentSpool):
+        if attachment.path is None:
+            body = attachment.read()
+            attachment.seek(0)
+            await self.response_cache.async_put(link, CachedResponse(body=body))
+            return
+        # attachments spooled to disk are compressed into the cache from their file, not read into memory
+        attachment.flush()
+        await self.response_cache.async_put_file(link, attachment.path)
+
+    async def __async_with_retries__(self, link, request_kind: RequestKind, fetch_once):
+        attempt = 1
+        while True:
+            with link_budget_paused():
+                await self.circuit_breaker.wait()
+            await self.__wait_for_rate_limit__(link)
+            try:
+                fetched = await fetch_once(self.timeout_settings.client_timeout(request_kind))
+                self.circuit_breaker.record_success()
+                return fetched
+            except (RetryableResponseError, aiohttp.ClientError, asyncio.TimeoutError) as ex:
+                retry_after = ex.retry_after if isinstance(ex, RetryableResponseError) else None
+                self.circuit_breaker.record_failure()
+                if retry_after is not None:
+                    self.circuit_breaker.pause(min(retry_after, self.retry_policy.max_retry_after))
+                if not self.retry_policy.should_retry(attempt):
+                    self.retry_stats.failed_requests += 1
+                    raise
+                delay = self.retry_policy.backoff(attempt, retry_after)
+                logger.warning(f'Attempt {attempt} to download {link} failed: {str(ex)}, retrying in {delay:.1f}s')
+                self.retry_stats.retries += 1
+                self.retry_stats.total_backoff += delay
+                attempt += 1
+                with link_budget_paused() if retry_after is not None else nullcontext():
+                    await asyncio.sleep(delay)
 
     @staticmethod
-    def __try_to_find_contract_draft_link__(dom) -> str:
-        link_elements = dom.cssselect(ATTACHMENTS_LINKS_CSSSELECT_EXPRESSION)
-        attachment_link = ''
-        for link_element in link_elements:
-            link = link_element.get("href")
-            if 'contract-draft' in link and attachment_link == '':
-                link_parts = link.split('?')
-                if len(link_parts) == 2:
-                    attachment_link = f'https://zakupki.gov.ru/epz/order/notice/rpec/contract-draft.html?{link_parts[1]}'
-        return attachment_link
+    def __is_ok__(response, link) -> bool:
+        if response.status in RETRYABLE_STATUSES:
+            raise RetryableResponseError(link, response.status, parse_retry_after(response.headers.get('Retry-After')))
+        return response.status == requests.codes.ok
 
     @staticmethod
-    def __try_to_find_script_link_to_html_contract__(dom):
-        link_to_html_contract = None
-        for script in dom.cssselect('script'):
-            if script is None:
-                continue
-            text_in_script = script.text
-            if text_in_script is None:
-                continue
-            if 'uid' in text_in_script:
-                match = re.search(r'\'([^\']+)\'', script.text)
-                if match is not None:
-                    link_to_html_contract = match.group(1)
-                    break
-        return link_to_html_contract
+    async def __async_fetch_once__(session, context, link, timeout) -> CachedResponse | None:
+        async with session.get(url=link,
+                               allow_redirects=True,
+                               ssl=context,
+                               cookies=COOKIES,
+                               timeout=timeout) as response:
+            if not SiteHandler.__is_ok__(response, link):
+                return None
+            body = await response.read()
+            return CachedResponse(body=body, encoding=response.charset)
 
     @staticmethod
-    async def __async_download_page_and_build_dom__(session, context, link):
-        dom = None
+    async def __async_stream_once__(session, context, link, timeout,
+                                    attachment_settings: AttachmentSettings) -> AttachmentSpool | None:
+        async with session.get(url=link,
+                               allow_redirects=True,
+                               ssl=context,
+                               cookies=COOKIES,
+                               timeout=timeout) as response:
+            if not SiteHandler.__is_ok__(response, link):
+                return None
+            return await spool_response(response, link, attachment_settings)
+
+    async def __async_download_page_facts__(self, session, context, link,
+                                            request_kind: RequestKind) -> PageFacts | None:
+        page_facts = None
 
         if link is None or link == '':
-            return dom
+            return page_facts
+
+        page_facts = self.page_facts_cache.get(link)
+        if page_facts is not None:
+            return page_facts
 
         try:
-            time.sleep(1 + numpy.random.uniform(0, 1))
-            async with session.get(url=link,
-                                   allow_redirects=True,
-                                   ssl=context,
-                                   cookies=COOKIES) as response:
-                html = await response.text()
-                if response.status == requests.codes.ok:
-                    dom = parser.fromstring(html)
+            page_facts = await self.single_flight.run(
+                ('page', canonical_url(link)),
+                lambda: self.__async_download_page_facts_once__(session, context, link, request_kind))
         except Exception as ex:
             logger.error(f'Have a problem with downloading and building dom from {link}: {str(ex)}')
 
-        return dom
+        return page_facts
+
+    async def __async_download_page_facts_once__(self, session, context, link,
+                                                 request_kind: RequestKind) -> PageFacts | None:
+        page = await self.__async_fetch__(session, context, link, request_kind)
+        if page is None:
+            return None
+        page_facts = extract_page_facts(build_dom(page.body, page.encoding))
+        self.page_facts_cache.put(link, page_facts)
+        return page_facts
 
     @staticmethod
-    async def __async_download_from_link__(session, context, link):
+    def __with_link__(records: list[ProductRecord], link: str) -> list[ProductRecord]:
+        # shared results may come from another link with the same canonical url
+        return [record if record.link == link else record.with_link(link) for record in records]
+
+    async def __async_download_from_link__(self, session, context, link) -> AttachmentSpool | None:
         file_content = None
 
         if link is None or link == '':
             return file_content
 
         try:
-            time.sleep(1 + numpy.random.uniform(0, 1))
-            async with session.get(url=link,
-                                   allow_redirects=True,
-                                   ssl=context,
-                                   cookies=COOKIES) as response:
-                file_content = await response.content.read()
-                if response.status != requests.codes.ok:
-                    file_content = None
+            file_content = await self.__async_fetch_attachment__(session, context, link)
         except Exception as ex:
             logger.error(f'Have a problem with downloading from {link}: {str(ex)}')
 
         return file_content
 
-    def __map_attachment_to_parser__(self, dom) -> dict[str, XMLParser | HTMLParser]:
-        attachments = dom.cssselect(ATTACHMENTS_CSSSELECT_EXPRESSION)
+    async def __wait_for_rate_limit__(self, link):
+        waited = await self.rate_limiter.acquire(link)
+        logger.debug(f'Waited {waited:.3f}s for rate limit before {link}')
+
+    async def __async_parse__(self, file_parser, file_content, link) -> list[ProductRecord]:
+        if self.parse_executor is None:
+            return file_parser.parse_records(file_content, link)
+        return await self.parse_executor.parse_records(file_parser, file_content, link)
+
+    def __map_attachment_to_parser__(self, page_facts: PageFacts) -> dict[str, XMLParser | HTMLParser]:
         link_to_parser = {}
-        for attachment in attachments:
-            title = attachment.get('title')
+        for title, href in page_facts.attachments:
+            if title is None:
+                continue
             for file_pattern in self.parsers:
                 if re.match(file_pattern, title):
-                    link_to_parser[attachment.get('href')] = self.parsers[file_pattern]
+                    link_to_parser[href] = self.parsers[file_pattern]
                     break
         return link_to_parser
 
     async def __async_search_contract_draft__(self, session, context, contract_draft_link, contact_link) -> list[
-        FileElement]:
-        file_elements = []
-
-        dom = await SiteHandler.__async_download_page_and_build_dom__(session, context, contract_draft_link)
-        if dom is None or self.html_parser is None:
-            return file_elements
-
-        link_to_html_contract = SiteHandler.__try_to_find_script_link_to_html_contract__(dom)
-        html_contract_content = await SiteHandler.__async_download_from_link__(session, context, link_to_html_contract)
-
-        if html_contract_content is not None:
+        ProductRecord]:
+        records = []
+
+        page_facts = await self.__async_download_page_facts__(
+            session, context, contract_draft_link, RequestKind.CONTRACT_DRAFT)
+        if page_facts is None or self.html_parser is None:
+            return records
+
+        link_to_html_contract = page_facts.html_contract_link
+        if link_to_html_contract is None:
+            return records
+        return await self.__async_download_and_parse_attachment__(
+            session, context, contact_link, link_to_html_contract, self.html_parser)
+
+    async def __async_download_and_parse_attachment__(self, session, context, contract_link,
+                                                      attachment_content_link, file_parser) -> list[ProductRecord]:
+        records = await self.single_flight.run(
+            ('attachment', canonical_url(attachment_content_link), id(file_parser)),
+            lambda: self.__async_download_and_parse_attachment_once__(
+                session, context, contract_link, attachment_content_link, file_parser))
+        return SiteHandler.__with_link__(records, contract_link)
+
+    async def __async_download_and_parse_attachment_once__(self, session, context, contract_link,
+                                                           attachment_content_link, file_parser) -> list[ProductRecord]:
+        file_content = await self.__async_download_from_link__(session, context, attachment_content_link)
+        if file_content is None:
+            return []
+        with file_content:
             try:
-                return self.html_parser.parse(html_contract_content, contact_link)
+                return await self.__async_parse__(file_parser, file_content, contract_link)
             except Exception as ex:
-                logger.error(f'Have a problem with html contract tab parsing from {context}: {str(ex)}')
-        return file_elements
+                logger.error(
+                    f'Have a problem with parsing attachments from {attachment_content_link} for link {contract_link}: {str(ex)}'
+                )
+        return []
 
     async def __async_search_through_attachments__(self, session, context, contract_link, attachment_link):
-        file_elements = []
+        records = []
 
         if attachment_link is None or attachment_link == '':
             return []
 
-        dom = await SiteHandler.__async_download_page_and_build_dom__(session, context, attachment_link)
-
-        if dom is not None:
-            link_to_parser = self.__map_attachment_to_parser__(dom)
-            for attachment_content_link in link_to_parser:
-                file_parser = link_to_parser[attachment_content_link]
-                if file_parser is None or attachment_content_link == '':
-                    continue
-                file_content = await SiteHandler.__async_download_from_link__(session, context, attachment_content_link)
-                if file_content is not None:
-                    try:
-                        file_elements += file_parser.parse(file_content, contract_link)
-                    except Exception as ex:
-                        logger.error(
-                            f'Have a problem with parsing attachments from {attachment_content_link} for link {contract_link}: {str(ex)}'
-                        )
-        return file_elements
+        page_facts = await self.__async_download_page_facts__(
+            session, context, attachment_link, RequestKind.DOCUMENT_INFO)
+
+        if page_facts is not None:
+            link_to_parser = self.__map_attachment_to_parser__(page_facts)
+            # every attachment is downloaded at once and parsed as soon as it arrives,
+            # the results are still joined in the order of the attachments on the page
+            attachment_tasks = [
+                asyncio.ensure_future(self.__async_download_and_parse_attachment__(
+                    session, context, contract_link, attachment_content_link, file_parser))
+                for attachment_content_link, file_parser in link_to_parser.items()
+                if file_parser is not None and attachment_content_link != ''
+            ]
+            try:
+                for attachment_records in await asyncio.gather(*attachment_tasks):
+                    records += attachment_records
+            finally:
+                for attachment_task in attachment_tasks:
+                    attachment_task.cancel()
+        return records
+
+    @asynccontextmanager
+    async def connect(self, cert_abs_path: str):
+        """
+        Keeps one pooled session open for every download_xml_and_parse call with
+        the same certificate until the block exits.
+        """
+        async with SessionManager(cert_abs_path, self.connection_settings, headers=HEADERS) as session_manager:
+            self.session_manager = session_manager
+            try:
+                yield session_manager
+            finally:
+                self.session_manager = None
+                if self.path_predictor is not None:
+                    self.path_predictor.save()
+
+    def __record_path__(self, contract_link, path: ContractPath, main_page: PageFacts, records: list[ProductRecord],
+                        predicted_path: ContractPath | None):
+        if self.path_predictor is None:
+            return
+        customer_reg_num = main_page.customer_reg_num
+        if customer_reg_num is None:
+            customer_reg_num = next((value for record in records
+                                     for name, value in zip(record.col_names, record.values)
+                                     if name == CUSTOMER_REG_NUM_COL_NAME and value is not None), None)
+        self.path_predictor.record(contract_link, path, customer_reg_num, predicted_path)
+
+    async def __async_download_xml_and_parse__(self, session, context, contract_link: str):
+        main_page = await self.__async_download_page_facts__(
+            session, context, contract_link, RequestKind.CONTRACT_PAGE)
+        if main_page is None:
+            return []
+
+        # only product name
+        html_product_name = SiteHandler.__product_name_record__(main_page, contract_link)
+        if html_product_name is not None:
+            self.__record_path__(contract_link, ContractPath.SUBJECT, main_page, [html_product_name], None)
+            return [html_product_name]
+
+        contract_draft_link = self.__site_link__(main_page.contract_draft_path)
+        attachment_link = self.__site_link__(main_page.attachments_path)
+        probes = [
+            (ContractPath.CONTRACT_DRAFT,
+             lambda: self.__async_search_contract_draft__(session, context, contract_draft_link, contract_link)),
+            (ContractPath.ATTACHMENTS,
+             lambda: self.__async_search_through_attachments__(session, context, contract_link, attachment_link))
+        ]
+        predicted_path = None
+        if self.path_predictor is not None and contract_draft_link != '' and attachment_link != '':
+            # the contract draft goes first anyway, so only a prediction of the attachments changes the order
+            predicted_path = self.path_predictor.predict(contract_link, main_page.customer_reg_num)
+            if predicted_path == ContractPath.ATTACHMENTS:
+                probes.reverse()
+            else:
+                predicted_path = None
+
+        path, records = await self.__async_run_probes__(probes)
+        if path is not None:
+            self.__record_path__(contract_link, path, main_page, records, predicted_path)
+        return records
+
+    async def __async_run_probes__(self, probes) -> tuple[ContractPath | None, list[ProductRecord]]:
+        """
+        Returns the first path, in priority order, whose probe found anything.
+        In speculative mode all probes start at once and lower priority ones are
+        cancelled as soon as a higher priority probe returns data.
+        """
+        if not self.speculative:
+            for path, probe in probes:
+                records = await probe()
+                if len(records) != 0:
+                    return path, records
+            return None, []
+
+        probe_tasks = [(path, asyncio.ensure_future(probe())) for path, probe in probes]
+        try:
+            for path, probe_task in probe_tasks:
+                records = await probe_task
+                if len(records) != 0:
+                    return path, records
+            return None, []
+        finally:
+            for _, probe_task in probe_tasks:
+                probe_task.cancel()
+
+    async def __async_download_xml_and_parse_shared__(self, session, context, contract_link: str):
+        records = await self.single_flight.run(
+            ('contract', canonical_url(contract_link)),
+            lambda: self.__async_download_xml_and_parse_within_budget__(session, context, contract_link))
+        return SiteHandler.__with_link__(records, contract_link)
+
+    async def __async_download_xml_and_parse_within_budget__(self, session, context, contract_link: str):
+        link_budget = LinkBudget(self.timeout_settings.link_budget)
+        token = current_link_budget.set(link_budget)
+        try:
+            download_task = asyncio.ensure_future(
+                self.__async_download_xml_and_parse__(session, context, contract_link))
+        finally:
+            current_link_budget.reset(token)
+        # the remaining probes and their downloads are cancelled once the budget runs out;
+        # the budget doesn't run down while paused, so it's checked again after each wait
+        try:
+            while True:
+                done, _ = await asyncio.wait({download_task}, timeout=max(0.0, link_budget.remaining()))
+                if done:
+                    return download_task.result()
+                if link_budget.remaining() <= 0:
+                    download_task.cancel()
+                    await asyncio.wait({download_task})
+                    self.links_over_budget += 1
+                    logger.warning(f'Time budget of {self.timeout_settings.link_budget}s ran out for {contract_link}')
+                    return []
+        finally:
+            download_task.cancel()
 
     async def download_xml_and_parse(self, contract_link: str, cert_abs_path: str):
         try:
             if contract_link:
-                async with ClientSession(headers=HEADERS) as session:
-                    context = ssl.SSLContext(protocol=ssl.PROTOCOL_TLS)
-                    context.load_verify_locations(cert_abs_path)
-
-                    main_page = await SiteHandler.__async_download_page_and_build_dom__(
-                        session, context, contract_link)
-                    if main_page is not None:
-                        # only product name
-                        html_product_name = SiteHandler.__try_to_find_product_name__(main_page, contract_link)
-                        if html_product_name is not None:
-                            return [html_product_name]
-
-                        # contract draft
-                        contract_draft_link = SiteHandler.__try_to_find_contract_draft_link__(main_page)
-                        contact_draft_elements = await self.__async_search_contract_draft__(
-                            session, context, contract_draft_link, contract_link
-                        )
-                        if len(contact_draft_elements) != 0:
-                            return contact_draft_elements
-
-                        # attachments
-                        attachment_link = SiteHandler.__try_to_find_attachments_link__(main_page)
-                        attachment_elements = await self.__async_search_through_attachments__(
-                            session, context, contract_link, attachment_link)
-                        return attachment_elements
-                    else:
-                        return []
+                session_manager = self.session_manager
+                if session_manager is not None and session_manager.cert_abs_path == cert_abs_path:
+                    return await self.__async_download_xml_and_parse_shared__(
+                        session_manager.session, session_manager.ssl_context, contract_link)
+                async with SessionManager(cert_abs_path, self.connection_settings, headers=HEADERS) as session_manager:
+                    return await self.__async_download_xml_and_parse_shared__(
+                        session_manager.session, session_manager.ssl_context, contract_link)
         except Exception as ex:
             logger.error(f"Something unusual happened with {contract_link}: {str(ex)}")
 
@@ -0,0 +1,100 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Union
+
+from aiohttp import ClientTimeout
+
+# longer than the longest pause of the circuit breaker and of a Retry-After
+DEFAULT_LINK_BUDGET = 900.0
+
+
+class RequestKind(Enum):
+    CONTRACT_PAGE = 1
+    DOCUMENT_INFO = 2
+    CONTRACT_DRAFT = 3
+    # xml attachments and the printed form of a contract
+    ATTACHMENT = 4
+
+
+@dataclass
+class RequestTimeout:
+    connect: float = 10.0
+    read: float = 30.0
+    total: float = 60.0
+
+    def client_timeout(self) -> ClientTimeout:
+        return ClientTimeout(total=self.total, sock_connect=self.connect, sock_read=self.read)
+
+
+@dataclass
+class TimeoutSettings:
+    """
+    Timeouts of a single request by the kind of the page, and the time budget of
+    a whole contract link, including retries and every probe it makes but not the
+    pauses of the circuit breaker and Retry-After, see LinkBudget.
+    """
+    contract_page: RequestTimeout = field(default_factory=RequestTimeout)
+    document_info: RequestTimeout = field(default_factory=RequestTimeout)
+    contract_draft: RequestTimeout = field(default_factory=RequestTimeout)
+    attachment: RequestTimeout = field(default_factory=lambda: RequestTimeout(read=60.0, total=180.0))
+    link_budget: float = DEFAULT_LINK_BUDGET
+
+    def __post_init__(self):
+        self.client_timeouts = {
+            RequestKind.CONTRACT_PAGE: self.contract_page.client_timeout(),
+            RequestKind.DOCUMENT_INFO: self.document_info.client_timeout(),
+            RequestKind.CONTRACT_DRAFT: self.contract_draft.client_timeout(),
+            RequestKind.ATTACHMENT: self.attachment.client_timeout()
+        }
+
+    def client_timeout(self, request_kind: RequestKind) -> ClientTimeout:
+        return self.client_timeouts[request_kind]
+
+
+class LinkBudget:
+    """
+    The time budget of one contract link. Its clock stops while any request of the link
+    is paused by the circuit breaker or a Retry-After of the site, so an outage doesn't
+    use up the budget of every link in flight.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.paused_requests = 0
+        self.paused_since = 0.0
+        self.total_pause = 0.0
+
+    def remaining(self) -> float:
+        now = time.monotonic()
+        pause = self.total_pause + (now - self.paused_since if self.paused_requests != 0 else 0.0)
+        return self.seconds - (now - self.started - pause)
+
+    @contextmanager
+    def paused(self):
+        if self.paused_requests == 0:
+            self.paused_since = time.monotonic()
+        self.paused_requests += 1
+        try:
+            yield
+        finally:
+            self.paused_requests -= 1
+            if self.paused_requests == 0:
+                self.total_pause += time.monotonic() - self.paused_since
+
+
+# tasks of a contract link inherit its budget from the task that downloads the link
+current_link_budget: ContextVar[Union[LinkBudget, None]] = ContextVar('current_link_budget', default=None)
+
+
+@contextmanager
+def link_budget_paused():
+    link_budget = current_link_budget.get()
+    if link_budget is None:
+        yield
+        return
+    with link_budget.paused():
+        yield
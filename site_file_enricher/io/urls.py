@@ -0,0 +1,29 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# query parameters that identify a contract or a notice on zakupki.gov.ru, by priority
+CONTRACT_KEY_PARAMETERS = ['reestrNumber', 'regNumber', 'contractInfoId', 'id']
+
+
+def canonical_url(link: str) -> str:
+    parts = urlsplit(link.strip())
+    path = parts.path
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/')
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))
+
+
+def contract_key(link: str) -> str:
+    """
+    The same key for every link of one contract card: the scheme, the order of query
+    parameters, a trailing slash and the tab of the card (common-info, document-info, ...)
+    don't matter.
+    """
+    parts = urlsplit(link.strip())
+    query = dict(parse_qsl(parts.query))
+    for parameter in CONTRACT_KEY_PARAMETERS:
+        value = query.get(parameter, '').strip()
+        if value != '':
+            card_path = parts.path.rstrip('/').rsplit('/', 1)[0]
+            return f'{parts.netloc.lower()}{card_path}?{parameter}={value}'
+    return canonical_url(link).split('://', 1)[-1]
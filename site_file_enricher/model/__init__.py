@@ -1 +1,2 @@
-from site_file_enricher.model.dto import *
\ No newline at end of file
+from site_file_enricher.model.dto import *
+from site_file_enricher.model.column_schema import *
@@ -0,0 +1,80 @@
+import threading
+from typing import Union
+
+from site_file_enricher.model.dto import OutputElement
+
+DEFAULT_MAX_POOL_SIZE = 4096
+
+
+class ColumnSchema:
+    """
+    Run-wide column names as small integer ids, and a pool per column that keeps one
+    copy of every repeated value. A column stops being interned once it has more
+    than `max_pool_size` distinct values.
+    """
+
+    def __init__(self, max_pool_size: int = DEFAULT_MAX_POOL_SIZE):
+        self.max_pool_size = max_pool_size
+        self.names: list[str] = []
+        self.ids: dict[str, int] = {}
+        self.pools: list[Union[dict[str, str], None]] = []
+        self.lock = threading.Lock()
+
+    def column_id(self, name: str) -> int:
+        column_id = self.ids.get(name)
+        if column_id is not None:
+            return column_id
+        with self.lock:
+            column_id = self.ids.get(name)
+            if column_id is None:
+                column_id = len(self.names)
+                self.names.append(name)
+                self.pools.append({})
+                self.ids[name] = column_id
+            return column_id
+
+    def intern(self, column_id: int, value):
+        pool = self.pools[column_id]
+        if pool is None or not isinstance(value, str):
+            return value
+        interned = pool.setdefault(value, value)
+        if len(pool) > self.max_pool_size:
+            # a high-cardinality column, e.g. product names, isn't worth a pool
+            self.pools[column_id] = None
+        return interned
+
+    def encode(self, output_elements: list[OutputElement]) -> list['CompactOutputElement']:
+        compact_elements = []
+        for output_element in output_elements:
+            column_ids = []
+            values = []
+            for col_data in output_element.new_col_datas:
+                column_id = self.column_id(col_data.name)
+                column_ids.append(column_id)
+                values.append(self.intern(column_id, col_data.value))
+            compact_elements.append(CompactOutputElement(
+                self, output_element.index_in_input_file, output_element.link, tuple(column_ids), tuple(values)))
+        return compact_elements
+
+    def interned_columns(self) -> int:
+        return sum(1 for pool in self.pools if pool is not None)
+
+
+class CompactOutputElement:
+    """
+    An OutputElement for the writers: column ids of the schema and values, without
+    a FileColData per value.
+    """
+    __slots__ = ('schema', 'index_in_input_file', 'link', 'column_ids', 'values')
+
+    def __init__(self, schema: ColumnSchema, index_in_input_file: int, link: str, column_ids: tuple[int, ...],
+                 values: tuple):
+        self.schema = schema
+        self.index_in_input_file = index_in_input_file
+        self.link = link
+        self.column_ids = column_ids
+        self.values = values
+
+    def columns(self) -> list[tuple[str, str]]:
+        names = self.schema.names
+        return [(names[column_id], value) for column_id, value in zip(self.column_ids, self.values)]
@@ -32,8 +32,67 @@ class FileElement:
     ktru: Union[str, None] = None
     okpd: Union[str, None] = None
 
+class ProductRecord:
+    """
+    One product of a contract: the key fields once and a value per column, instead
+    of a FileElement per column. `col_names` is shared by every record of a parser.
+    A record without a product name holds the columns of the whole contract.
+    """
+    __slots__ = ('link', 'product_name', 'price', 'col_names', 'values', 'index_num', 'file_element_type', 'ktru',
+                 'okpd')
+
+    def __init__(self, link: str, product_name: str, price: int, col_names: tuple[str, ...], values: tuple,
+                 index_num: int = -1, file_element_type: FileElementType = FileElementType.XML,
+                 ktru: Union[str, None] = None, okpd: Union[str, None] = None):
+        self.link = link
+        self.product_name = product_name
+        self.price = price
+        self.col_names = col_names
+        self.values = values
+        self.index_num = index_num
+        self.file_element_type = file_element_type
+        self.ktru = ktru
+        self.okpd = okpd
+
+    def __key__(self) -> tuple:
+        return (self.link, self.product_name, self.price, self.col_names, self.values, self.index_num,
+                self.file_element_type, self.ktru, self.okpd)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ProductRecord) and self.__key__() == other.__key__()
+
+    def __hash__(self) -> int:
+        return hash(self.__key__())
+
+    def __repr__(self) -> str:
+        return (f'ProductRecord(link={self.link!r}, product_name={self.product_name!r}, price={self.price!r}, '
+                f'columns={dict(zip(self.col_names, self.values))!r}, index_num={self.index_num!r}, '
+                f'file_element_type={self.file_element_type}, ktru={self.ktru!r}, okpd={self.okpd!r})')
+
+    def with_link(self, link: str) -> 'ProductRecord':
+        return ProductRecord(link, self.product_name, self.price, self.col_names, self.values, self.index_num,
+                             self.file_element_type, self.ktru, self.okpd)
+
+    def col_datas(self) -> list[FileColData]:
+        # empty cells of a printed form are kept, missing xml fields are not
+        keep_empty = self.file_element_type == FileElementType.HTML
+        return [FileColData(self.index_num, name, value) for name, value in zip(self.col_names, self.values)
+                if keep_empty or value is not None]
+
+    def file_elements(self) -> list[FileElement]:
+        return [FileElement(link=self.link, product_name=self.product_name, price=self.price, col_data=col_data,
+                            file_element_type=self.file_element_type, ktru=self.ktru, okpd=self.okpd)
+                for col_data in self.col_datas()]
+
+
+def file_elements_of(records: list[ProductRecord]) -> list[FileElement]:
+    return [file_element for record in records for file_element in record.file_elements()]
+
 @dataclass(eq=True, order=True, unsafe_hash=True)
 class OutputElement:
     index_in_input_file: int
     link: str
-    new_col_datas: list[FileColData]
\ No newline at end of file
+    new_col_datas: list[FileColData]
+
+    def columns(self) -> list[tuple[str, str]]:
+        return [(col_data.name, col_data.value) for col_data in self.new_col_datas]
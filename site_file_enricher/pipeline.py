@@ -0,0 +1,187 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from site_file_enricher.io.crawl_engine import CrawlEngine
+from site_file_enricher.io.file_handler import FileHandler
+from site_file_enricher.model.column_schema import ColumnSchema, CompactOutputElement
+from site_file_enricher.model.dto import FileElement, InputElement, ProductRecord
+from site_file_enricher.search.fuzzy import match_file_elements
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MATCH_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_REPORT_INTERVAL = 30.0
+
+DOWNLOAD_STAGE = 'download'
+MATCH_STAGE = 'match'
+WRITE_STAGE = 'write'
+
+
+@dataclass
+class PipelineSettings:
+    match_workers: int = DEFAULT_MATCH_WORKERS
+    queue_size: int = DEFAULT_QUEUE_SIZE
+    # how many links may be taken ahead of the oldest link not written yet
+    window: int = None
+    report_interval: float = DEFAULT_REPORT_INTERVAL
+
+
+@dataclass
+class StageStats:
+    processed: int = 0
+    busy_time: float = 0.0
+    max_queue_depth: int = 0
+
+
+@dataclass
+class PipelineStats:
+    stages: dict[str, StageStats] = field(default_factory=lambda: {
+        DOWNLOAD_STAGE: StageStats(), MATCH_STAGE: StageStats(), WRITE_STAGE: StageStats()
+    })
+    link_latencies: list[float] = field(default_factory=list)
+
+
+class EnrichmentPipeline:
+    """
+    Download -> match -> write stages connected by bounded queues.
+    Downloads run in `crawl_engine.concurrency` workers, fuzzy search and writing run
+    in threads so they overlap with network waits, and rows are written in input order.
+    """
+
+    def __init__(self,
+                 crawl_engine: CrawlEngine,
+                 file_handler: FileHandler,
+                 settings: PipelineSettings = None,
+                 on_written: Callable[[str, list[InputElement]], None] = None,
+                 column_schema: ColumnSchema = None):
+        self.crawl_engine = crawl_engine
+        self.file_handler = file_handler
+        self.settings = settings if settings is not None else PipelineSettings()
+        self.on_written = on_written
+        self.stats = PipelineStats()
+        self.queues: dict[str, asyncio.Queue] = {}
+        self.reorder_buffer: dict[int, tuple[str, list[CompactOutputElement]]] = {}
+        # the rows waiting to be written share column names and repeated values
+        self.column_schema = column_schema if column_schema is not None else ColumnSchema()
+
+    def queue_depths(self) -> dict[str, int]:
+        depths = {stage: queue.qsize() for stage, queue in self.queues.items()}
+        if WRITE_STAGE in depths:
+            depths[WRITE_STAGE] += len(self.reorder_buffer)
+        return depths
+
+    def __observe_queue_depths__(self):
+        for stage, depth in self.queue_depths().items():
+            stage_stats = self.stats.stages[stage]
+            stage_stats.max_queue_depth = max(stage_stats.max_queue_depth, depth)
+
+    def __match_and_encode__(self, input_elements: list[InputElement],
+                             records: list[FileElement | ProductRecord]) -> list[CompactOutputElement]:
+        return self.column_schema.encode(match_file_elements(input_elements, records))
+
+    async def run(self, link_to_input_elements: dict[str, list[InputElement]]) -> PipelineStats:
+        download_workers = self.crawl_engine.concurrency
+        window = asyncio.Semaphore(max(self.settings.window or download_workers * 4, download_workers))
+        self.queues = {
+            DOWNLOAD_STAGE: asyncio.Queue(self.settings.queue_size),
+            MATCH_STAGE: asyncio.Queue(self.settings.queue_size),
+            WRITE_STAGE: asyncio.Queue(self.settings.queue_size)
+        }
+        self.reorder_buffer = {}
+
+        async def feed():
+            for sequence_number, link in enumerate(link_to_input_elements):
+                await window.acquire()
+                await self.queues[DOWNLOAD_STAGE].put((sequence_number, link))
+                self.__observe_queue_depths__()
+            for _ in range(download_workers):
+                await self.queues[DOWNLOAD_STAGE].put(None)
+
+        async def download():
+            queue = self.queues[DOWNLOAD_STAGE]
+            while (item := await queue.get()) is not None:
+                sequence_number, link = item
+                start = time.perf_counter()
+                try:
+                    records = await self.crawl_engine.fetch(link)
+                except Exception as ex:
+                    logger.error(f'Have a problem with crawling {link}: {str(ex)}')
+                    records = []
+                duration = time.perf_counter() - start
+                self.stats.link_latencies.append(duration)
+                self.stats.stages[DOWNLOAD_STAGE].busy_time += duration
+                self.stats.stages[DOWNLOAD_STAGE].processed += 1
+                await self.queues[MATCH_STAGE].put((sequence_number, link, records))
+                self.__observe_queue_depths__()
+
+        async def match():
+            queue = self.queues[MATCH_STAGE]
+            while (item := await queue.get()) is not None:
+                sequence_number, link, records = item
+                start = time.perf_counter()
+                try:
+                    new_elements = await asyncio.to_thread(
+                        self.__match_and_encode__, link_to_input_elements[link], records)
+                except Exception as ex:
+                    logger.error(f'Have a problem with fuzzy search for {link}: {str(ex)}')
+                    new_elements = []
+                self.stats.stages[MATCH_STAGE].busy_time += time.perf_counter() - start
+                self.stats.stages[MATCH_STAGE].processed += 1
+                await self.queues[WRITE_STAGE].put((sequence_number, link, new_elements))
+                self.__observe_queue_depths__()
+
+        async def write():
+            queue = self.queues[WRITE_STAGE]
+            next_sequence_number = 0
+            while (item := await queue.get()) is not None:
+                sequence_number, link, new_elements = item
+                self.reorder_buffer[sequence_number] = (link, new_elements)
+                self.__observe_queue_depths__()
+                while next_sequence_number in self.reorder_buffer:
+                    link, new_elements = self.reorder_buffer.pop(next_sequence_number)
+                    start = time.perf_counter()
+                    try:
+                        await asyncio.to_thread(self.file_handler.write, new_elements, link=link)
+                    except Exception as ex:
+                        logger.error(f'Have a problem with saving results for {link}: {str(ex)}')
+                        await asyncio.to_thread(self.file_handler.write, [], link=link)
+                    self.stats.stages[WRITE_STAGE].busy_time += time.perf_counter() - start
+                    self.stats.stages[WRITE_STAGE].processed += 1
+                    next_sequence_number += 1
+                    window.release()
+                    if self.on_written is not None:
+                        self.on_written(link, link_to_input_elements[link])
+
+        async def report():
+            while True:
+                await asyncio.sleep(self.settings.report_interval)
+                logger.info(f'Pipeline queue depths: {self.queue_depths()}')
+
+        async def finish_stage(workers: list[asyncio.Task], next_stage: str, next_workers_count: int):
+            await asyncio.gather(*workers)
+            for _ in range(next_workers_count):
+                await self.queues[next_stage].put(None)
+
+        async with self.crawl_engine.site_handler.connect(self.crawl_engine.cert_abs_path):
+            reporter = asyncio.ensure_future(report())
+            download_tasks = [asyncio.ensure_future(download()) for _ in range(download_workers)]
+            match_tasks = [asyncio.ensure_future(match()) for _ in range(self.settings.match_workers)]
+            stages = [
+                asyncio.ensure_future(feed()),
+                asyncio.ensure_future(finish_stage(download_tasks, MATCH_STAGE, len(match_tasks))),
+                asyncio.ensure_future(finish_stage(match_tasks, WRITE_STAGE, 1)),
+                asyncio.ensure_future(write())
+            ]
+            try:
+                await asyncio.gather(*stages)
+            finally:
+                reporter.cancel()
+                for task in stages + download_tasks + match_tasks:
+                    task.cancel()
+
+        return self.stats
@@ -3,10 +3,14 @@ import os
 
 from site_file_enricher.io.file_handler import FileFormat, get_handler
 from site_file_enricher.io.site_handler import SiteHandler
-from site_file_enricher.file_parser.xml_parser import XMLParser, RootXMLElement, XMLElement
-from site_file_enricher.search.fuzzy import search
-from site_file_enricher.file_parser.html_parser import HTMLParser, HTMLElement, HTMLContractFormat, RootTHMLElement
-from site_file_enricher.model.dto import FileElementType, OutputElement
+from site_file_enricher.io.crawl_engine import CrawlEngine, DEFAULT_CONCURRENCY
+from site_file_enricher.io.path_predictor import PathPredictor
+from site_file_enricher.io.response_cache import ResponseCache
+from site_file_enricher.file_parser.xml_parser import XMLParser, RootXMLElement, XMLElement, XMLParserEngine
+from site_file_enricher.pipeline import EnrichmentPipeline, PipelineSettings, PipelineStats
+from site_file_enricher.file_parser.html_parser import HTMLParser, HTMLElement, HTMLContractFormat, RootTHMLElement, \
+    HTMLParserEngine
+from site_file_enricher.file_parser.parse_executor import ParseExecutor, ParseExecutorType
 
 
 def enrich_file(
@@ -14,7 +18,9 @@ def enrich_file(
         out_path_to_file: str,
         out_file_name: str,
         site_handler: SiteHandler,
-        cert_abs_path: str):
+        cert_abs_path: str,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        pipeline_settings: PipelineSettings = None) -> PipelineStats:
     file_handler = get_handler(
         FileFormat.XLSX,
         input_file=abs_path_to_file,
@@ -25,48 +31,52 @@ def enrich_file(
     )
 
     link_to_input_elements = file_handler.read()
+    crawl_engine = CrawlEngine(site_handler, cert_abs_path, concurrency=concurrency)
+    pipeline = EnrichmentPipeline(crawl_engine, file_handler, pipeline_settings)
 
-    new_elements = []
+    pipeline_stats = asyncio.run(pipeline.run(link_to_input_elements))
 
-    for link in link_to_input_elements:
-        input_elements = link_to_input_elements[link]
-        print(f'Download and parse xml/html for {link}')
-        file_elements = asyncio.run(site_handler.download_xml_and_parse(link, cert_abs_path))
+    for stage, stage_stats in pipeline_stats.stages.items():
+        print(f'Stage {stage}: {stage_stats.processed} links, busy {stage_stats.busy_time:.1f}s, '
+              f'max queue depth {stage_stats.max_queue_depth}')
 
-        xml_product_info_els = [file_el for file_el in file_elements
-                                if file_el.product_name != '' and file_el.file_element_type == FileElementType.XML]
-        html_product_info_els = [file_el for file_el in file_elements if
-                                 file_el.product_name != '' and file_el.file_element_type == FileElementType.HTML]
-        universal_col_datas = [file_el.col_data for file_el in file_elements if
-                               file_el.product_name == '']
-
-        print(f'Fuzzy search for link: {link}')
-        searched_output_elements = search(input_elements, xml_product_info_els)
-        for searched_output_element in searched_output_elements:
-            searched_output_element.new_col_datas += universal_col_datas
-        new_elements += searched_output_elements
-
-        searched_output_elements = search(input_elements, html_product_info_els)
-        for searched_output_element in searched_output_elements:
-            searched_output_element.new_col_datas += universal_col_datas
-        new_elements += searched_output_elements
-
-        if len(xml_product_info_els) == len(html_product_info_els) == 0 and len(universal_col_datas) != 0:
-            for input_el in input_elements:
-                new_elements.append(OutputElement(
-                    index_in_input_file=input_el.index_in_input_file,
-                    link=input_el.link,
-                    new_col_datas=universal_col_datas
-                ))
-
-        file_handler.write(new_elements, link=link)
+    rate_limiter_stats = site_handler.rate_limiter.total_stats()
+    print(f'Rate limiter: {rate_limiter_stats.requests} requests, '
+          f'{rate_limiter_stats.delayed_requests} delayed, '
+          f'average wait {rate_limiter_stats.average_wait:.3f}s, max wait {rate_limiter_stats.max_wait:.3f}s')
+    retry_stats = site_handler.retry_stats
+    circuit_breaker_stats = site_handler.circuit_breaker.stats
+    print(f'Retries: {retry_stats.retries} retries, {retry_stats.failed_requests} failed requests, '
+          f'backoff {retry_stats.total_backoff:.1f}s; circuit breaker opened {circuit_breaker_stats.openings} times, '
+          f'paused {circuit_breaker_stats.paused_requests} requests for {circuit_breaker_stats.total_pause:.1f}s')
+    single_flight_stats = site_handler.single_flight.stats
+    print(f'Coalescing: {single_flight_stats.shared_calls} of {single_flight_stats.calls} '
+          f'page, attachment and contract requests shared a running one')
+    print(f'Page facts cache: {site_handler.page_facts_cache.hits} hits, {site_handler.page_facts_cache.misses} misses')
+    if site_handler.links_over_budget != 0:
+        print(f'Time budget of {site_handler.timeout_settings.link_budget}s ran out for '
+              f'{site_handler.links_over_budget} links')
+    if site_handler.path_predictor is not None:
+        print(f'Path predictor: {site_handler.path_predictor.correct_predictions} of '
+              f'{site_handler.path_predictor.predictions} predictions were correct')
+    if site_handler.response_cache is not None:
+        cache_stats = site_handler.response_cache.stats
+        print(f'Response cache: {cache_stats.hits} hits, {cache_stats.misses} misses, '
+              f'{cache_stats.stores} stores, {cache_stats.evictions} evictions')
+    return pipeline_stats
 
 
 def enrich_file_with_default_settings(
         abs_path_to_file: str,
         out_path: str,
         out_file_name: str,
-        cert_abs_path: str):
+        cert_abs_path: str,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        cache_directory: str = None,
+        offline: bool = False,
+        speculative: bool = False,
+        path_prediction_file: str = None,
+        parse_executor_type: ParseExecutorType = ParseExecutorType.THREAD):
     product_info_root_xml_element = RootXMLElement(
         name="product_info",
         field_name="productInfo",
@@ -106,7 +116,8 @@ def enrich_file_with_default_settings(
             XMLElement('contractorRegistryNum', 'contractorRegistryNum', 'participantInfo'),
             XMLElement('contractSubject', 'contractSubject', 'contractSubjectInfo'),
             XMLElement('contractSubjectInfo_sid', 'sid', 'contractSubjectInfo')
-        ]
+        ],
+        engine=XMLParserEngine.ITERPARSE
     )
     type_a_root_element = RootTHMLElement(
         contract_format=HTMLContractFormat.TYPE_A,
@@ -129,15 +140,25 @@ def enrich_file_with_default_settings(
         ],
         row_step=3
     )
-    default_htmp_parser = HTMLParser(type_a_root_element, type_b_root_element)
-    site_handler = SiteHandler(xml_parser=default_xml_parser, html_parser=default_htmp_parser)
-    enrich_file(
-        abs_path_to_file=abs_path_to_file,
-        out_path_to_file=out_path,
-        out_file_name=out_file_name,
-        site_handler=site_handler,
-        cert_abs_path=cert_abs_path
-    )
+    default_htmp_parser = HTMLParser(type_a_root_element, type_b_root_element, HTMLParserEngine.LXML)
+    response_cache = ResponseCache(cache_directory, offline=offline) if cache_directory is not None else None
+    try:
+        with ParseExecutor(parse_executor_type) as parse_executor:
+            site_handler = SiteHandler(xml_parser=default_xml_parser, html_parser=default_htmp_parser,
+                                       response_cache=response_cache, speculative=speculative,
+                                       path_predictor=PathPredictor(path_prediction_file),
+                                       parse_executor=parse_executor)
+            enrich_file(
+                abs_path_to_file=abs_path_to_file,
+                out_path_to_file=out_path,
+                out_file_name=out_file_name,
+                site_handler=site_handler,
+                cert_abs_path=cert_abs_path,
+                concurrency=concurrency
+            )
+    finally:
+        if response_cache is not None:
+            response_cache.close()
 
 
 if __name__ == "__main__":
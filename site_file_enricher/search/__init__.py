@@ -1 +1,3 @@
-from site_file_enricher.search.fuzzy import *
\ No newline at end of file
+from site_file_enricher.search.fuzzy import *
+from site_file_enricher.search.batch_scoring import *
+from site_file_enricher.search.normalization import *
@@ -0,0 +1,84 @@
+from typing import Iterable, Union
+
+from site_file_enricher.search.normalization import NormalizedName, normalize_candidate, normalize_query, \
+    weighted_ratio
+
+SCORE_THRESHOLD = 70
+PERFECT_SCORE = 100
+
+
+def score_upper_bound(query_length: int, candidate_length: int) -> int:
+    """
+    The best WRatio two processed strings of these lengths may get: partial scores
+    are scaled by 0.9 or 0.6 and the plain ratio can't reach them.
+    """
+    if query_length == 0 or candidate_length == 0:
+        return 0
+    length_ratio = max(query_length, candidate_length) / min(query_length, candidate_length)
+    if length_ratio < 1.5:
+        return PERFECT_SCORE
+    if length_ratio > 8:
+        return 60
+    return 90
+
+
+class CandidateBucket:
+    """
+    Candidate names of one price, processed once for every input of the price.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names = list(names)
+        self.normalized_names = [normalize_candidate(name) for name in self.names]
+        self.lengths = [len(normalized_name.processed) for normalized_name in self.normalized_names]
+
+    def best_match(self, query: NormalizedName) -> Union[tuple[str, int], None]:
+        """
+        The first name with the highest score over SCORE_THRESHOLD, as process.extract
+        with limit=1 and the threshold check give it.
+        """
+        best_name = None
+        best_score = SCORE_THRESHOLD
+        query_length = len(query.processed)
+        for name, normalized_name, length in zip(self.names, self.normalized_names, self.lengths):
+            # a name has to beat the best score strictly, so it's skipped when it can't
+            if score_upper_bound(query_length, length) <= best_score:
+                continue
+            score = weighted_ratio(query, normalized_name)
+            if score > best_score:
+                best_name, best_score = name, score
+                if best_score == PERFECT_SCORE:
+                    break
+        return (best_name, best_score) if best_name is not None else None
+
+
+class BatchScorer:
+    """
+    Scores input names against the candidate names of their price. Buckets are built
+    once per price and the result of a name is reused by every row with that name.
+    """
+
+    def __init__(self, price_to_names: dict[int, Iterable[str]]):
+        self.price_to_names = price_to_names
+        self.buckets: dict[int, CandidateBucket] = {}
+        self.best_matches: dict[tuple[int, str], Union[tuple[str, int], None]] = {}
+        self.scored_queries = 0
+        self.reused_queries = 0
+
+    def __bucket__(self, price: int) -> CandidateBucket:
+        bucket = self.buckets.get(price)
+        if bucket is None:
+            bucket = CandidateBucket(self.price_to_names[price])
+            self.buckets[price] = bucket
+        return bucket
+
+    def best_match(self, price: int, query: str) -> Union[tuple[str, int], None]:
+        normalized_query = normalize_query(query)
+        key = (price, normalized_query.processed)
+        if key in self.best_matches:
+            self.reused_queries += 1
+            return self.best_matches[key]
+        self.scored_queries += 1
+        best_match = self.__bucket__(price).best_match(normalized_query)
+        self.best_matches[key] = best_match
+        return best_match
@@ -1,11 +1,17 @@
 from typing import Union
 
-from fuzzywuzzy import fuzz, process
+from site_file_enricher.model.dto import FileColData, FileElement, FileElementType, InputElement, OutputElement, \
+    ProductRecord
+from site_file_enricher.search.batch_scoring import BatchScorer
 
-from site_file_enricher.model.dto import FileElement, InputElement, OutputElement
 
+def __col_datas__(file_el: Union[FileElement, ProductRecord]) -> list[FileColData]:
+    if isinstance(file_el, ProductRecord):
+        return file_el.col_datas()
+    return [file_el.col_data]
 
-def filter_col_datas(file_el: FileElement, okpd_ktru: Union[str, None]) -> bool:
+
+def filter_col_datas(file_el: Union[FileElement, ProductRecord], okpd_ktru: Union[str, None]) -> bool:
     if okpd_ktru is None:
         return True
     if file_el.okpd is None and file_el.ktru is None:
@@ -13,7 +19,8 @@ def filter_col_datas(file_el: FileElement, okpd_ktru: Union[str, None]) -> bool:
     return file_el.okpd == okpd_ktru or file_el.ktru == okpd_ktru
 
 
-def search(input_elements: list[InputElement], file_elements: list[FileElement]) -> list[OutputElement]:
+def search(input_elements: list[InputElement],
+           file_elements: list[Union[FileElement, ProductRecord]]) -> list[OutputElement]:
     output_elements = []
     price_to_name_to_file_elements = {}
     for file_element in file_elements:
@@ -27,6 +34,7 @@ def search(input_elements: list[InputElement], file_elements: list[FileElement])
         else:
             price_to_name_to_file_elements[price] = {product_name: [file_element]}
 
+    scorer = BatchScorer(price_to_name_to_file_elements)
     index = 0
     size = len(input_elements)
     for input_el in input_elements:
@@ -36,17 +44,46 @@ def search(input_elements: list[InputElement], file_elements: list[FileElement])
         price = input_el.price
 
         if price in price_to_name_to_file_elements:
-            fuzzy_result = process.extract(
-                input_el.name,
-                price_to_name_to_file_elements[price].keys(),
-                limit=1)
-            if len(fuzzy_result) > 0 and fuzzy_result[0][1] > 70:
-                product_name = fuzzy_result[0][0]
+            best_match = scorer.best_match(price, input_el.name)
+            if best_match is not None:
+                product_name = best_match[0]
                 output_elements.append(OutputElement(
                     index_in_input_file=input_el.index_in_input_file,
                     link=input_el.link,
-                    new_col_datas=[file_el.col_data for file_el in price_to_name_to_file_elements[price][product_name]
-                                   if filter_col_datas(file_el, input_el.okpd_ktru)]
+                    new_col_datas=[col_data for file_el in price_to_name_to_file_elements[price][product_name]
+                                   if filter_col_datas(file_el, input_el.okpd_ktru)
+                                   for col_data in __col_datas__(file_el)]
                 ))
             # del price_to_name_to_file_elements[product_name]
     return output_elements
+
+
+def match_file_elements(input_elements: list[InputElement],
+                        file_elements: list[Union[FileElement, ProductRecord]]) -> list[OutputElement]:
+    xml_product_info_els = [file_el for file_el in file_elements
+                            if file_el.product_name != '' and file_el.file_element_type == FileElementType.XML]
+    html_product_info_els = [file_el for file_el in file_elements if
+                             file_el.product_name != '' and file_el.file_element_type == FileElementType.HTML]
+    universal_col_datas = [col_data for file_el in file_elements if
+                           file_el.product_name == '' for col_data in __col_datas__(file_el)]
+
+    output_elements = []
+
+    searched_output_elements = search(input_elements, xml_product_info_els)
+    for searched_output_element in searched_output_elements:
+        searched_output_element.new_col_datas += universal_col_datas
+    output_elements += searched_output_elements
+
+    searched_output_elements = search(input_elements, html_product_info_els)
+    for searched_output_element in searched_output_elements:
+        searched_output_element.new_col_datas += universal_col_datas
+    output_elements += searched_output_elements
+
+    if len(xml_product_info_els) == len(html_product_info_els) == 0 and len(universal_col_datas) != 0:
+        for input_el in input_elements:
+            output_elements.append(OutputElement(
+                index_in_input_file=input_el.index_in_input_file,
+                link=input_el.link,
+                new_col_datas=universal_col_datas
+            ))
+    return output_elements
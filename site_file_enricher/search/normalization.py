@@ -0,0 +1,90 @@
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+
+from fuzzywuzzy import fuzz, utils
+
+logger = logging.getLogger(__name__)
+
+# names repeat across rows and links, so they're normalized once per run
+NAME_CACHE_SIZE = 16384
+
+
+@dataclass(frozen=True)
+class NormalizedName:
+    """
+    A name as fuzzywuzzy compares it: lower case, punctuation replaced with spaces,
+    stripped, plus its tokens sorted and as a set.
+    """
+    processed: str
+    sorted_tokens: str
+    tokens: frozenset[str]
+
+
+def __normalized_name__(processed: str) -> NormalizedName:
+    tokens = processed.split()
+    return NormalizedName(processed, ' '.join(sorted(tokens)).strip(), frozenset(tokens))
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def normalize_query(query: str) -> NormalizedName:
+    # process.extract runs its default processor first and then the one of WRatio
+    processed = utils.full_process(utils.full_process(query), force_ascii=True)
+    if len(processed) == 0:
+        logger.warning(f"Applied processor reduces input query to empty string, "
+                       f"all comparisons will have score 0. [Query: '{query}']")
+    return __normalized_name__(processed)
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def normalize_candidate(candidate: str) -> NormalizedName:
+    return __normalized_name__(utils.full_process(candidate, force_ascii=True))
+
+
+def __token_set_ratio__(first: NormalizedName, second: NormalizedName, ratio_func) -> int:
+    if first.processed == second.processed:
+        return 100
+    intersection = first.tokens & second.tokens
+    sorted_sect = ' '.join(sorted(intersection))
+    sorted_1to2 = ' '.join(sorted(first.tokens - intersection))
+    sorted_2to1 = ' '.join(sorted(second.tokens - intersection))
+    combined_1to2 = (sorted_sect + ' ' + sorted_1to2).strip()
+    combined_2to1 = (sorted_sect + ' ' + sorted_2to1).strip()
+    sorted_sect = sorted_sect.strip()
+    return max(ratio_func(sorted_sect, combined_1to2),
+               ratio_func(sorted_sect, combined_2to1),
+               ratio_func(combined_1to2, combined_2to1))
+
+
+def weighted_ratio(first: NormalizedName, second: NormalizedName) -> int:
+    """
+    fuzz.WRatio of two processed names, with the tokens taken from the names
+    instead of splitting and sorting them on every comparison.
+    """
+    p1 = first.processed
+    p2 = second.processed
+    if len(p1) == 0 or len(p2) == 0:
+        return 0
+
+    try_partial = True
+    unbase_scale = .95
+    partial_scale = .90
+
+    base = fuzz.ratio(p1, p2)
+    len_ratio = float(max(len(p1), len(p2))) / min(len(p1), len(p2))
+
+    if len_ratio < 1.5:
+        try_partial = False
+
+    if len_ratio > 8:
+        partial_scale = .6
+
+    if try_partial:
+        partial = fuzz.partial_ratio(p1, p2) * partial_scale
+        ptsor = fuzz.partial_ratio(first.sorted_tokens, second.sorted_tokens) * unbase_scale * partial_scale
+        ptser = __token_set_ratio__(first, second, fuzz.partial_ratio) * unbase_scale * partial_scale
+        return utils.intr(max(base, partial, ptsor, ptser))
+    else:
+        tsor = fuzz.ratio(first.sorted_tokens, second.sorted_tokens) * unbase_scale
+        tser = __token_set_ratio__(first, second, fuzz.ratio) * unbase_scale
+        return utils.intr(max(base, tsor, tser))
@@ -0,0 +1,43 @@
+import os
+import unittest
+
+from site_file_enricher.io.attachment_spool import AttachmentSettings, AttachmentSpool, spool_bytes
+
+
+class TestAttachmentSpool(unittest.TestCase):
+    def test_small_attachment_stays_in_memory(self):
+        # when:
+        with spool_bytes(b'x' * 1024, AttachmentSettings(spool_memory_bytes=1024)) as spool:
+            # then:
+            self.assertIsNone(spool.path)
+            self.assertEqual(b'x' * 1024, spool.read())
+
+    def test_large_attachment_rolls_over_to_named_file(self):
+        # given:
+        spool = AttachmentSpool(4)
+
+        # when:
+        spool.write(b'abc')
+        spool.write(b'def')
+        spool.seek(0)
+
+        # then:
+        self.assertIsNotNone(spool.path)
+        self.assertEqual(b'abcdef', spool.read())
+        with open(spool.path, 'rb') as file:
+            self.assertEqual(b'abcdef', file.read())
+
+    def test_named_file_removed_on_close(self):
+        # given:
+        spool = spool_bytes(b'abcdef', AttachmentSettings(spool_memory_bytes=4))
+        path = spool.path
+
+        # when:
+        spool.close()
+
+        # then:
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
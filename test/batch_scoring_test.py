@@ -0,0 +1,109 @@
+import unittest
+
+from fuzzywuzzy import process
+
+from site_file_enricher.file_parser.xml_parser import XMLParser
+from site_file_enricher.search.batch_scoring import BatchScorer, CandidateBucket
+from site_file_enricher.search.normalization import normalize_query
+from xml_parser_test import PRODUCT_INFO_ROOT_XML_ELEMENT, ADDITIONAL_DATA
+
+NAMES = [
+    'Креатинкиназа сердечный изофермент ИВД, набор',
+    'Тропонин I ИВД, набор, иммунохроматографический анализ',
+    'Тропонин I ИВД набор',
+    'Скрытая кровь в кале ИВД, набор, иммунохроматографический анализ, экспресс-анализ, клинический',
+    'Аспирин 100 мг',
+    'аспирин 100мг',
+    'АСПИРИН, 100 МГ!',
+    'Парацетамол 500 mg',
+    'Парацетамол',
+    'П',
+    '!!!',
+    ''
+]
+QUERIES = NAMES + [
+    'Тропонин',
+    'тропонин i ивд набор иммунохроматографический',
+    'Аспирин 100 mg',
+    'Парацетамол 500 мг таблетки',
+    'Скрытая кровь',
+    'Креатинкиназа',
+    'Тест полоски',
+    '-'
+]
+
+
+def extract_best_match(query: str, names: list[str]):
+    fuzzy_result = process.extract(query, names, limit=1)
+    if len(fuzzy_result) > 0 and fuzzy_result[0][1] > 70:
+        return fuzzy_result[0][0], fuzzy_result[0][1]
+    return None
+
+
+class TestBatchScoring(unittest.TestCase):
+    def test_best_match_is_same_as_process_extract(self):
+        # given:
+        bucket = CandidateBucket(NAMES)
+
+        for query in QUERIES:
+            with self.subTest(query=query):
+                # when:
+                best_match = bucket.best_match(normalize_query(query))
+
+                # then:
+                self.assertEqual(extract_best_match(query, NAMES), best_match)
+
+    def test_first_of_equal_names_wins(self):
+        # given:
+        names = ['аспирин 100 мг', 'Аспирин 100 мг', 'АСПИРИН 100 МГ']
+        bucket = CandidateBucket(names)
+
+        # when:
+        best_match = bucket.best_match(normalize_query('Аспирин 100 мг'))
+
+        # then:
+        self.assertEqual(extract_best_match('Аспирин 100 мг', names), best_match)
+        self.assertEqual(('аспирин 100 мг', 100), best_match)
+
+    def test_fixture_names_match_as_process_extract(self):
+        # given:
+        parser = XMLParser(PRODUCT_INFO_ROOT_XML_ELEMENT, ADDITIONAL_DATA)
+        price_to_names = {}
+        for path in ['sources/xml/el_contract_small.xml', 'sources/xml/duplicated_name.xml', 'sources/xml/test.xml']:
+            with open(path, 'rb') as file:
+                for record in parser.parse_records(file.read(), 'test'):
+                    if record.product_name != '':
+                        price_to_names.setdefault(record.price, {})[record.product_name] = []
+        all_names = [name for names in price_to_names.values() for name in names]
+        scorer = BatchScorer(price_to_names)
+
+        for price, names in price_to_names.items():
+            for query in all_names[:50] + [name.upper() for name in names]:
+                with self.subTest(price=price, query=query):
+                    # when:
+                    best_match = scorer.best_match(price, query)
+
+                    # then:
+                    self.assertEqual(extract_best_match(query, list(names)), best_match)
+
+    def test_repeated_queries_are_scored_once(self):
+        # given:
+        scorer = BatchScorer({100: NAMES, 200: NAMES[:3]})
+
+        # when:
+        results = [scorer.best_match(100, 'Аспирин 100 мг'),
+                   scorer.best_match(100, 'аспирин 100 мг'),
+                   scorer.best_match(100, 'АСПИРИН 100 МГ'),
+                   scorer.best_match(200, 'Аспирин 100 мг')]
+
+        # then:
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+        self.assertIsNone(results[3])
+        self.assertEqual(2, scorer.scored_queries)
+        self.assertEqual(2, scorer.reused_queries)
+        self.assertEqual({100, 200}, set(scorer.buckets))
+
+
+if __name__ == '__main__':
+    unittest.main()
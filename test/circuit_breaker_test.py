@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+
+from site_file_enricher.io.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_failures_in_a_row(self):
+        # given:
+        circuit_breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+
+        # when:
+        circuit_breaker.record_failure()
+        circuit_breaker.record_failure()
+        circuit_breaker.record_success()
+        circuit_breaker.record_failure()
+        circuit_breaker.record_failure()
+        state_before_threshold = circuit_breaker.state
+        circuit_breaker.record_failure()
+
+        # then:
+        self.assertEqual(CircuitState.CLOSED, state_before_threshold)
+        self.assertEqual(CircuitState.OPEN, circuit_breaker.state)
+        self.assertEqual(1, circuit_breaker.stats.openings)
+
+    def test_open_circuit_lets_one_trial_through(self):
+        # given:
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        circuit_breaker.record_failure()
+
+        # when:
+        async def wait():
+            waiters = {asyncio.ensure_future(circuit_breaker.wait()) for _ in range(2)}
+            done, pending = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            state_after_trial_started = circuit_breaker.state
+            await asyncio.sleep(0.01)
+            waiting_during_trial = sum(not waiter.done() for waiter in pending)
+            circuit_breaker.record_success()
+            await asyncio.gather(*pending)
+            return state_after_trial_started, waiting_during_trial
+
+        state_after_trial_started, waiting_during_trial = asyncio.run(wait())
+
+        # then:
+        self.assertEqual(CircuitState.HALF_OPEN, state_after_trial_started)
+        self.assertEqual(1, waiting_during_trial)
+        self.assertEqual(CircuitState.CLOSED, circuit_breaker.state)
+
+    def test_failed_trial_doubles_reset_timeout(self):
+        # given:
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01, max_reset_timeout=0.03)
+        circuit_breaker.record_failure()
+
+        # when:
+        async def fail_trials():
+            for _ in range(3):
+                await circuit_breaker.wait()
+                circuit_breaker.record_failure()
+
+        asyncio.run(fail_trials())
+
+        # then:
+        self.assertEqual(CircuitState.OPEN, circuit_breaker.state)
+        self.assertEqual(0.03, circuit_breaker.current_reset_timeout)
+        self.assertEqual(4, circuit_breaker.stats.openings)
+
+    def test_pause(self):
+        # given:
+        circuit_breaker = CircuitBreaker()
+        circuit_breaker.pause(0.05)
+
+        # when:
+        waited = asyncio.run(circuit_breaker.wait())
+
+        # then:
+        self.assertGreaterEqual(waited, 0.05)
+        self.assertEqual(CircuitState.CLOSED, circuit_breaker.state)
+
+
+if __name__ == '__main__':
+    unittest.main()
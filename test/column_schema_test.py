@@ -0,0 +1,63 @@
+import unittest
+
+from site_file_enricher.model.column_schema import ColumnSchema
+from site_file_enricher.model.dto import FileColData, OutputElement
+
+
+def output_element(index: int, columns: list[tuple[str, str]]) -> OutputElement:
+    return OutputElement(
+        index_in_input_file=index,
+        link='test',
+        new_col_datas=[FileColData(index, name, value) for name, value in columns]
+    )
+
+
+class TestColumnSchema(unittest.TestCase):
+    def test_encoded_elements_give_same_columns(self):
+        # given:
+        schema = ColumnSchema()
+        output_elements = [
+            output_element(1, [('trademark', 'ABBOTT'), ('VATName', 'Без НДС')]),
+            output_element(2, [('VATName', 'Без НДС'), ('OKEIInfo_name', None)]),
+            output_element(3, [])
+        ]
+
+        # when:
+        compact_elements = schema.encode(output_elements)
+
+        # then:
+        self.assertEqual([element.columns() for element in output_elements],
+                         [element.columns() for element in compact_elements])
+        self.assertEqual([1, 2, 3], [element.index_in_input_file for element in compact_elements])
+        self.assertEqual(['trademark', 'VATName', 'OKEIInfo_name'], schema.names)
+        self.assertEqual((1, 2), compact_elements[1].column_ids)
+
+    def test_repeated_values_are_interned(self):
+        # given:
+        schema = ColumnSchema()
+        first_value = ''.join(['Без ', 'НДС'])
+        second_value = ''.join(['Без', ' НДС'])
+        self.assertIsNot(first_value, second_value)
+
+        # when:
+        compact_elements = schema.encode([output_element(1, [('VATName', first_value)]),
+                                          output_element(2, [('VATName', second_value)])])
+
+        # then:
+        self.assertIs(compact_elements[0].values[0], compact_elements[1].values[0])
+
+    def test_high_cardinality_column_is_not_interned(self):
+        # given:
+        schema = ColumnSchema(max_pool_size=2)
+
+        # when:
+        schema.encode([output_element(index, [('product_name', f'product {index}'), ('VATName', 'Без НДС')])
+                       for index in range(5)])
+
+        # then:
+        self.assertIsNone(schema.pools[schema.column_id('product_name')])
+        self.assertEqual(1, schema.interned_columns())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from site_file_enricher.file_parser.html_parser import HTMLParser, HTMLElement, HTMLContractFormat, RootTHMLElement
+from site_file_enricher.file_parser.xml_parser import XMLParser, RootXMLElement, XMLElement
+from site_file_enricher.io.rate_limiter import RateLimiter
+from site_file_enricher.io.site_handler import SiteHandler
+from site_file_enricher.script import enrich_file
+from zakupki_stub_server import SOURCES_PATH, StubSettings, ZakupkiStubServer
+
+CERT_ABS_PATH = os.path.join(SOURCES_PATH, 'russiantrustedca', 'russiantrustedca.pem')
+
+
+class StubServerThread:
+    """
+    Keeps the stub server on its own event loop, because enrich_file runs asyncio.run itself.
+    """
+
+    def __init__(self, settings: StubSettings):
+        self.stub_server = ZakupkiStubServer(settings)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def __enter__(self) -> ZakupkiStubServer:
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.stub_server.__aenter__(), self.loop).result()
+        return self.stub_server
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        asyncio.run_coroutine_threadsafe(self.stub_server.__aexit__(None, None, None), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+def build_site_handler(base_url: str, requests_per_second: float) -> SiteHandler:
+    xml_parser = XMLParser(
+        RootXMLElement(
+            name="product_info",
+            field_name="productInfo",
+            product_xml_element=XMLElement("product_name", "name"),
+            price_xml_element=XMLElement('price', 'price'),
+            okpd_xml_element=XMLElement('OKPDCode', 'OKPDCode'),
+            ktru_xml_element=XMLElement('KTRUInfo_code', 'code', 'KTRUInfo'),
+            children=[
+                XMLElement('trademark', 'trademark'),
+                XMLElement('OKEIInfo_name', 'name', 'OKEIInfo'),
+                XMLElement('countryFullName', 'countryFullName')
+            ]
+        ),
+        additional_data=[XMLElement('regNum', 'regNum', 'customerInfo')]
+    )
+    html_parser = HTMLParser(RootTHMLElement(
+        contract_format=HTMLContractFormat.TYPE_A,
+        product_html_element=HTMLElement(name="html_product_name", column_index=1),
+        price_html_element=HTMLElement(name="html_price", column_index=6),
+        children=[
+            HTMLElement(name="html_product_name", column_index=1),
+            HTMLElement(name="html_characteristics", column_index=5),
+        ]
+    ), None)
+    return SiteHandler(xml_parser=xml_parser, html_parser=html_parser,
+                       rate_limiter=RateLimiter(requests_per_second=requests_per_second, burst=1, jitter=0),
+                       base_url=base_url)
+
+
+def write_input_file(path: str, stub_server: ZakupkiStubServer, links_count: int, rows_per_link: int):
+    xml_parser = build_site_handler(stub_server.base_url, 1).parsers[r'.*контракт.*\.xml']
+    with open(os.path.join(SOURCES_PATH, 'xml', 'test.xml'), 'rb') as file:
+        xml_products = list({(el.product_name, el.price) for el in xml_parser.parse(file.read(), '')
+                             if el.product_name != ''})
+    xml_products.sort()
+    html_products = [('Контейнер для сбора образца калаNS-PRIME', 13127400)]
+
+    rows = []
+    for link_number in range(links_count):
+        registry_number = f'{2616410011824000000 + link_number}'
+        match link_number % 3:
+            case 0:
+                link, products = stub_server.contract_card_link(registry_number), xml_products
+            case 1:
+                link, products = stub_server.contract_draft_card_link(registry_number), html_products
+            case _:
+                link, products = stub_server.subject_card_link(registry_number), html_products
+        for row_number in range(rows_per_link):
+            name, price = products[row_number % len(products)]
+            rows.append({
+                'Ссылка на источник': link,
+                'Название продукта': name,
+                'Цена за единицу продукции': f'{price / 100:.2f}',
+                'Код ОКПД2/КТРУ продукта': ''
+            })
+    pd.DataFrame(rows).to_excel(path, index=False)
+
+
+def run_benchmark(links_count: int, rows_per_link: int, concurrency: int, requests_per_second: float,
+                  stub_settings: StubSettings):
+    with StubServerThread(stub_settings) as stub_server, tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, 'benchmark_input.xlsx')
+        write_input_file(input_path, stub_server, links_count, rows_per_link)
+        site_handler = build_site_handler(stub_server.base_url, requests_per_second)
+
+        start = time.perf_counter()
+        pipeline_stats = enrich_file(
+            abs_path_to_file=input_path,
+            out_path_to_file=directory,
+            out_file_name='benchmark_output.xlsx',
+            site_handler=site_handler,
+            cert_abs_path=CERT_ABS_PATH,
+            concurrency=concurrency
+        )
+        elapsed = time.perf_counter() - start
+
+        latencies = pipeline_stats.link_latencies
+        percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        print()
+        print(f'links: {links_count}, rows per link: {rows_per_link}, concurrency: {concurrency}, '
+              f'stub latency: {stub_settings.latency}s')
+        print(f'elapsed: {elapsed:.2f}s, links per minute: {links_count / elapsed * 60:.1f}')
+        print(f'latency per link: p50 {percentiles[49]:.3f}s, p95 {percentiles[94]:.3f}s, p99 {percentiles[98]:.3f}s')
+        print(f'requests per link: {stub_server.total_requests / links_count:.2f}')
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='End-to-end enrich_file benchmark against a local stub')
+    argument_parser.add_argument('--links', type=int, default=60)
+    argument_parser.add_argument('--rows-per-link', type=int, default=3)
+    argument_parser.add_argument('--concurrency', type=int, default=8)
+    argument_parser.add_argument('--requests-per-second', type=float, default=1000)
+    argument_parser.add_argument('--latency', type=float, default=0.05)
+    argument_parser.add_argument('--latency-jitter', type=float, default=0.05)
+    argument_parser.add_argument('--error-rate', type=float, default=0.0)
+    argument_parser.add_argument('--too-many-requests-rate', type=float, default=0.0)
+    arguments = argument_parser.parse_args()
+
+    run_benchmark(
+        links_count=arguments.links,
+        rows_per_link=arguments.rows_per_link,
+        concurrency=arguments.concurrency,
+        requests_per_second=arguments.requests_per_second,
+        stub_settings=StubSettings(
+            latency=arguments.latency,
+            latency_jitter=arguments.latency_jitter,
+            error_rate=arguments.error_rate,
+            too_many_requests_rate=arguments.too_many_requests_rate
+        )
+    )
@@ -0,0 +1,47 @@
+import argparse
+import glob
+import os
+import timeit
+
+from lxml import html
+
+from site_file_enricher.io.page_extractor import build_dom
+
+SOURCES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sources')
+
+
+def read_pages() -> dict[str, bytes]:
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(SOURCES_PATH, 'site', '*.html')) +
+                       glob.glob(os.path.join(SOURCES_PATH, 'html', '*.html'))):
+        with open(path, 'rb') as file:
+            body = file.read()
+        pages[os.path.relpath(path, SOURCES_PATH)] = (body
+                                                      .replace(b'{{base_url}}', b'https://zakupki.gov.ru')
+                                                      .replace(b'{{registry_number}}', b'2616410011824000637'))
+    return pages
+
+
+def run_benchmark(repeat: int, number: int):
+    print(f'{"page":<32}{"size":>10}{"decode, us":>14}{"bytes, us":>12}{"saving":>9}')
+    for name, body in read_pages().items():
+        bytes_time = min(timeit.repeat(lambda: build_dom(body, 'utf-8'),
+                                       repeat=repeat, number=number)) / number
+        try:
+            decode_time = min(timeit.repeat(lambda: html.fromstring(body.decode('utf-8')),
+                                            repeat=repeat, number=number)) / number
+        except ValueError:
+            # lxml refuses a str with an xml encoding declaration
+            print(f'{name:<32}{len(body):>10}{"fails":>14}{bytes_time * 1e6:>12.1f}{"":>9}')
+            continue
+        print(f'{name:<32}{len(body):>10}{decode_time * 1e6:>14.1f}{bytes_time * 1e6:>12.1f}'
+              f'{(1 - bytes_time / decode_time) * 100:>8.1f}%')
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='Str vs bytes DOM building on the fixture pages')
+    argument_parser.add_argument('--repeat', type=int, default=5)
+    argument_parser.add_argument('--number', type=int, default=50)
+    arguments = argument_parser.parse_args()
+
+    run_benchmark(arguments.repeat, arguments.number)
@@ -1,6 +1,8 @@
 import unittest
+from site_file_enricher.file_parser.xml_parser import XMLParser
 from site_file_enricher.model.dto import FileElement, FileColData, InputElement
-from site_file_enricher.search.fuzzy import search
+from site_file_enricher.search.fuzzy import search, match_file_elements
+from xml_parser_test import PRODUCT_INFO_ROOT_XML_ELEMENT, ADDITIONAL_DATA
 
 
 class TestFuzzySearch(unittest.TestCase):
@@ -1022,6 +1024,27 @@ class TestFuzzySearch(unittest.TestCase):
         self.assertEqual(18, len(result[0].new_col_datas))
         self.assertEqual(18, len(result[1].new_col_datas))
 
+    def test_product_records_match_as_file_elements(self):
+        # given:
+        parser = XMLParser(PRODUCT_INFO_ROOT_XML_ELEMENT, ADDITIONAL_DATA)
+        with open('sources/xml/el_contract_small.xml', 'rb') as file:
+            content = file.read()
+        records = parser.parse_records(content, 'test')
+        file_elements = parser.parse(content, 'test')
+        input_data = [
+            InputElement(index_in_input_file=index, link='test', name=record.product_name.upper(), price=record.price,
+                         okpd_ktru=record.okpd)
+            for index, record in enumerate(records) if record.product_name != ''
+        ]
+
+        # when:
+        expected = match_file_elements(input_data, file_elements)
+        result = match_file_elements(input_data, records)
+
+        # then:
+        self.assertEqual(len(input_data), len(expected))
+        self.assertEqual(expected, result)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,72 @@
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import timeit
+
+from site_file_enricher.file_parser.html_parser import HTMLParser, HTMLParserEngine
+from html_parser_test import TYPE_A_ROOT_ELEMENT, TYPE_B_ROOT_ELEMENT, build_type_a_printed_form
+
+SOURCES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sources')
+
+
+def read_printed_forms() -> dict[str, bytes]:
+    printed_forms = {}
+    for path in sorted(glob.glob(os.path.join(SOURCES_PATH, 'html', '*.html'))):
+        with open(path, 'rb') as file:
+            printed_forms[os.path.basename(path)] = file.read()
+    return printed_forms
+
+
+def run_time_benchmark(repeat: int, number: int):
+    parsers = {engine: HTMLParser(TYPE_A_ROOT_ELEMENT, TYPE_B_ROOT_ELEMENT, engine) for engine in HTMLParserEngine}
+    print(f'{"printed form":<16}{"size":>10}' + ''.join(f'{engine.name.lower() + ", ms":>22}' for engine in parsers))
+    for name, content in read_printed_forms().items():
+        expected = parsers[HTMLParserEngine.BEAUTIFUL_SOUP].parse(content, 'benchmark')
+        same = all(parser.parse(content, 'benchmark') == expected for parser in parsers.values())
+        times = [min(timeit.repeat(lambda: parser.parse(content, 'benchmark'), repeat=repeat, number=number)) / number
+                 for parser in parsers.values()]
+        print(f'{name:<16}{len(content):>10}' + ''.join(f'{time * 1e3:>22.2f}' for time in times)
+              + ('' if same else '  results differ!'))
+
+
+def __count_file_elements__(engine: HTMLParserEngine, path: str, queue: multiprocessing.Queue):
+    parser = HTMLParser(TYPE_A_ROOT_ELEMENT, TYPE_B_ROOT_ELEMENT, engine)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(path, 'rb') as file:
+        if engine == HTMLParserEngine.STREAMING:
+            count = sum(1 for _ in parser.iter_parse(file, 'benchmark'))
+        else:
+            count = len(parser.parse(file.read(), 'benchmark'))
+    queue.put((count, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before))
+
+
+def run_memory_benchmark(products: int):
+    path = os.path.join(SOURCES_PATH, 'out', f'printed_form_{products}.html')
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(build_type_a_printed_form(products))
+    try:
+        print(f'\n{products} products, {os.path.getsize(path) // 1024} KiB')
+        print(f'{"engine":<16}{"file elements":>15}{"peak RSS growth, MiB":>22}')
+        context = multiprocessing.get_context('spawn')
+        for engine in HTMLParserEngine:
+            queue = context.Queue()
+            process = context.Process(target=__count_file_elements__, args=(engine, path, queue))
+            process.start()
+            count, rss_growth = queue.get()
+            process.join()
+            print(f'{engine.name.lower():<16}{count:>15}{rss_growth / 1024:>22.1f}')
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='Printed form table extraction engines')
+    argument_parser.add_argument('--repeat', type=int, default=5)
+    argument_parser.add_argument('--number', type=int, default=20)
+    argument_parser.add_argument('--products', type=int, default=20000)
+    arguments = argument_parser.parse_args()
+
+    run_time_benchmark(arguments.repeat, arguments.number)
+    run_memory_benchmark(arguments.products)
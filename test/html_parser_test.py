@@ -1,5 +1,51 @@
+import io
 import unittest
-from site_file_enricher.file_parser.html_parser import HTMLParser, HTMLElement, HTMLContractFormat, RootTHMLElement
+from site_file_enricher.file_parser.html_parser import HTMLParser, HTMLElement, HTMLContractFormat, RootTHMLElement, \
+    HTMLParserEngine
+
+TYPE_A_ROOT_ELEMENT = RootTHMLElement(
+    contract_format=HTMLContractFormat.TYPE_A,
+    product_html_element=HTMLElement(name="html_product_name", column_index=1),
+    price_html_element=HTMLElement(name="html_price", column_index=6),
+    children=[
+        HTMLElement(name="html_product_name", column_index=1),
+        HTMLElement(name="html_ktru", column_index=3),
+        HTMLElement(name="html_characteristics", column_index=5),
+    ]
+)
+TYPE_B_ROOT_ELEMENT = RootTHMLElement(
+    contract_format=HTMLContractFormat.TYPE_B,
+    product_html_element=HTMLElement(name="html_product_name", column_index=1),
+    price_html_element=HTMLElement(name="html_price", column_index=5),
+    children=[
+        HTMLElement(name="html_product_name", column_index=1),
+        HTMLElement(name="html_ktru", column_index=3),
+        HTMLElement(name="html_characteristics", row_index=2, column_index=0),
+    ],
+    row_step=3
+)
+HTML_SOURCES = ['type_a.html', 'type_b.html', 'row_9.html', 'test.html']
+
+
+def build_type_a_printed_form(products: int) -> str:
+    header = ''.join(f'<td>{column}</td>' for column in range(1, 11))
+    rows = ''.join(
+        f'<tr><td>{product}</td><td>Product {product}</td><td>x</td><td>KTRU {product}</td><td>x</td>'
+        f'<td>Characteristics\n   {product}</td><td>{product}.5</td><td>x</td><td>x</td><td>x</td></tr>'
+        for product in range(1, products + 1))
+    return (f'<html><body><table class="printFormTbl table-centred-data"><tbody><tr>{header}</tr>{rows}'
+            f'</tbody></table><p>after</p></body></html>')
+
+
+class ReadCountingFile(io.BytesIO):
+    def __init__(self, content: bytes):
+        super().__init__(content)
+        self.bytes_read = 0
+
+    def read(self, size=-1) -> bytes:
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
 
 
 class TestHTMLParser(unittest.TestCase):
@@ -150,3 +196,101 @@ class TestHTMLParser(unittest.TestCase):
 
         # then:
         self.assertEqual(3, len(results))
+
+
+class TestHTMLParserLxmlEngine(unittest.TestCase):
+    def test_same_result_as_beautiful_soup_on_sources(self):
+        bs_parser = HTMLParser(TYPE_A_ROOT_ELEMENT, TYPE_B_ROOT_ELEMENT, HTMLParserEngine.BEAUTIFUL_SOUP)
+        lxml_parser = HTMLParser(TYPE_A_ROOT_ELEMENT, TYPE_B_ROOT_ELEMENT, HTMLParserEngine.LXML)
+        for source in HTML_SOURCES:
+            with self.subTest(source=source):
+                # given:
+                with open(f'sources/html/{source}', 'rb') as file:
+                    content = file.read()
+
+                # when:
+                expected = bs_parser.parse(content, 'test')
+                results = [
+                    lxml_parser.parse(content, 'test'),
+                    lxml_parser.parse(content.decode('utf-8'), 'test'),
+                    lxml_parser.parse(io.BytesIO(content), 'test')
+                ]
+
+                # then:
+                self.assertNotEqual(0, len(expected))
+                for result in results:
+                    self.assertEqual(expected, result)
+
+    def test_cell_text_as_beautiful_soup(self):
+        # given:
+        content = ('<table class="printFormTbl table-centred-data">'
+                   '<tr><td>1</td><td>x</td><td>x</td><td>x</td><td>x</td><td>x</td><td>x</td><td>x</td><td>x</td>'
+                   '<td>x</td></tr>'
+                   '<tr><td>1</td><td> a <script>s</script><style>s</style><!-- c --> \n b </td><td></td>'
+                   '<td>&nbsp;k&amp;<b> </b>\n<i>\t</i>t</td><td></td><td><pre> p  </pre>\n <p>c</p></td>'
+                   '<td>1 000.5</td></tr></table>')
+        bs_parser = HTMLParser(TYPE_A_ROOT_ELEMENT, None, HTMLParserEngine.BEAUTIFUL_SOUP)
+        lxml_parser = HTMLParser(TYPE_A_ROOT_ELEMENT, None, HTMLParserEngine.LXML)
+
+        # when:
+        expected = bs_parser.parse(content, 'test')
+        result = lxml_parser.parse(content, 'test')
+
+        # then:
+        self.assertEqual(3, len(expected))
+        self.assertEqual(expected, result)
+
+
+class TestHTMLParserStreamingEngine(unittest.TestCase):
+    def test_same_result_as_beautiful_soup_on_sources(self):
+        bs_parser = HTMLParser(TYPE_A_ROOT_ELEMENT, TYPE_B_ROOT_ELEMENT, HTMLParserEngine.BEAUTIFUL_SOUP)
+        streaming_parser = HTMLParser(TYPE_A_ROOT_ELEMENT, TYPE_B_ROOT_ELEMENT, HTMLParserEngine.STREAMING)
+        streaming_parser.chunk_size = 1024
+        for source in HTML_SOURCES:
+            with self.subTest(source=source):
+                # given:
+                with open(f'sources/html/{source}', 'rb') as file:
+                    content = file.read()
+
+                # when:
+                expected = bs_parser.parse(content, 'test')
+                results = [
+                    streaming_parser.parse(content, 'test'),
+                    streaming_parser.parse(content.decode('utf-8'), 'test'),
+                    streaming_parser.parse(io.BytesIO(content), 'test')
+                ]
+
+                # then:
+                self.assertNotEqual(0, len(expected))
+                for result in results:
+                    self.assertEqual(expected, result)
+
+    def test_product_with_bad_price_is_skipped(self):
+        # given:
+        content = build_type_a_printed_form(3).replace('<td>2.5</td>', '<td>по договору</td>')
+
+        for engine in HTMLParserEngine:
+            with self.subTest(engine=engine):
+                # when:
+                file_elements = HTMLParser(TYPE_A_ROOT_ELEMENT, None, engine).parse(content, 'test')
+
+                # then:
+                self.assertEqual(['Product 1', 'Product 3'],
+                                 sorted({file_element.product_name for file_element in file_elements}))
+
+    def test_yields_while_parsing(self):
+        # given:
+        content = build_type_a_printed_form(2000).encode('utf-8')
+        file = ReadCountingFile(content)
+        parser = HTMLParser(TYPE_A_ROOT_ELEMENT, None, HTMLParserEngine.STREAMING)
+        parser.chunk_size = 4096
+
+        # when:
+        file_elements = parser.iter_parse(file, 'test')
+        first_file_element = next(file_elements)
+
+        # then:
+        self.assertEqual('Product 1', first_file_element.product_name)
+        self.assertLess(file.bytes_read, len(content) // 10)
+        self.assertEqual(HTMLParser(TYPE_A_ROOT_ELEMENT, None).parse(content, 'test'),
+                         [first_file_element] + list(file_elements))
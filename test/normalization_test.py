@@ -0,0 +1,49 @@
+import unittest
+
+from fuzzywuzzy import fuzz
+
+from site_file_enricher.search.normalization import normalize_candidate, normalize_query, weighted_ratio
+from batch_scoring_test import QUERIES
+
+
+class TestNormalization(unittest.TestCase):
+    def test_weighted_ratio_is_same_as_wratio(self):
+        # given:
+        names = QUERIES + ['набор ИВД Тропонин I', 'I Тропонин I ИВД набор набор', 'мг 100 аспирин аспирин']
+
+        for query in names:
+            for candidate in names:
+                with self.subTest(query=query, candidate=candidate):
+                    # when:
+                    normalized_query = normalize_query(query)
+                    normalized_candidate = normalize_candidate(candidate)
+
+                    # then:
+                    self.assertEqual(
+                        fuzz.WRatio(normalized_query.processed, normalized_candidate.processed, full_process=False),
+                        weighted_ratio(normalized_query, normalized_candidate))
+
+    def test_normalized_name_has_tokens(self):
+        # when:
+        normalized_name = normalize_candidate('  Тропонин I, ИВД  набор Тропонин ')
+
+        # then:
+        self.assertEqual('тропонин i  ивд  набор тропонин', normalized_name.processed)
+        self.assertEqual('i ивд набор тропонин тропонин', normalized_name.sorted_tokens)
+        self.assertEqual(frozenset({'i', 'ивд', 'набор', 'тропонин'}), normalized_name.tokens)
+
+    def test_repeated_names_are_normalized_once(self):
+        # given:
+        normalize_candidate.cache_clear()
+
+        # when:
+        first = normalize_candidate('Аспирин 100 мг')
+        second = normalize_candidate(''.join(['Аспирин', ' 100 мг']))
+
+        # then:
+        self.assertIs(first, second)
+        self.assertEqual(1, normalize_candidate.cache_info().hits)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import glob
+import unittest
+
+from lxml import html
+
+from site_file_enricher.io.page_extractor import (ATTACHMENTS_CSSSELECT_EXPRESSION, PageFacts, PageFactsCache,
+                                                  build_dom, extract_page_facts)
+
+
+def read_page(file_name: str):
+    with open(f'sources/site/{file_name}', 'r', encoding='utf-8') as file:
+        page = file.read()
+    return html.fromstring(page.replace('{{base_url}}', 'https://zakupki.gov.ru')
+                           .replace('{{registry_number}}', '2616410011824000637'))
+
+
+class TestPageExtractor(unittest.TestCase):
+    def test_contract_card(self):
+        # when:
+        page_facts = extract_page_facts(read_page('contract_card.html'))
+
+        # then:
+        self.assertIsNone(page_facts.subject)
+        self.assertEqual('', page_facts.contract_draft_path)
+        self.assertEqual('/epz/contract/contractCard/document-info.html'
+                         '?reestrNumber=2616410011824000637&contractInfoId=2616410011824000637',
+                         page_facts.attachments_path)
+        self.assertEqual('03583001325', page_facts.customer_reg_num)
+
+    def test_contract_draft_card(self):
+        # when:
+        page_facts = extract_page_facts(read_page('contract_draft_card.html'))
+
+        # then:
+        self.assertTrue(page_facts.contract_draft_path.startswith('/epz/order/notice/rpec/contract-draft.html?'))
+        self.assertEqual('', page_facts.attachments_path)
+        self.assertIsNone(page_facts.customer_reg_num)
+
+    def test_subject_card(self):
+        # when:
+        page_facts = extract_page_facts(read_page('subject_card.html'))
+
+        # then:
+        self.assertEqual('ЛОТ №12 < Медицинские изделия_12 >', page_facts.subject)
+
+    def test_contract_draft(self):
+        # when:
+        page_facts = extract_page_facts(read_page('contract_draft.html'))
+
+        # then:
+        self.assertTrue(page_facts.html_contract_link.startswith(
+            'https://zakupki.gov.ru/printForm/2616410011824000637?uid='))
+
+    def test_document_info_attachments_match_cssselect(self):
+        # given:
+        dom = read_page('document_info.html')
+
+        # when:
+        page_facts = extract_page_facts(dom)
+
+        # then:
+        expected = tuple((attachment.get('title'), attachment.get('href'))
+                         for attachment in dom.cssselect(ATTACHMENTS_CSSSELECT_EXPRESSION))
+        self.assertEqual(3, len(page_facts.attachments))
+        self.assertEqual(expected, page_facts.attachments)
+
+    def test_cache_is_bounded(self):
+        # given:
+        page_facts_cache = PageFactsCache(max_entries=2)
+
+        # when:
+        page_facts_cache.put('https://zakupki.gov.ru/a?x=1&y=2', PageFacts(subject='a'))
+        page_facts_cache.put('https://zakupki.gov.ru/b', PageFacts(subject='b'))
+        hit = page_facts_cache.get('HTTPS://zakupki.gov.ru/a?y=2&x=1')
+        page_facts_cache.put('https://zakupki.gov.ru/c', PageFacts(subject='c'))
+
+        # then:
+        self.assertEqual('a', hit.subject)
+        self.assertIsNone(page_facts_cache.get('https://zakupki.gov.ru/b'))
+        self.assertEqual('c', page_facts_cache.get('https://zakupki.gov.ru/c').subject)
+
+    def test_dom_from_bytes_gives_same_facts(self):
+        for path in glob.glob('sources/site/*.html'):
+            with self.subTest(path=path):
+                # given:
+                with open(path, 'rb') as file:
+                    body = file.read()
+
+                # when:
+                from_bytes = extract_page_facts(build_dom(body, 'utf-8'))
+                from_str = extract_page_facts(html.fromstring(body.decode('utf-8')))
+
+                # then:
+                self.assertEqual(from_str, from_bytes)
+
+    def test_dom_from_bytes_uses_declared_encoding(self):
+        # given:
+        with open('sources/site/subject_card.html', 'r', encoding='utf-8') as file:
+            body = file.read().replace('UTF-8', 'windows-1251').encode('cp1251')
+
+        # when:
+        page_facts = extract_page_facts(build_dom(body, 'windows-1251'))
+        unknown_encoding_dom = build_dom('<p>Предмет договора</p>'.encode('utf-8'), 'unknown')
+
+        # then:
+        self.assertEqual('ЛОТ №12 < Медицинские изделия_12 >', page_facts.subject)
+        self.assertEqual('Предмет договора', unknown_encoding_dom.text_content())
+
+
+if __name__ == '__main__':
+    unittest.main()
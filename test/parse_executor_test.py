@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+from tempfile import SpooledTemporaryFile
+
+from site_file_enricher.io.attachment_spool import AttachmentSpool
+
+from site_file_enricher.file_parser.html_parser import HTMLParser, HTMLElement, HTMLContractFormat, RootTHMLElement
+from site_file_enricher.file_parser.parse_executor import ParseExecutor, ParseExecutorType
+from site_file_enricher.file_parser.xml_parser import XMLParser, RootXMLElement, XMLElement
+
+
+class TestParseExecutor(unittest.TestCase):
+    def setUp(self):
+        self.xml_parser = XMLParser(
+            RootXMLElement(
+                name="product_info",
+                field_name="productInfo",
+                product_xml_element=XMLElement("product_name", "name"),
+                price_xml_element=XMLElement('price', 'price'),
+                okpd_xml_element=XMLElement('OKPDCode', 'OKPDCode'),
+                ktru_xml_element=XMLElement('KTRUInfo_code', 'code', 'KTRUInfo'),
+                children=[
+                    XMLElement('trademark', 'trademark'),
+                    XMLElement('OKEIInfo_name', 'name', 'OKEIInfo')
+                ]
+            ),
+            additional_data=[XMLElement('regNum', 'regNum', 'customerInfo')]
+        )
+        self.html_parser = HTMLParser(
+            RootTHMLElement(
+                contract_format=HTMLContractFormat.TYPE_A,
+                product_html_element=HTMLElement(name="html_product_name", column_index=1),
+                price_html_element=HTMLElement(name="html_price", column_index=6),
+                children=[
+                    HTMLElement(name="html_product_name", column_index=1),
+                    HTMLElement(name="html_characteristics", column_index=5),
+                ]
+            ),
+            None
+        )
+        with open('sources/xml/test.xml', 'rb') as file:
+            self.xml_content = file.read()
+        with open('sources/html/type_a.html', 'r') as file:
+            self.html_content = file.read()
+
+    def parse_with(self, executor_type: ParseExecutorType):
+        async def parse(parse_executor):
+            return await asyncio.gather(
+                parse_executor.parse(self.xml_parser, self.xml_content, 'test'),
+                parse_executor.parse(self.html_parser, self.html_content, 'test'))
+
+        with ParseExecutor(executor_type, max_workers=2) as parse_executor:
+            return asyncio.run(parse(parse_executor))
+
+    def test_thread_executor_gives_same_elements(self):
+        # when:
+        xml_result, html_result = self.parse_with(ParseExecutorType.THREAD)
+
+        # then:
+        self.assertEqual(self.xml_parser.parse(self.xml_content, 'test'), xml_result)
+        self.assertEqual(self.html_parser.parse(self.html_content, 'test'), html_result)
+
+    def test_process_executor_gives_same_elements(self):
+        # when:
+        xml_result, html_result = self.parse_with(ParseExecutorType.PROCESS)
+
+        # then:
+        self.assertEqual(89, len(xml_result))
+        self.assertEqual(self.xml_parser.parse(self.xml_content, 'test'), xml_result)
+        self.assertEqual(self.html_parser.parse(self.html_content, 'test'), html_result)
+
+    def test_process_executor_reads_spooled_file(self):
+        # given:
+        spooled_file = SpooledTemporaryFile(max_size=1024)
+        spooled_file.write(self.xml_content)
+        spooled_file.seek(0)
+
+        # when:
+        with ParseExecutor(ParseExecutorType.PROCESS, max_workers=1) as parse_executor, spooled_file:
+            xml_result = asyncio.run(parse_executor.parse(self.xml_parser, spooled_file, 'test'))
+
+        # then:
+        self.assertEqual(self.xml_parser.parse(self.xml_content, 'test'), xml_result)
+
+    def test_process_executor_opens_spool_on_disk_by_path(self):
+        for memory_bytes, on_disk in [(1024, True), (len(self.xml_content), False)]:
+            with self.subTest(memory_bytes=memory_bytes):
+                # given:
+                spool = AttachmentSpool(memory_bytes)
+                spool.write(self.xml_content)
+                spool.seek(0)
+
+                # when:
+                with ParseExecutor(ParseExecutorType.PROCESS, max_workers=1) as parse_executor, spool:
+                    xml_result = asyncio.run(parse_executor.parse(self.xml_parser, spool, 'test'))
+                    position = spool.tell()
+
+                # then:
+                self.assertEqual(self.xml_parser.parse(self.xml_content, 'test'), xml_result)
+                # the worker read the file on disk itself, the one in memory was sent to it
+                self.assertEqual(0 if on_disk else len(self.xml_content), position)
+
+
+if __name__ == '__main__':
+    unittest.main()
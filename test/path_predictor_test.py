@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+from site_file_enricher.io.path_predictor import ContractPath, PathPredictor, registry_number
+
+LINK = 'https://zakupki.gov.ru/epz/contract/contractCard/common-info.html?reestrNumber=2616410011824000637'
+SAME_CUSTOMER_LINK = 'https://zakupki.gov.ru/epz/contract/contractCard/common-info.html?reestrNumber=2616410011825000012'
+OTHER_CUSTOMER_LINK = 'https://zakupki.gov.ru/epz/contract/contractCard/common-info.html?reestrNumber=1772801635124000615'
+
+
+class TestPathPredictor(unittest.TestCase):
+    def test_registry_number(self):
+        self.assertEqual('2616410011824000637', registry_number(LINK))
+        self.assertEqual(
+            '01015000003250001460011',
+            registry_number('https://zakupki.gov.ru/epz/order/notice/rpec/common-info.html?regNumber=01015000003250001460011'))
+        self.assertIsNone(registry_number('https://zakupki.gov.ru/epz/contractfz223/card/contract-info.html?id=20289734'))
+
+    def test_predict_by_registry_number_prefix(self):
+        # given:
+        predictor = PathPredictor(min_observations=2)
+        predictor.record(LINK, ContractPath.ATTACHMENTS)
+        predictor.record(LINK, ContractPath.ATTACHMENTS)
+        predictor.record(LINK, ContractPath.CONTRACT_DRAFT)
+
+        # when:
+        same_customer_path = predictor.predict(SAME_CUSTOMER_LINK)
+        other_customer_path = predictor.predict(OTHER_CUSTOMER_LINK)
+
+        # then:
+        self.assertEqual(ContractPath.ATTACHMENTS, same_customer_path)
+        self.assertIsNone(other_customer_path)
+
+    def test_customer_reg_num_goes_first(self):
+        # given:
+        predictor = PathPredictor(min_observations=1)
+        predictor.record(OTHER_CUSTOMER_LINK, ContractPath.CONTRACT_DRAFT, customer_reg_num='03583001325')
+        predictor.record(LINK, ContractPath.ATTACHMENTS)
+
+        # when:
+        result = predictor.predict(LINK, customer_reg_num='03583001325')
+
+        # then:
+        self.assertEqual(ContractPath.CONTRACT_DRAFT, result)
+
+    def test_table_is_persisted(self):
+        # given:
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'paths.json')
+            predictor = PathPredictor(file_path, min_observations=1)
+            predictor.record(LINK, ContractPath.SUBJECT)
+            predictor.save()
+
+            # when:
+            result = PathPredictor(file_path, min_observations=1).predict(SAME_CUSTOMER_LINK)
+
+        # then:
+        self.assertEqual(ContractPath.SUBJECT, result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import asyncio
+import unittest
+from contextlib import asynccontextmanager
+
+from site_file_enricher.io.crawl_engine import CrawlEngine
+from site_file_enricher.model.dto import FileColData, FileElement, FileElementType, InputElement
+from site_file_enricher.pipeline import EnrichmentPipeline, PipelineSettings
+
+
+class SubjectSiteHandler:
+    def __init__(self, delays: dict[str, float]):
+        self.delays = delays
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connected = False
+
+    @asynccontextmanager
+    async def connect(self, cert_abs_path: str):
+        self.connected = True
+        try:
+            yield self
+        finally:
+            self.connected = False
+
+    async def download_xml_and_parse(self, contract_link: str, cert_abs_path: str):
+        if not self.connected:
+            raise Exception('not connected')
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delays[contract_link])
+        self.in_flight -= 1
+        if contract_link == 'broken':
+            raise Exception('broken link')
+        return [FileElement(
+            link=contract_link,
+            product_name='',
+            price=-1,
+            file_element_type=FileElementType.HTML,
+            col_data=FileColData(-1, 'html_product_name', f'subject of {contract_link}')
+        )]
+
+
+class RecordingFileHandler:
+    def __init__(self):
+        self.written = []
+
+    def write(self, additional_elements, link=None):
+        self.written.append((link, [(el.index_in_input_file, el.columns()[0][1]) for el in additional_elements]))
+
+
+def input_elements_of(delays: dict[str, float]) -> dict[str, list[InputElement]]:
+    return {
+        link: [InputElement(index, link, 'name', 100), InputElement(index + 10, link, 'name', 100)]
+        for index, link in enumerate(delays)
+    }
+
+
+class TestEnrichmentPipeline(unittest.TestCase):
+    def test_run_writes_links_in_input_order(self):
+        # given:
+        delays = {'a': 0.05, 'b': 0.0, 'c': 0.02, 'd': 0.01}
+        link_to_input_elements = input_elements_of(delays)
+        file_handler = RecordingFileHandler()
+        written_links = []
+        crawl_engine = CrawlEngine(SubjectSiteHandler(delays), 'cert.pem', concurrency=2)
+        pipeline = EnrichmentPipeline(
+            crawl_engine, file_handler, PipelineSettings(match_workers=2, queue_size=1),
+            on_written=lambda link, input_elements: written_links.append((link, len(input_elements))))
+
+        # when:
+        stats = asyncio.run(pipeline.run(link_to_input_elements))
+
+        # then:
+        self.assertEqual([
+            (link, [(index, f'subject of {link}'), (index + 10, f'subject of {link}')])
+            for index, link in enumerate(delays)
+        ], file_handler.written)
+        self.assertEqual([(link, 2) for link in delays], written_links)
+        self.assertEqual(4, len(stats.link_latencies))
+        for stage_stats in stats.stages.values():
+            self.assertEqual(4, stage_stats.processed)
+        self.assertEqual({'download': 0, 'match': 0, 'write': 0}, pipeline.queue_depths())
+
+    def test_run_downloads_at_most_concurrency_links(self):
+        # given:
+        delays = {'a': 0.05, 'b': 0.01, 'c': 0.03, 'd': 0.0, 'e': 0.02}
+        site_handler = SubjectSiteHandler(delays)
+        file_handler = RecordingFileHandler()
+        pipeline = EnrichmentPipeline(CrawlEngine(site_handler, 'cert.pem', concurrency=2), file_handler,
+                                      PipelineSettings(window=3))
+
+        # when:
+        asyncio.run(pipeline.run(input_elements_of(delays)))
+
+        # then:
+        self.assertEqual(list(delays), [link for link, _ in file_handler.written])
+        self.assertEqual(2, site_handler.max_in_flight)
+
+    def test_run_writes_empty_result_for_failed_link(self):
+        # given:
+        delays = {'a': 0.01, 'broken': 0.0, 'c': 0.0}
+        file_handler = RecordingFileHandler()
+        pipeline = EnrichmentPipeline(CrawlEngine(SubjectSiteHandler(delays), 'cert.pem', concurrency=3),
+                                      file_handler)
+
+        # when:
+        asyncio.run(pipeline.run(input_elements_of(delays)))
+
+        # then:
+        self.assertEqual([
+            ('a', [(0, 'subject of a'), (10, 'subject of a')]),
+            ('broken', []),
+            ('c', [(2, 'subject of c'), (12, 'subject of c')])
+        ], file_handler.written)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
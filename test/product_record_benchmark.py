@@ -0,0 +1,41 @@
+import argparse
+import gc
+import tracemalloc
+
+from site_file_enricher.file_parser.xml_parser import XMLParser, XMLParserEngine
+from xml_parser_benchmark import read_documents
+from xml_parser_test import PRODUCT_INFO_ROOT_XML_ELEMENT, ADDITIONAL_DATA
+
+
+def measure(parse) -> tuple[int, int, int, int]:
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    tracemalloc.start()
+    result = parse()
+    retained, peak = tracemalloc.get_traced_memory()
+    blocks = sum(statistic.count for statistic in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+    tracked_objects = len(gc.get_objects()) - objects_before
+    del result
+    return retained, peak, blocks, tracked_objects
+
+
+def run_benchmark(replicate: int):
+    parser = XMLParser(PRODUCT_INFO_ROOT_XML_ELEMENT, ADDITIONAL_DATA, XMLParserEngine.ITERPARSE)
+    content = read_documents(replicate)[f'test.xml x{replicate}']
+    records = parser.parse_records(content, 'benchmark')
+    print(f'{len(records)} products, {len(parser.parse(content, "benchmark"))} file elements, '
+          f'{len(content) // 1024} KiB of xml')
+    print(f'{"result":<16}{"retained, KiB":>15}{"peak, KiB":>12}{"memory blocks":>15}{"gc objects":>12}')
+    for name, parse in [('file elements', lambda: parser.parse(content, 'benchmark')),
+                        ('product records', lambda: parser.parse_records(content, 'benchmark'))]:
+        retained, peak, blocks, tracked_objects = measure(parse)
+        print(f'{name:<16}{retained // 1024:>15}{peak // 1024:>12}{blocks:>15}{tracked_objects:>12}')
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='Memory of FileElement lists vs ProductRecord lists')
+    argument_parser.add_argument('--replicate', type=int, default=220)
+    arguments = argument_parser.parse_args()
+
+    run_benchmark(arguments.replicate)
@@ -0,0 +1,94 @@
+import asyncio
+import time
+import unittest
+
+from site_file_enricher.io.rate_limiter import RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_burst_is_not_delayed(self):
+        # given:
+        rate_limiter = RateLimiter(requests_per_second=1, burst=3, jitter=0)
+
+        # when:
+        async def acquire():
+            return await asyncio.gather(*[rate_limiter.acquire('https://zakupki.gov.ru/a') for _ in range(3)])
+
+        waits = asyncio.run(acquire())
+
+        # then:
+        self.assertEqual([0.0, 0.0, 0.0], waits)
+        self.assertEqual(3, rate_limiter.stats['zakupki.gov.ru'].requests)
+        self.assertEqual(0, rate_limiter.stats['zakupki.gov.ru'].delayed_requests)
+
+    def test_requests_over_burst_are_spread(self):
+        # given:
+        rate_limiter = RateLimiter(requests_per_second=20, burst=1, jitter=0)
+
+        # when:
+        async def acquire():
+            start = time.monotonic()
+            await asyncio.gather(*[rate_limiter.acquire('https://zakupki.gov.ru/a') for _ in range(5)])
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(acquire())
+
+        # then:
+        stats = rate_limiter.stats['zakupki.gov.ru']
+        self.assertGreaterEqual(elapsed, 0.19)
+        self.assertEqual(4, stats.delayed_requests)
+        self.assertAlmostEqual(0.2, stats.max_wait, delta=0.01)
+
+    def test_hosts_are_limited_independently(self):
+        # given:
+        rate_limiter = RateLimiter(requests_per_second=1, burst=1, jitter=0)
+
+        # when:
+        async def acquire():
+            return await asyncio.gather(
+                rate_limiter.acquire('https://zakupki.gov.ru/a'),
+                rate_limiter.acquire('https://example.com/a'))
+
+        waits = asyncio.run(acquire())
+
+        # then:
+        self.assertEqual([0.0, 0.0], waits)
+        self.assertEqual(2, rate_limiter.total_stats().requests)
+
+    def test_jitter_is_not_counted_as_delay(self):
+        # given:
+        rate_limiter = RateLimiter(requests_per_second=1, burst=3, jitter=0.01)
+
+        # when:
+        async def acquire():
+            return await asyncio.gather(*[rate_limiter.acquire('https://zakupki.gov.ru/a') for _ in range(3)])
+
+        waits = asyncio.run(acquire())
+
+        # then:
+        stats = rate_limiter.stats['zakupki.gov.ru']
+        self.assertTrue(all(wait > 0 for wait in waits))
+        self.assertEqual(3, stats.requests)
+        self.assertEqual(0, stats.delayed_requests)
+
+    def test_cancelled_reservation_is_refunded(self):
+        # given:
+        rate_limiter = RateLimiter(requests_per_second=1, burst=1, jitter=0)
+
+        # when:
+        async def acquire():
+            await rate_limiter.acquire('https://zakupki.gov.ru/a')
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(rate_limiter.acquire('https://zakupki.gov.ru/a'), timeout=0.01)
+            return rate_limiter.buckets['zakupki.gov.ru'].tokens
+
+        tokens = asyncio.run(acquire())
+
+        # then:
+        self.assertGreater(tokens, -0.5)
+        self.assertEqual(1, rate_limiter.stats['zakupki.gov.ru'].requests)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
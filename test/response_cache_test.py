@@ -0,0 +1,120 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from site_file_enricher.io.response_cache import CachedResponse, ResponseCache
+
+LINK = 'https://zakupki.gov.ru/epz/contract/contractCard/document-info.html?reestrNumber=2616410011824000637'
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_by_canonical_url(self):
+        # given:
+        cache = ResponseCache(self.directory.name)
+        body = ('<html>' + 'Печатная форма ' * 1000 + '</html>').encode('utf-8')
+        cache.put('https://ZAKUPKI.gov.ru/epz/contract/contractCard/document-info.html?b=2&a=1#tab',
+                  CachedResponse(body, 'utf-8'))
+
+        # when:
+        result = cache.get('https://zakupki.gov.ru/epz/contract/contractCard/document-info.html?a=1&b=2')
+        missed = cache.get(LINK)
+
+        # then:
+        self.assertEqual(body, result.body)
+        self.assertEqual('utf-8', result.encoding)
+        self.assertIsNone(missed)
+        self.assertLess(cache.size_bytes, len(body))
+        self.assertEqual((1, 1, 1), (cache.stats.hits, cache.stats.misses, cache.stats.stores))
+
+    def test_survives_reopening(self):
+        # given:
+        ResponseCache(self.directory.name).put(LINK, CachedResponse(b'<xml/>'))
+
+        # when:
+        result = ResponseCache(self.directory.name).get(LINK)
+
+        # then:
+        self.assertEqual(b'<xml/>', result.body)
+
+    def test_expired_entry_is_served_only_offline(self):
+        # given:
+        ResponseCache(self.directory.name, ttl_seconds=0.01).put(LINK, CachedResponse(b'<xml/>'))
+        time.sleep(0.05)
+
+        # when:
+        online_result = ResponseCache(self.directory.name, ttl_seconds=0.01).get(LINK)
+        offline_result = ResponseCache(self.directory.name, ttl_seconds=0.01, offline=True).get(LINK)
+
+        # then:
+        self.assertIsNone(online_result)
+        self.assertEqual(b'<xml/>', offline_result.body)
+
+    def test_least_recently_used_is_evicted(self):
+        # given:
+        cache = ResponseCache(self.directory.name, max_size_bytes=100)
+        cache.put('https://zakupki.gov.ru/1', CachedResponse(os.urandom(30)))
+        cache.put('https://zakupki.gov.ru/2', CachedResponse(os.urandom(30)))
+        cache.get('https://zakupki.gov.ru/1')
+
+        # when:
+        cache.put('https://zakupki.gov.ru/3', CachedResponse(os.urandom(30)))
+
+        # then:
+        self.assertIsNotNone(cache.get('https://zakupki.gov.ru/1'))
+        self.assertIsNone(cache.get('https://zakupki.gov.ru/2'))
+        self.assertIsNotNone(cache.get('https://zakupki.gov.ru/3'))
+        self.assertEqual(1, cache.stats.evictions)
+
+    def test_async_access_runs_off_event_loop_thread(self):
+        # given:
+        threads = set()
+
+        class ThreadRecordingCache(ResponseCache):
+            def __lookup__(self, link):
+                threads.add(threading.current_thread())
+                return super().__lookup__(link)
+
+        async def run(cache: ResponseCache):
+            await cache.async_put(LINK, CachedResponse(b'<xml/>', 'utf-8'))
+            return await cache.async_get(LINK), await cache.async_get('https://zakupki.gov.ru/1')
+
+        # when:
+        with ThreadRecordingCache(self.directory.name) as cache:
+            result, missed = asyncio.run(run(cache))
+
+        # then:
+        self.assertEqual(CachedResponse(b'<xml/>', 'utf-8'), result)
+        self.assertIsNone(missed)
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertEqual(1, len(threads))
+        with self.assertRaises(RuntimeError):
+            cache.get(LINK)
+
+    def test_file_is_stored_in_chunks(self):
+        # given:
+        body = ('<xml>' + 'Контракт ' * 100000 + '</xml>').encode('utf-8')
+        path = os.path.join(self.directory.name, 'attachment.xml')
+        with open(path, 'wb') as file:
+            file.write(body)
+
+        # when:
+        with ResponseCache(self.directory.name) as cache:
+            cache.put_file(LINK, path, 'utf-8')
+            result = cache.get(LINK)
+
+        # then:
+        self.assertEqual(CachedResponse(body, 'utf-8'), result)
+        self.assertEqual(1, cache.stats.stores)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from email.utils import formatdate
+import time
+
+from site_file_enricher.io.retry_policy import RetryPolicy, parse_retry_after
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_backoff_grows_exponentially_up_to_max_delay(self):
+        # given:
+        retry_policy = RetryPolicy(base_delay=1, max_delay=5, multiplier=2, jitter=0)
+
+        # when:
+        delays = [retry_policy.backoff(attempt) for attempt in range(1, 6)]
+
+        # then:
+        self.assertEqual([1, 2, 4, 5, 5], delays)
+
+    def test_backoff_jitter(self):
+        # given:
+        retry_policy = RetryPolicy(base_delay=4, jitter=0.5)
+
+        # when:
+        delays = [retry_policy.backoff(1) for _ in range(100)]
+
+        # then:
+        self.assertTrue(all(2 <= delay <= 4 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_retry_after_is_not_undercut(self):
+        # given:
+        retry_policy = RetryPolicy(base_delay=1, jitter=0, max_retry_after=60)
+
+        # when:
+        delay = retry_policy.backoff(1, retry_after=10)
+        capped_delay = retry_policy.backoff(1, retry_after=3600)
+
+        # then:
+        self.assertEqual(10, delay)
+        self.assertEqual(60, capped_delay)
+
+    def test_should_retry(self):
+        # given:
+        retry_policy = RetryPolicy(max_attempts=3)
+
+        # then:
+        self.assertTrue(retry_policy.should_retry(1))
+        self.assertTrue(retry_policy.should_retry(2))
+        self.assertFalse(retry_policy.should_retry(3))
+
+    def test_parse_retry_after(self):
+        # when:
+        seconds = parse_retry_after('120')
+        date = parse_retry_after(formatdate(time.time() + 30, usegmt=True))
+
+        # then:
+        self.assertEqual(120, seconds)
+        self.assertAlmostEqual(30, date, delta=2)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import asyncio
+import os
+import unittest
+
+from site_file_enricher.io.session_manager import ConnectionSettings, SessionManager
+
+
+class TestSessionManager(unittest.TestCase):
+    def test_session_is_shared_and_closed(self):
+        # given:
+        cert_abs_path = os.path.abspath('sources/russiantrustedca/russiantrustedca.pem')
+        settings = ConnectionSettings(limit=10, limit_per_host=2, ttl_dns_cache=60, keepalive_timeout=5)
+
+        # when:
+        async def open_twice():
+            async with SessionManager(cert_abs_path, settings) as first:
+                async with SessionManager(cert_abs_path, settings) as second:
+                    limits = (first.session.connector.limit, first.session.connector.limit_per_host)
+                    return first.session, first.ssl_context is second.ssl_context, limits
+
+        session, same_context, limits = asyncio.run(open_twice())
+
+        # then:
+        self.assertTrue(same_context)
+        self.assertTrue(session.closed)
+        self.assertEqual((10, 2), limits)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import unittest
+
+from site_file_enricher.io.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_call(self):
+        # given:
+        single_flight = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'result'
+
+        # when:
+        async def run():
+            return await asyncio.gather(*[single_flight.run('key', call) for _ in range(5)])
+
+        results = asyncio.run(run())
+
+        # then:
+        self.assertEqual(['result'] * 5, results)
+        self.assertEqual(1, len(calls))
+        self.assertEqual(4, single_flight.stats.shared_calls)
+        self.assertEqual({}, single_flight.flights)
+
+    def test_finished_calls_are_not_shared(self):
+        # given:
+        single_flight = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            return len(calls)
+
+        # when:
+        async def run():
+            return [await single_flight.run('key', call), await single_flight.run('key', call)]
+
+        results = asyncio.run(run())
+
+        # then:
+        self.assertEqual([1, 2], results)
+
+    def test_call_survives_while_someone_waits(self):
+        # given:
+        single_flight = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.02)
+            return 'result'
+
+        # when:
+        async def run():
+            first = asyncio.ensure_future(single_flight.run('key', call))
+            second = asyncio.ensure_future(single_flight.run('key', call))
+            await asyncio.sleep(0.005)
+            first.cancel()
+            return await second, first.cancelled()
+
+        result, first_cancelled = asyncio.run(run())
+
+        # then:
+        self.assertEqual('result', result)
+        self.assertTrue(first_cancelled)
+
+    def test_call_is_cancelled_with_its_last_waiter(self):
+        # given:
+        single_flight = SingleFlight()
+        finished = []
+
+        async def call():
+            await asyncio.sleep(0.02)
+            finished.append(1)
+
+        # when:
+        async def run():
+            waiter = asyncio.ensure_future(single_flight.run('key', call))
+            await asyncio.sleep(0.005)
+            waiter.cancel()
+            await asyncio.sleep(0.03)
+
+        asyncio.run(run())
+
+        # then:
+        self.assertEqual([], finished)
+        self.assertEqual({}, single_flight.flights)
+
+    def test_errors_are_shared(self):
+        # given:
+        single_flight = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.01)
+            raise ValueError('broken')
+
+        # when:
+        async def run():
+            return await asyncio.gather(*[single_flight.run('key', call) for _ in range(2)],
+                                        return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        # then:
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,331 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from site_file_enricher.file_parser.html_parser import HTMLParser, HTMLElement, HTMLContractFormat, RootTHMLElement
+from site_file_enricher.file_parser.xml_parser import XMLParser, RootXMLElement, XMLElement
+from site_file_enricher.io.attachment_spool import AttachmentSettings
+from site_file_enricher.io.circuit_breaker import CircuitBreaker
+from site_file_enricher.io.path_predictor import ContractPath, PathPredictor
+from site_file_enricher.io.rate_limiter import RateLimiter
+from site_file_enricher.io.response_cache import ResponseCache
+from site_file_enricher.io.retry_policy import RetryPolicy
+from site_file_enricher.io.site_handler import SiteHandler
+from site_file_enricher.model.dto import file_elements_of
+from site_file_enricher.io.timeouts import RequestTimeout, TimeoutSettings
+from zakupki_stub_server import StubSettings, ZakupkiStubServer
+
+CERT_ABS_PATH = os.path.abspath('sources/russiantrustedca/russiantrustedca.pem')
+CUSTOMER_REG_NUM = '03583001325'
+OTHER_CUSTOMER_CONTRACT_LINK = 'https://zakupki.gov.ru/epz/contract/contractCard/common-info.html?reestrNumber=1772801635124000615'
+
+
+def build_site_handler(base_url: str, **kwargs) -> SiteHandler:
+    kwargs.setdefault('retry_policy', RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01))
+    kwargs.setdefault('circuit_breaker', CircuitBreaker(failure_threshold=100, reset_timeout=0.01))
+    xml_parser = XMLParser(RootXMLElement(
+        name="product_info",
+        field_name="productInfo",
+        product_xml_element=XMLElement("product_name", "name"),
+        price_xml_element=XMLElement('price', 'price'),
+        okpd_xml_element=XMLElement('OKPDCode', 'OKPDCode'),
+        ktru_xml_element=XMLElement('KTRUInfo_code', 'code', 'KTRUInfo'),
+        children=[XMLElement('trademark', 'trademark')]
+    ))
+    html_parser = HTMLParser(RootTHMLElement(
+        contract_format=HTMLContractFormat.TYPE_A,
+        product_html_element=HTMLElement(name="html_product_name", column_index=1),
+        price_html_element=HTMLElement(name="html_price", column_index=6),
+        children=[
+            HTMLElement(name="html_product_name", column_index=1),
+            HTMLElement(name="html_ktru", column_index=3),
+            HTMLElement(name="html_characteristics", column_index=5),
+        ]
+    ), None)
+    return SiteHandler(xml_parser=xml_parser, html_parser=html_parser,
+                       rate_limiter=RateLimiter(requests_per_second=1000, burst=100, jitter=0),
+                       base_url=base_url, **kwargs)
+
+
+def download(stub_settings: StubSettings, link_builder, **kwargs):
+    async def run():
+        async with ZakupkiStubServer(stub_settings) as stub_server:
+            site_handler = build_site_handler(stub_server.base_url, **kwargs)
+            link = link_builder(stub_server)
+            result = file_elements_of(await site_handler.download_xml_and_parse(link, CERT_ABS_PATH))
+            return link, result, stub_server.requests, site_handler
+
+    return asyncio.run(run())
+
+
+class TestSiteHandlerWithStub(unittest.TestCase):
+    def test_attachments(self):
+        # when:
+        link, result, requests, _ = download(
+            StubSettings(), lambda stub_server: stub_server.contract_card_link('2616410011824000637'))
+
+        # then:
+        self.assertEqual(86, len(result))
+        for file_element in result:
+            self.assertEqual(link, file_element.link)
+            self.assertEqual('trademark', file_element.col_data.name)
+            self.assertEqual('ABBOTT', file_element.col_data.value)
+        self.assertEqual(2, requests['/attachments/2616410011824000637/1.xml'] +
+                         requests['/attachments/2616410011824000637/2.xml'])
+        self.assertEqual(0, requests['/attachments/2616410011824000637/spec.pdf'])
+
+    def test_contract_draft(self):
+        # when:
+        link, result, requests, _ = download(
+            StubSettings(), lambda stub_server: stub_server.contract_draft_card_link('01015000003250001460011'))
+
+        # then:
+        self.assertEqual(3, len(result))
+        for file_element in result:
+            self.assertEqual(link, file_element.link)
+            self.assertEqual('Контейнер для сбора образца калаNS-PRIME', file_element.product_name)
+        self.assertEqual(1, requests['/printForm/01015000003250001460011'])
+
+    def test_contract_subject(self):
+        # when:
+        link, result, requests, _ = download(StubSettings(), lambda stub_server: stub_server.subject_card_link('20289734'))
+
+        # then:
+        self.assertEqual(1, len(result))
+        self.assertEqual('html_product_name', result[0].col_data.name)
+        self.assertEqual('ЛОТ №12 < Медицинские изделия_12 >', result[0].col_data.value)
+        self.assertEqual(1, sum(requests.values()))
+
+    def test_contract_draft_goes_first(self):
+        # when:
+        link, result, requests, _ = download(
+            StubSettings(), lambda stub_server: stub_server.contract_card_with_draft_link('2616410011824000637'))
+
+        # then:
+        self.assertEqual(3, len(result))
+        self.assertEqual(1, requests['/printForm/2616410011824000637'])
+        self.assertEqual(0, requests['/epz/contract/contractCard/document-info.html'])
+
+    def test_predicted_attachments_go_first(self):
+        # given:
+        path_predictor = PathPredictor(min_observations=1)
+        path_predictor.record(OTHER_CUSTOMER_CONTRACT_LINK, ContractPath.ATTACHMENTS, customer_reg_num=CUSTOMER_REG_NUM)
+
+        # when:
+        link, result, requests, _ = download(
+            StubSettings(), lambda stub_server: stub_server.contract_card_with_draft_link('2616410011824000637'),
+            path_predictor=path_predictor)
+
+        # then:
+        self.assertEqual(86, len(result))
+        self.assertEqual(0, requests['/printForm/2616410011824000637'])
+        self.assertEqual(0, requests['/epz/order/notice/rpec/contract-draft.html'])
+        self.assertEqual(1, path_predictor.predictions)
+        self.assertEqual(1, path_predictor.correct_predictions)
+        self.assertEqual({'ATTACHMENTS': 2}, path_predictor.table[f'customer:{CUSTOMER_REG_NUM}'])
+
+    def test_prediction_without_choice_is_not_counted(self):
+        # given:
+        path_predictor = PathPredictor(min_observations=1)
+        path_predictor.record(OTHER_CUSTOMER_CONTRACT_LINK, ContractPath.ATTACHMENTS, customer_reg_num=CUSTOMER_REG_NUM)
+
+        # when:
+        link, result, requests, _ = download(
+            StubSettings(), lambda stub_server: stub_server.contract_card_link('2616410011824000637'),
+            path_predictor=path_predictor)
+
+        # then:
+        self.assertEqual(86, len(result))
+        self.assertEqual(0, path_predictor.predictions)
+        self.assertEqual({'ATTACHMENTS': 2}, path_predictor.table[f'customer:{CUSTOMER_REG_NUM}'])
+
+    def test_speculative_attachments(self):
+        # when:
+        link, result, requests, _ = download(
+            StubSettings(latency=0.01),
+            lambda stub_server: stub_server.contract_card_link('2616410011824000637'),
+            speculative=True)
+
+        # then:
+        self.assertEqual(86, len(result))
+
+    def test_server_errors(self):
+        # when:
+        link, result, requests, site_handler = download(
+            StubSettings(error_rate=1.0), lambda stub_server: stub_server.contract_card_link('2616410011824000637'))
+
+        # then:
+        self.assertEqual([], result)
+        self.assertEqual(3, requests['/epz/contract/contractCard/common-info.html'])
+        self.assertEqual(2, site_handler.retry_stats.retries)
+        self.assertEqual(1, site_handler.retry_stats.failed_requests)
+
+    def test_transient_server_errors_are_retried(self):
+        # when:
+        link, result, requests, site_handler = download(
+            StubSettings(error_rate=0.3, seed=7),
+            lambda stub_server: stub_server.contract_card_link('2616410011824000637'),
+            retry_policy=RetryPolicy(max_attempts=10, base_delay=0.001, max_delay=0.01))
+
+        # then:
+        self.assertEqual(86, len(result))
+        self.assertGreater(site_handler.retry_stats.retries, 0)
+        self.assertEqual(0, site_handler.retry_stats.failed_requests)
+
+    def test_retry_after_is_respected(self):
+        # when:
+        start = time.monotonic()
+        link, result, requests, site_handler = download(
+            StubSettings(throttled_requests=1, retry_after=1),
+            lambda stub_server: stub_server.subject_card_link('20289734'))
+        elapsed = time.monotonic() - start
+
+        # then:
+        self.assertEqual(1, len(result))
+        self.assertEqual(2, sum(requests.values()))
+        self.assertGreaterEqual(elapsed, 1.0)
+
+    def test_circuit_breaker_opens(self):
+        # when:
+        link, result, requests, site_handler = download(
+            StubSettings(error_rate=1.0),
+            lambda stub_server: stub_server.contract_card_link('2616410011824000637'),
+            circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.05))
+
+        # then:
+        self.assertEqual([], result)
+        self.assertEqual(2, site_handler.circuit_breaker.stats.openings)
+        self.assertGreater(site_handler.circuit_breaker.stats.total_pause, 0)
+
+    def test_slow_attachments_time_out(self):
+        # when:
+        start = time.monotonic()
+        link, result, requests, site_handler = download(
+            StubSettings(slow_paths={'/attachments/': 5}),
+            lambda stub_server: stub_server.contract_card_link('2616410011824000637'),
+            retry_policy=RetryPolicy(max_attempts=1),
+            timeout_settings=TimeoutSettings(attachment=RequestTimeout(read=0.1, total=0.2)))
+        elapsed = time.monotonic() - start
+
+        # then:
+        self.assertEqual([], result)
+        self.assertEqual(1, requests['/epz/contract/contractCard/document-info.html'])
+        self.assertEqual(2, site_handler.retry_stats.failed_requests)
+        self.assertLess(elapsed, 2)
+
+    def test_link_budget_cancels_probes(self):
+        # when:
+        start = time.monotonic()
+        link, result, requests, site_handler = download(
+            StubSettings(slow_paths={'/attachments/': 5}),
+            lambda stub_server: stub_server.contract_card_link('2616410011824000637'),
+            timeout_settings=TimeoutSettings(link_budget=0.3))
+        elapsed = time.monotonic() - start
+
+        # then:
+        self.assertEqual([], result)
+        self.assertEqual(1, site_handler.links_over_budget)
+        self.assertLess(elapsed, 2)
+
+    def test_retry_after_longer_than_link_budget(self):
+        # when:
+        start = time.monotonic()
+        link, result, requests, site_handler = download(
+            StubSettings(throttled_requests=1, retry_after=1),
+            lambda stub_server: stub_server.contract_card_link('2616410011824000637'),
+            timeout_settings=TimeoutSettings(link_budget=0.5))
+        elapsed = time.monotonic() - start
+
+        # then:
+        self.assertEqual(86, len(result))
+        self.assertEqual(0, site_handler.links_over_budget)
+        self.assertGreaterEqual(elapsed, 1.0)
+
+    def test_attachments_spooled_to_disk(self):
+        # when:
+        link, result, requests, _ = download(
+            StubSettings(chunked_attachments=True),
+            lambda stub_server: stub_server.contract_card_link('2616410011824000637'),
+            attachment_settings=AttachmentSettings(spool_memory_bytes=1024, chunk_size=1024))
+
+        # then:
+        self.assertEqual(86, len(result))
+
+    def test_attachments_are_cached(self):
+        for spool_memory_bytes in [1024, 1024 * 1024]:
+            with self.subTest(spool_memory_bytes=spool_memory_bytes):
+                with tempfile.TemporaryDirectory() as directory, ResponseCache(directory) as response_cache:
+                    # when:
+                    link, result, requests, _ = download(
+                        StubSettings(),
+                        lambda stub_server: stub_server.contract_card_link('2616410011824000637'),
+                        response_cache=response_cache,
+                        attachment_settings=AttachmentSettings(spool_memory_bytes=spool_memory_bytes))
+
+                    # then:
+                    self.assertEqual(86, len(result))
+                    self.assertEqual(4, response_cache.stats.stores)
+
+    def test_large_attachments_are_served_offline(self):
+        # given:
+        async def run(directory):
+            async with ZakupkiStubServer(StubSettings(attachment_padding=2 * 1024 * 1024)) as stub_server:
+                link = stub_server.contract_card_link('2616410011824000637')
+                with ResponseCache(directory) as response_cache:
+                    await build_site_handler(stub_server.base_url, response_cache=response_cache) \
+                        .download_xml_and_parse(link, CERT_ABS_PATH)
+                stub_server.requests.clear()
+                with ResponseCache(directory, offline=True) as response_cache:
+                    result = await build_site_handler(stub_server.base_url, response_cache=response_cache) \
+                        .download_xml_and_parse(link, CERT_ABS_PATH)
+                return file_elements_of(result), stub_server.requests, response_cache
+
+        # when:
+        with tempfile.TemporaryDirectory() as directory:
+            result, requests, response_cache = asyncio.run(run(directory))
+
+        # then:
+        self.assertEqual(86, len(result))
+        self.assertEqual(0, sum(requests.values()))
+        self.assertEqual(0, response_cache.stats.misses)
+
+    def test_oversized_attachments_are_rejected(self):
+        for chunked_attachments in [False, True]:
+            with self.subTest(chunked_attachments=chunked_attachments):
+                # when:
+                link, result, requests, site_handler = download(
+                    StubSettings(chunked_attachments=chunked_attachments),
+                    lambda stub_server: stub_server.contract_card_link('2616410011824000637'),
+                    attachment_settings=AttachmentSettings(max_size_bytes=10 * 1024))
+
+                # then:
+                self.assertEqual([], result)
+                self.assertEqual(0, site_handler.retry_stats.retries)
+
+    def test_duplicate_links_share_downloads(self):
+        # when:
+        async def run():
+            async with ZakupkiStubServer(StubSettings(latency=0.01)) as stub_server:
+                site_handler = build_site_handler(stub_server.base_url)
+                link = stub_server.contract_card_link('2616410011824000637')
+                other_link = link.replace('http://', 'HTTP://')
+                results = await asyncio.gather(
+                    site_handler.download_xml_and_parse(link, CERT_ABS_PATH),
+                    site_handler.download_xml_and_parse(link, CERT_ABS_PATH),
+                    site_handler.download_xml_and_parse(other_link, CERT_ABS_PATH))
+                return link, other_link, [file_elements_of(result) for result in results], stub_server.requests
+
+        link, other_link, results, requests = asyncio.run(run())
+
+        # then:
+        self.assertEqual([86, 86, 86], [len(result) for result in results])
+        self.assertEqual({link}, {file_element.link for file_element in results[0]})
+        self.assertEqual({other_link}, {file_element.link for file_element in results[2]})
+        self.assertEqual(1, requests['/epz/contract/contractCard/common-info.html'])
+        self.assertEqual(1, requests['/attachments/2616410011824000637/1.xml'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ import warnings
 from site_file_enricher.file_parser.xml_parser import XMLParser, RootXMLElement, XMLElement
 from site_file_enricher.file_parser.html_parser import HTMLParser, HTMLElement, HTMLContractFormat, RootTHMLElement
 from site_file_enricher.io.site_handler import SiteHandler
+from site_file_enricher.model.dto import file_elements_of
 
 warnings.filterwarnings('ignore')
 
@@ -27,10 +28,10 @@ class TestSiteHandler(unittest.TestCase):
         link = 'https://zakupki.gov.ru/epz/contract/contractCard/document-info.html?reestrNumber=2616410011824000637'
 
         # when:
-        result = asyncio.run(site_handler.download_xml_and_parse(
+        result = file_elements_of(asyncio.run(site_handler.download_xml_and_parse(
             contract_link=link,
             cert_abs_path=os.path.abspath('sources/russiantrustedca/russiantrustedca.pem')
-        ))
+        )))
 
         # then:
         self.assertEqual(43, len(result))
@@ -66,10 +67,10 @@ class TestSiteHandler(unittest.TestCase):
         link = 'https://zakupki.gov.ru/epz/contract/contractCard/document-info.html?reestrNumber=2616410011824000637'
 
         # when:
-        result = asyncio.run(site_handler.download_xml_and_parse(
+        result = file_elements_of(asyncio.run(site_handler.download_xml_and_parse(
             contract_link=link,
             cert_abs_path=os.path.abspath('sources/russiantrustedca/russiantrustedca.pem')
-        ))
+        )))
 
         # then:
         self.assertEqual(45, len(result))
@@ -113,10 +114,10 @@ class TestSiteHandler(unittest.TestCase):
         link = 'https://zakupki.gov.ru/epz/contract/contractCard/common-info.html?reestrNumber=1623401336625000004'
 
         # when:
-        result =  asyncio.run(site_handler.download_xml_and_parse(
+        result = file_elements_of(asyncio.run(site_handler.download_xml_and_parse(
             contract_link=link,
             cert_abs_path=os.path.abspath('sources/russiantrustedca/russiantrustedca.pem')
-        ))
+        )))
         print(result)
 
     def test_get_contract_subject(self):
@@ -126,10 +127,10 @@ class TestSiteHandler(unittest.TestCase):
         link = 'https://zakupki.gov.ru/epz/contractfz223/card/contract-info.html?id=20289734'
 
         # when:
-        result = asyncio.run(site_handler.download_xml_and_parse(
+        result = file_elements_of(asyncio.run(site_handler.download_xml_and_parse(
             contract_link=link,
             cert_abs_path=os.path.abspath('sources/russiantrustedca/russiantrustedca.pem')
-        ))
+        )))
 
         # then:
         self.assertEqual(1, len(result))
@@ -165,10 +166,10 @@ class TestSiteHandler(unittest.TestCase):
         link = 'https://zakupki.gov.ru/epz/order/notice/rpec/common-info.html?regNumber=01015000003250001460011'
 
         # when:
-        result = asyncio.run(site_handler.download_xml_and_parse(
+        result = file_elements_of(asyncio.run(site_handler.download_xml_and_parse(
             contract_link=link,
             cert_abs_path=os.path.abspath('sources/russiantrustedca/russiantrustedca.pem')
-        ))
+        )))
 
         # then:
         self.assertEqual(18, len(result))
@@ -0,0 +1,33 @@
+import re
+import unittest
+
+from bs4 import BeautifulSoup
+
+from site_file_enricher.file_parser.text import collapse_spaces, collapse_whitespace
+
+
+class TestText(unittest.TestCase):
+    def test_collapse_whitespace_as_beautiful_soup(self):
+        # given:
+        texts = [' ', '\n', '  \n\t ', '\t\r', ' a ', '\xa0', 'без\n изменений']
+
+        for text in texts:
+            with self.subTest(text=text):
+                # when:
+                expected = BeautifulSoup(f'<p><b>x</b>{text}<b>y</b></p>', 'html.parser').p.text[1:-1]
+
+                # then:
+                self.assertEqual(expected, collapse_whitespace(text))
+
+    def test_collapse_spaces_is_same_as_regex(self):
+        # given:
+        texts = ['Аспирин  100\n мг', '\n\n', ' ', '', 'без\tизменений\r\n', 'a \n \nb ']
+
+        for text in texts:
+            with self.subTest(text=text):
+                # then:
+                self.assertEqual(re.sub(r'([ \n]+)', ' ', text), collapse_spaces(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import time
+import unittest
+
+from site_file_enricher.io.circuit_breaker import DEFAULT_MAX_RESET_TIMEOUT
+from site_file_enricher.io.retry_policy import DEFAULT_MAX_RETRY_AFTER
+from site_file_enricher.io.timeouts import DEFAULT_LINK_BUDGET, LinkBudget
+
+
+class TestLinkBudget(unittest.TestCase):
+    def test_budget_doesnt_run_down_while_paused(self):
+        # given:
+        link_budget = LinkBudget(1.0)
+
+        # when:
+        with link_budget.paused():
+            with link_budget.paused():
+                time.sleep(0.1)
+            time.sleep(0.1)
+        remaining = link_budget.remaining()
+
+        # then:
+        self.assertGreater(remaining, 0.95)
+        self.assertGreaterEqual(link_budget.total_pause, 0.2)
+
+    def test_budget_runs_down_after_pause(self):
+        # given:
+        link_budget = LinkBudget(1.0)
+        with link_budget.paused():
+            time.sleep(0.05)
+
+        # when:
+        time.sleep(0.1)
+
+        # then:
+        self.assertLess(link_budget.remaining(), 0.95)
+
+    def test_default_budget_is_longer_than_pauses(self):
+        # then:
+        self.assertGreater(DEFAULT_LINK_BUDGET, DEFAULT_MAX_RESET_TIMEOUT)
+        self.assertGreater(DEFAULT_LINK_BUDGET, DEFAULT_MAX_RETRY_AFTER)
+
+
+if __name__ == '__main__':
+    unittest.main()
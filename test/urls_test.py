@@ -0,0 +1,44 @@
+import unittest
+
+from site_file_enricher.io.urls import canonical_url, contract_key
+
+
+class TestUrls(unittest.TestCase):
+    def test_canonical_url(self):
+        # when:
+        result = canonical_url('HTTPS://Zakupki.gov.ru/epz/contract/?b=2&a=1#tab')
+
+        # then:
+        self.assertEqual('https://zakupki.gov.ru/epz/contract?a=1&b=2', result)
+
+    def test_contract_key_of_card_variants(self):
+        # given:
+        links = [
+            'https://zakupki.gov.ru/epz/contract/contractCard/common-info.html?reestrNumber=2760602879024000424',
+            'http://zakupki.gov.ru/epz/contract/contractCard/common-info.html?reestrNumber=2760602879024000424',
+            'https://zakupki.gov.ru/epz/contract/contractCard/common-info.html/?reestrNumber=2760602879024000424',
+            'https://zakupki.gov.ru/epz/contract/contractCard/document-info.html?tab=1&reestrNumber=2760602879024000424'
+        ]
+
+        # when:
+        keys = {contract_key(link) for link in links}
+
+        # then:
+        self.assertEqual({'zakupki.gov.ru/epz/contract/contractCard?reestrNumber=2760602879024000424'}, keys)
+
+    def test_contract_key_keeps_different_contracts_apart(self):
+        # when:
+        keys = {
+            contract_key('https://zakupki.gov.ru/epz/contract/contractCard/common-info.html?reestrNumber=1'),
+            contract_key('https://zakupki.gov.ru/epz/contract/contractCard/common-info.html?reestrNumber=2'),
+            contract_key('https://zakupki.gov.ru/epz/contract/contractCard/document-info.html?contractInfoId=1'),
+            contract_key('https://zakupki.gov.ru/epz/contractfz223/card/contract-info.html?id=1'),
+            contract_key('https://zakupki.gov.ru/epz/order/notice/rpec/common-info.html?regNumber=1')
+        }
+
+        # then:
+        self.assertEqual(5, len(keys))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import os
 import shutil
+import tempfile
 import unittest
 import pandas as pd
 
@@ -113,6 +114,34 @@ class TestXLSXFileHandler(unittest.TestCase):
 
         os.remove(result_path)
 
+    def test_read_merges_links_of_one_contract(self):
+        # given:
+        links = [
+            'https://zakupki.gov.ru/epz/contract/contractCard/common-info.html?reestrNumber=2760602879024000424',
+            'https://zakupki.gov.ru/epz/contractfz223/card/contract-info.html?id=21013248',
+            'http://zakupki.gov.ru/epz/contract/contractCard/document-info.html?reestrNumber=2760602879024000424'
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'merged.xlsx')
+            pd.DataFrame({
+                'Ссылка на источник': links,
+                'Название продукта': ['a', 'b', 'c'],
+                'Цена за единицу продукции': ['1', '2', '3']
+            }).to_excel(path, index=False)
+            handler = XLXSFileHandler(path, ['field_a'], directory, 'merged.xlsx')
+
+            # when:
+            result = handler.read()
+            handler.write([OutputElement(0, links[0], [FileColData(1, 'field_a', 'a_0')]),
+                           OutputElement(2, links[2], [FileColData(1, 'field_a', 'a_2')])], link=links[0])
+
+            # then:
+            self.assertEqual([links[0], links[1]], list(result))
+            self.assertEqual([0, 2], [element.index_in_input_file for element in result[links[0]]])
+            self.assertEqual([links[0], links[2]], [element.link for element in result[links[0]]])
+            written = pd.read_excel(os.path.join(directory, '0_merged.xlsx'))
+            self.assertEqual(['a_0', 'a_2'], list(written['field_a']))
+
 
 if __name__ == '__main__':
     unittest.main()
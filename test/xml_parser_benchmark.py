@@ -0,0 +1,63 @@
+import argparse
+import glob
+import os
+import re
+import timeit
+import tracemalloc
+
+from site_file_enricher.file_parser.xml_parser import XMLParser, XMLParserEngine
+from xml_parser_test import PRODUCT_INFO_ROOT_XML_ELEMENT, ADDITIONAL_DATA
+
+SOURCES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sources')
+PRODUCTS_PATTERN = re.compile(rb'<productsInfo>(.*)</productsInfo>', re.DOTALL)
+
+
+def read_documents(replicate: int) -> dict[str, bytes]:
+    documents = {}
+    for path in sorted(glob.glob(os.path.join(SOURCES_PATH, 'xml', '*.xml'))):
+        with open(path, 'rb') as file:
+            documents[os.path.basename(path)] = file.read()
+    # a big contract made of the products of test.xml repeated
+    match = PRODUCTS_PATTERN.search(documents['test.xml'])
+    if match is not None:
+        documents[f'test.xml x{replicate}'] = (documents['test.xml'][:match.start(1)] + match.group(1) * replicate
+                                               + documents['test.xml'][match.end(1):])
+    return documents
+
+
+def peak_memory(parser: XMLParser, content: bytes) -> int:
+    tracemalloc.start()
+    parser.parse(content, 'benchmark')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run_benchmark(repeat: int, number: int, replicate: int):
+    parsers = {
+        engine: XMLParser(PRODUCT_INFO_ROOT_XML_ELEMENT, ADDITIONAL_DATA, engine)
+        for engine in XMLParserEngine
+    }
+    print(f'{"document":<28}{"size":>10}{"bs4, ms":>10}{"iterparse, ms":>15}{"bs4, KiB":>11}{"iterparse, KiB":>16}')
+    for name, content in read_documents(replicate).items():
+        same = (parsers[XMLParserEngine.BEAUTIFUL_SOUP].parse(content, 'benchmark') ==
+                parsers[XMLParserEngine.ITERPARSE].parse(content, 'benchmark'))
+        times = {
+            engine: min(timeit.repeat(lambda: parser.parse(content, 'benchmark'), repeat=repeat, number=number)) / number
+            for engine, parser in parsers.items()
+        }
+        memory = {engine: peak_memory(parser, content) for engine, parser in parsers.items()}
+        print(f'{name:<28}{len(content):>10}'
+              f'{times[XMLParserEngine.BEAUTIFUL_SOUP] * 1e3:>10.2f}{times[XMLParserEngine.ITERPARSE] * 1e3:>15.2f}'
+              f'{memory[XMLParserEngine.BEAUTIFUL_SOUP] // 1024:>11}{memory[XMLParserEngine.ITERPARSE] // 1024:>16}'
+              f'{"" if same else "  results differ!"}')
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='BeautifulSoup vs lxml iterparse XML engines')
+    argument_parser.add_argument('--repeat', type=int, default=3)
+    argument_parser.add_argument('--number', type=int, default=5)
+    argument_parser.add_argument('--replicate', type=int, default=20)
+    arguments = argument_parser.parse_args()
+
+    run_benchmark(arguments.repeat, arguments.number, arguments.replicate)
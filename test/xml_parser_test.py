@@ -1,6 +1,36 @@
+import io
 import unittest
 
-from site_file_enricher import XMLParser, RootXMLElement, XMLElement
+from lxml import etree
+
+from site_file_enricher import XMLParser, RootXMLElement, XMLElement, XMLParserEngine, XMLExtractionPlan
+
+PRODUCT_INFO_ROOT_XML_ELEMENT = RootXMLElement(
+    name="product_info",
+    field_name="productInfo",
+    product_xml_element=XMLElement("product_name", "name"),
+    price_xml_element=XMLElement('price', 'price'),
+    okpd_xml_element=XMLElement('OKPDCode', 'OKPDCode'),
+    ktru_xml_element=XMLElement('KTRUInfo_code', 'code', 'KTRUInfo'),
+    children=[
+        XMLElement('price', 'price'),
+        XMLElement('indexNum', 'indexNum'),
+        XMLElement('trademark', 'trademark'),
+        XMLElement('medicalProductCode', 'medicalProductCode'),
+        XMLElement('OKEIInfo_name', 'name', 'OKEIInfo'),
+        XMLElement('KTRUInfo_name', 'name', 'KTRUInfo'),
+        XMLElement('KTRUInfo_code', 'code', 'KTRUInfo')
+    ]
+)
+ADDITIONAL_DATA = [
+    XMLElement('quantityUndefined', 'quantityUndefined'),
+    XMLElement('regNum', 'regNum', 'customerInfo'),
+    XMLElement('singularName', 'singularName', 'customerInfo'),
+    XMLElement('contractorRegistryNum', 'contractorRegistryNum', 'participantInfo'),
+    XMLElement('contractSubjectInfo_sid', 'sid', 'contractSubjectInfo'),
+    XMLElement('missing', 'missing', 'customerInfo')
+]
+XML_SOURCES = ['test.xml', 'ktru_problem.xml', 'el_contract_small.xml', 'duplicated_name.xml', 'ligand.xml']
 
 
 class TestXmlParser(unittest.TestCase):
@@ -185,5 +215,112 @@ class TestXmlParser(unittest.TestCase):
         print(result)
 
 
+class TestXmlParserIterparseEngine(unittest.TestCase):
+    def parse_with_both_engines(self, content):
+        bs_parser = XMLParser(PRODUCT_INFO_ROOT_XML_ELEMENT, ADDITIONAL_DATA, XMLParserEngine.BEAUTIFUL_SOUP)
+        iterparse_parser = XMLParser(PRODUCT_INFO_ROOT_XML_ELEMENT, ADDITIONAL_DATA, XMLParserEngine.ITERPARSE)
+        return bs_parser.parse(content, 'test'), iterparse_parser.parse(content, 'test')
+
+    def test_same_result_as_beautiful_soup_on_sources(self):
+        for source in XML_SOURCES:
+            with self.subTest(source=source):
+                # given:
+                with open(f'sources/xml/{source}', 'rb') as file:
+                    content = file.read()
+
+                # when:
+                expected, result = self.parse_with_both_engines(content)
+
+                # then:
+                self.assertNotEqual(0, len(expected))
+                self.assertEqual(expected, result)
+
+    def test_same_result_for_every_kind_of_input(self):
+        # given:
+        with open('sources/xml/el_contract_small.xml', 'rb') as file:
+            content = file.read()
+        expected, _ = self.parse_with_both_engines(content)
+        parser = XMLParser(PRODUCT_INFO_ROOT_XML_ELEMENT, ADDITIONAL_DATA, XMLParserEngine.ITERPARSE)
+
+        # when:
+        results = [
+            parser.parse(content.decode('utf-8'), 'test'),
+            parser.parse(io.BytesIO(content), 'test'),
+            parser.parse(io.StringIO(content.decode('utf-8')), 'test')
+        ]
+
+        # then:
+        for result in results:
+            self.assertEqual(expected, result)
+
+    def test_namespaces_nested_products_and_whitespace(self):
+        # given:
+        content = """<?xml version="1.0" encoding="UTF-8"?>
+<ns2:contract xmlns:ns2="urn:a" xmlns="urn:b">
+  <ns2:customerInfo><regNum>  01 </regNum><singularName>A<!-- c -->B</singularName></ns2:customerInfo>
+  <products>
+    <productInfo>
+      <indexNum>1</indexNum>
+      <name>outer
+        <b>bold</b>   </name>
+      <price>10.5</price>
+      <productInfo><indexNum>2</indexNum><name>inner</name><price>3</price><trademark>T</trademark></productInfo>
+      <KTRUInfo><code>k</code><name>ktru</name></KTRUInfo>
+    </productInfo>
+    <productInfo><price>1</price></productInfo>
+    <productInfo><name>  </name><price>2</price><OKEIInfo><name>\t</name></OKEIInfo></productInfo>
+  </products>
+  <participantInfo/>
+  <quantityUndefined>false</quantityUndefined>
+</ns2:contract>"""
+
+        # when:
+        expected, result = self.parse_with_both_engines(content)
+
+        # then:
+        self.assertNotEqual(0, len(expected))
+        self.assertEqual(expected, result)
+
+
+class TestXMLExtractionPlan(unittest.TestCase):
+    def extract(self, plan: XMLExtractionPlan, content: str) -> list:
+        root = etree.fromstring(content)
+        events = [(event, element, element.tag) for event, element in etree.iterwalk(root, events=('start', 'end'))
+                  if element is not root]
+        return plan.extract(events, lambda element: ''.join(element.itertext()))
+
+    def test_values_are_taken_from_first_container(self):
+        # given:
+        plan = XMLExtractionPlan([
+            XMLElement('code', 'code', 'KTRUInfo'),
+            XMLElement('name', 'name'),
+            XMLElement('KTRUInfo_name', 'name', 'KTRUInfo'),
+            XMLElement('missing', 'missing'),
+            XMLElement('code_again', 'code', 'KTRUInfo')
+        ])
+
+        # when:
+        values = self.extract(plan, '<p><c>0</c><KTRUInfo><x><code>1</code></x></KTRUInfo>'
+                                    '<name>n</name><KTRUInfo><name>2</name></KTRUInfo></p>')
+
+        # then:
+        self.assertEqual(4, plan.slot_count)
+        self.assertEqual(['1', 'n', None, None, '1'], values)
+
+    def test_stops_when_every_value_is_found(self):
+        # given:
+        plan = XMLExtractionPlan([XMLElement('name', 'name')])
+        root = etree.fromstring('<p><name>n</name><rest><a/><b/></rest></p>')
+        events = iter([(event, element, element.tag)
+                       for event, element in etree.iterwalk(root, events=('start', 'end')) if element is not root])
+
+        # when:
+        values = plan.extract(events, lambda element: element.text)
+
+        # then:
+        self.assertEqual(['n'], values)
+        self.assertEqual('rest', next(events)[2])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+SOURCES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sources')
+
+
+@dataclass
+class StubSettings:
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    error_rate: float = 0.0
+    too_many_requests_rate: float = 0.0
+    retry_after: int = 1
+    # the first requests are always answered with 429
+    throttled_requests: int = 0
+    # extra latency of the paths starting with a prefix
+    slow_paths: dict[str, float] = field(default_factory=dict)
+    # attachments are sent with chunked encoding, without Content-Length
+    chunked_attachments: bool = False
+    # bytes of an xml comment appended to the attachments to make them large
+    attachment_padding: int = 0
+    seed: int = 0
+
+
+def __read_source__(*path: str) -> bytes:
+    with open(os.path.join(SOURCES_PATH, *path), 'rb') as file:
+        return file.read()
+
+
+class ZakupkiStubServer:
+    """
+    Local imitation of the zakupki.gov.ru pages SiteHandler walks through, built
+    from the fixtures in test/sources. Every path of a contract link is served:
+    - contract card with a documents tab -> document-info -> xml attachments,
+    - contract card with both tabs, where the contract draft is tried first,
+    - notice card with a contract draft tab -> contract draft -> printed form,
+    - 223-FZ contract card with the contract subject.
+    """
+
+    def __init__(self, settings: StubSettings = None):
+        self.settings = settings if settings is not None else StubSettings()
+        self.random = random.Random(self.settings.seed)
+        self.requests = Counter()
+        self.runner = None
+        self.base_url = None
+        self.pages = {
+            'contract_card': __read_source__('site', 'contract_card.html').decode('utf-8'),
+            'contract_card_with_draft': __read_source__('site', 'contract_card_with_draft.html').decode('utf-8'),
+            'contract_draft_card': __read_source__('site', 'contract_draft_card.html').decode('utf-8'),
+            'subject_card': __read_source__('site', 'subject_card.html').decode('utf-8'),
+            'document_info': __read_source__('site', 'document_info.html').decode('utf-8'),
+            'contract_draft': __read_source__('site', 'contract_draft.html').decode('utf-8')
+        }
+        self.printed_form = __read_source__('html', 'type_a.html')
+        self.xml_attachment = __read_source__('xml', 'test.xml')
+        if self.settings.attachment_padding != 0:
+            self.xml_attachment += b'<!--' + b' ' * self.settings.attachment_padding + b'-->'
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    def contract_card_link(self, registry_number: str) -> str:
+        return f'{self.base_url}/epz/contract/contractCard/common-info.html?reestrNumber={registry_number}'
+
+    def contract_card_with_draft_link(self, registry_number: str) -> str:
+        return f'{self.contract_card_link(registry_number)}&contractDraft=true'
+
+    def contract_draft_card_link(self, registry_number: str) -> str:
+        return f'{self.base_url}/epz/order/notice/rpec/common-info.html?regNumber={registry_number}'
+
+    def subject_card_link(self, registry_number: str) -> str:
+        return f'{self.base_url}/epz/contractfz223/card/contract-info.html?id={registry_number}'
+
+    def __render__(self, page: str, registry_number: str) -> web.Response:
+        body = (self.pages[page]
+                .replace('{{base_url}}', self.base_url)
+                .replace('{{registry_number}}', registry_number))
+        return web.Response(text=body, content_type='text/html', charset='utf-8')
+
+    @web.middleware
+    async def __imitate_site__(self, request: web.Request, handler):
+        self.requests[request.path] += 1
+        delay = self.settings.latency + self.random.uniform(0, self.settings.latency_jitter)
+        delay += sum(latency for prefix, latency in self.settings.slow_paths.items()
+                     if request.path.startswith(prefix))
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if (self.total_requests <= self.settings.throttled_requests
+                or self.random.random() < self.settings.too_many_requests_rate):
+            return web.Response(status=429, headers={'Retry-After': str(self.settings.retry_after)})
+        if self.random.random() < self.settings.error_rate:
+            return web.Response(status=503)
+        return await handler(request)
+
+    async def __contract_card__(self, request: web.Request) -> web.Response:
+        page = 'contract_card_with_draft' if 'contractDraft' in request.query else 'contract_card'
+        return self.__render__(page, request.query.get('reestrNumber', ''))
+
+    async def __document_info__(self, request: web.Request) -> web.Response:
+        if 'contractInfoId' in request.query:
+            return self.__render__('document_info', request.query['contractInfoId'])
+        return self.__render__('contract_card', request.query.get('reestrNumber', ''))
+
+    async def __contract_draft_card__(self, request: web.Request) -> web.Response:
+        return self.__render__('contract_draft_card', request.query.get('regNumber', ''))
+
+    async def __contract_draft__(self, request: web.Request) -> web.Response:
+        return self.__render__('contract_draft', request.query.get('regNumber', ''))
+
+    async def __subject_card__(self, request: web.Request) -> web.Response:
+        return self.__render__('subject_card', request.query.get('id', ''))
+
+    async def __printed_form__(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.printed_form, content_type='text/html', charset='utf-8')
+
+    async def __attachment__(self, request: web.Request) -> web.StreamResponse:
+        if not request.match_info['file_name'].endswith('.xml'):
+            return web.Response(body=b'%PDF-1.4', content_type='application/pdf')
+        if not self.settings.chunked_attachments:
+            return web.Response(body=self.xml_attachment, content_type='application/xml')
+        response = web.StreamResponse(headers={'Content-Type': 'application/xml'})
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        for start in range(0, len(self.xml_attachment), 4096):
+            await response.write(self.xml_attachment[start:start + 4096])
+        await response.write_eof()
+        return response
+
+    async def __aenter__(self) -> 'ZakupkiStubServer':
+        app = web.Application(middlewares=[self.__imitate_site__])
+        app.router.add_get('/epz/contract/contractCard/common-info.html', self.__contract_card__)
+        app.router.add_get('/epz/contract/contractCard/document-info.html', self.__document_info__)
+        app.router.add_get('/epz/order/notice/rpec/common-info.html', self.__contract_draft_card__)
+        app.router.add_get('/epz/order/notice/rpec/contract-draft.html', self.__contract_draft__)
+        app.router.add_get('/epz/contractfz223/card/contract-info.html', self.__subject_card__)
+        app.router.add_get('/printForm/{registry_number}', self.__printed_form__)
+        app.router.add_get('/attachments/{registry_number}/{file_name}', self.__attachment__)
+        self.runner = web.AppRunner(app, access_log=None, shutdown_timeout=0.1)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.base_url = f'http://127.0.0.1:{port}'
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.runner.cleanup()